@@ -0,0 +1,84 @@
+import time
+import random
+import threading
+from typing import Callable, Optional
+from querycraft.utils.db_connector import DatabaseConnector
+
+
+class GenerationOnlyConnector(DatabaseConnector):
+    """Connector that skips the database
+
+    Runs measure question -> SQL overhead (prompting, caching, validation)
+    without needing a running Postgres.
+    """
+
+    def execute_sql(self, sql_query: str, row_limit: Optional[int] = None,
+                    statement_timeout_ms: Optional[int] = None) -> str:
+        return "No results found"
+
+
+class Sample:
+    """Outcome of one query of a session"""
+
+    __slots__ = ("session", "start", "latency", "error", "cache_hit")
+
+    def __init__(self, session: int, start: float, latency: float, error: Optional[str] = None,
+                 cache_hit: bool = False):
+        self.session = session
+        self.start = start
+        self.latency = latency
+        self.error = error
+        self.cache_hit = cache_hit
+
+
+def run_session(db, session: int, questions: list, queries: int, think_time: float,
+                rng: random.Random, samples: list, lock: threading.Lock) -> None:
+    """Ask ``queries`` random questions, pausing ``think_time`` on average between them"""
+    for _ in range(queries):
+        question = rng.choice(questions)
+        start = time.perf_counter()
+        error = None
+        cache_hit = False
+        try:
+            cache_hit = db.execute_natural_query(question)["cache_hit"]
+        except Exception as e:
+            error = str(e)
+        sample = Sample(session, start, time.perf_counter() - start, error, cache_hit)
+        with lock:
+            samples.append(sample)
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+
+
+def generate_load(connector_for: Callable, questions: list, sessions: int = 8, queries: int = 10,
+                  think_time: float = 0.0, seed: int = 0) -> tuple:
+    """Simulate concurrent interactive sessions
+
+    Every session has its own connector, like separate ``interactive_mode``
+    users, and asks its questions one after another.
+
+    Args:
+        connector_for (callable): Session number -> DatabaseConnector
+        questions (list): Questions sessions pick from at random
+        sessions (int): Concurrent sessions
+        queries (int): Questions asked per session
+        think_time (float): Mean pause between a session's questions (seconds)
+        seed (int): Seed for question choice and think times
+
+    Returns:
+        tuple: (list of Sample, wall-clock seconds)
+    """
+    connectors = [connector_for(session) for session in range(sessions)]
+    samples = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=run_session, args=(db, session, questions, queries, think_time,
+                                                   random.Random(seed + session), samples, lock))
+        for session, db in enumerate(connectors)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
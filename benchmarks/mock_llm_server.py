@@ -0,0 +1,241 @@
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from querycraft.utils.schema_loader import SchemaLoader
+from querycraft.utils.schema_retriever import estimate_tokens
+
+DEFAULT_SQL = "SELECT 1;"
+# Injected failures besides HTTP status codes
+DROP = "drop"
+
+
+def parse_distribution(spec: str) -> Callable:
+    """Sampler for a latency distribution given as ``kind:arg,...`` (seconds)
+
+    Supported: ``fixed:S``, ``uniform:LOW,HIGH``, ``exponential:MEAN`` and
+    ``lognormal:MEDIAN,SIGMA``.
+
+    >>> parse_distribution("fixed:0.25")(random.Random(0))
+    0.25
+    >>> 0.1 <= parse_distribution("uniform:0.1,0.2")(random.Random(0)) <= 0.2
+    True
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(arg) for arg in args.split(",")] if args else []
+    except ValueError:
+        raise ValueError(f"Invalid latency distribution: {spec}")
+    samplers = {
+        ("fixed", 1): lambda rng: values[0],
+        ("uniform", 2): lambda rng: rng.uniform(values[0], values[1]),
+        ("exponential", 1): lambda rng: rng.expovariate(1 / values[0]) if values[0] else 0.0,
+        ("lognormal", 2): lambda rng: rng.lognormvariate(math.log(values[0]), values[1]),
+    }
+    sampler = samplers.get((kind, len(values)))
+    if sampler is None:
+        raise ValueError(f"Invalid latency distribution: {spec}. "
+                         "Use fixed:S, uniform:LOW,HIGH, exponential:MEAN or lognormal:MEDIAN,SIGMA")
+    return sampler
+
+
+def parse_errors(spec: Optional[str]) -> list:
+    """Failure probabilities given as ``outcome:probability,...``
+
+    An outcome is an HTTP status code or ``drop`` (close the connection
+    without answering).
+
+    >>> parse_errors("500:0.02,429:0.01,drop:0.005")
+    [(500, 0.02), (429, 0.01), ('drop', 0.005)]
+    """
+    errors = []
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        outcome, _, probability = item.partition(":")
+        outcome = outcome.strip()
+        errors.append((outcome if outcome == DROP else int(outcome), float(probability)))
+    if sum(probability for _, probability in errors) > 1:
+        raise ValueError(f"Error probabilities add up to more than 1: {spec}")
+    return errors
+
+
+class MockLLMServer:
+    """Local stand-in for a chat-completions API
+
+    Answers ``POST /v1/chat/completions`` (plain and streamed) after a
+    sampled delay with the SQL of the schema example whose question matches
+    the request, and fails a configurable share of requests. Token usage is
+    estimated from the message lengths.
+    """
+
+    def __init__(self, answers: Optional[dict] = None, latency: str = "fixed:0",
+                 errors: Optional[str] = None, retry_after: float = 1.0, seed: int = 0,
+                 host: str = "127.0.0.1", port: int = 0):
+        """Initialize the server
+
+        Args:
+            answers (dict, optional): Question -> SQL; other questions get DEFAULT_SQL
+            latency (str): Response delay distribution (see parse_distribution)
+            errors (str, optional): Injected failures (see parse_errors)
+            retry_after (float): Retry-After seconds sent with 429 responses
+            seed (int): Seed for latency and failure sampling
+            host (str): Interface to listen on
+            port (int): Port to listen on; 0 picks a free one
+        """
+        self.answers = answers or {}
+        self.latency = parse_distribution(latency)
+        self.errors = parse_errors(errors)
+        self.retry_after = retry_after
+        self.stats = {"requests": 0, "errors": 0, "streams": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @classmethod
+    def for_schema(cls, schema_name: str, **kwargs) -> "MockLLMServer":
+        """Server answering the example questions of a schema with their SQL"""
+        examples = SchemaLoader(schema_name).get_example_list()
+        answers = {example["question"]: example["sql"].strip() for example in examples}
+        return cls(answers, **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def answer(self, messages: list) -> str:
+        """SQL for the question in the first user message"""
+        question = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+        return self.answers.get(question.strip(), DEFAULT_SQL)
+
+    def _sample(self) -> tuple:
+        """(delay in seconds, injected failure or None) for one request"""
+        with self._lock:
+            delay = max(0.0, self.latency(self._rng))
+            roll = self._rng.random()
+            self.stats["requests"] += 1
+            for outcome, probability in self.errors:
+                if roll < probability:
+                    self.stats["errors"] += 1
+                    return delay, outcome
+                roll -= probability
+            return delay, None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this, delayed
+            # ACKs add ~40 ms to every response
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                request = json.loads(body or b"{}")
+                delay, failure = server._sample()
+                time.sleep(delay)
+                if failure == DROP:
+                    self.close_connection = True
+                    self.connection.shutdown(2)
+                    return
+                if failure is not None:
+                    headers = {"Retry-After": f"{server.retry_after:g}"} if failure == 429 else None
+                    self._send_json(failure, {"error": {"message": f"Injected {failure} error"}}, headers)
+                    return
+
+                messages = request.get("messages") or []
+                content = server.answer(messages)
+                usage = {
+                    "prompt_tokens": sum(estimate_tokens(m.get("content", "")) for m in messages),
+                    "completion_tokens": estimate_tokens(content),
+                }
+                if request.get("stream"):
+                    self._stream(content)
+                    return
+                self._send_json(200, {
+                    "object": "chat.completion",
+                    "model": request.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": usage,
+                })
+
+            def _stream(self, content):
+                with server._lock:
+                    server.stats["streams"] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for word in content.split(" "):
+                    chunk = {"choices": [{"index": 0, "delta": {"content": word + " "}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+
+        return Handler
+
+    def start(self) -> str:
+        """Serve in a background thread
+
+        Returns:
+            str: Base URL for OpenAI-compatible clients
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve canned SQL over a chat-completions API")
+    parser.add_argument("--schema", default="pagila", help="schema whose example queries are answered")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="lognormal:0.4,0.3", help="response delay distribution")
+    parser.add_argument("--errors", help="injected failures, e.g. 500:0.02,429:0.01,drop:0.005")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockLLMServer.for_schema(args.schema, latency=args.latency, errors=args.errors,
+                                      seed=args.seed, host=args.host, port=args.port)
+    print(f"Serving {len(server.answers)} answers at {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+from querycraft.utils.latency_stats import summarize
+
+# Metrics compared against the baseline: name -> True if higher is better
+COMPARED_METRICS = {
+    "throughput": True,
+    "latency.p50": False,
+    "latency.p95": False,
+    "latency.p99": False,
+    "error_rate": False,
+}
+
+
+def summarize_run(samples: list, elapsed: float, settings: dict = None) -> dict:
+    """Throughput, error rate and latency percentiles of a load run
+
+    Latency percentiles cover successful queries only.
+    """
+    errors = [sample for sample in samples if sample.error is not None]
+    return {
+        "settings": settings or {},
+        "queries": len(samples),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(samples) if samples else 0.0,
+        "cache_hits": sum(sample.cache_hit for sample in samples),
+        "elapsed": elapsed,
+        "throughput": len(samples) / elapsed if elapsed else 0.0,
+        "latency": summarize(sample.latency for sample in samples if sample.error is None),
+        "first_errors": sorted({sample.error for sample in errors})[:5],
+    }
+
+
+def _metric(report: dict, name: str) -> float:
+    value = report
+    for part in name.split("."):
+        value = value[part]
+    return value
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """Regressions of a run against a baseline run
+
+    A metric regresses when it is more than ``tolerance`` (relative) worse
+    than the baseline; the error rate also regresses when it goes from zero
+    to non-zero.
+
+    >>> base = {"throughput": 10.0, "latency": {"p50": 1.0, "p95": 2.0, "p99": 3.0}, "error_rate": 0.0}
+    >>> compare(dict(base, throughput=7.5), base)
+    ['throughput 7.5 is 25% worse than baseline 10']
+    >>> compare(base, base)
+    []
+    """
+    regressions = []
+    for name, higher_is_better in COMPARED_METRICS.items():
+        current, reference = _metric(report, name), _metric(baseline, name)
+        if reference == 0:
+            worse = current > 0 and not higher_is_better
+            change = float("inf")
+        else:
+            change = (reference - current) / reference if higher_is_better else (current - reference) / reference
+            worse = change > tolerance
+        if worse:
+            regressions.append(f"{name} {current:.4g} is {change:.0%} worse than baseline {reference:.4g}")
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    latency = report["latency"]
+    return (f"{report['queries']} queries in {report['elapsed']:.2f}s: "
+            f"{report['throughput']:.2f} queries/s, {report['errors']} errors, "
+            f"p50 {latency['p50'] * 1000:.0f} ms, p95 {latency['p95'] * 1000:.0f} ms, "
+            f"p99 {latency['p99'] * 1000:.0f} ms")
+
+
+def load_report(path) -> dict:
+    with open(Path(path), 'r') as f:
+        return json.load(f)
+
+
+def save_report(report: dict, path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
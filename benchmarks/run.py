@@ -0,0 +1,100 @@
+import os
+import sys
+import argparse
+from pathlib import Path
+from benchmarks.mock_llm_server import MockLLMServer
+from benchmarks.load_generator import GenerationOnlyConnector, generate_load
+from benchmarks.report import summarize_run, compare, format_report, load_report, save_report
+from querycraft.utils.db_connector import DatabaseConnector
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+
+def run(schema: str = "pagila", sessions: int = 8, queries: int = 10, think_time: float = 0.0,
+        latency: str = "fixed:0.05", errors: str = None, database: bool = False,
+        use_cache: bool = False, seed: int = 0) -> dict:
+    """Start a mock LLM server, drive it with concurrent sessions and summarize the run
+
+    Args:
+        schema (str): Schema whose example questions are asked and answered
+        sessions (int): Concurrent interactive sessions
+        queries (int): Questions per session
+        think_time (float): Mean pause between a session's questions (seconds)
+        latency (str): Mock LLM response delay distribution
+        errors (str, optional): Mock LLM failure probabilities
+        database (bool): Execute the SQL on the schema's database instead of
+            stopping after generation
+        use_cache (bool): Let repeated questions hit the query cache
+        seed (int): Seed for the server and the sessions
+
+    Returns:
+        dict: Run summary (see summarize_run)
+    """
+    settings = {
+        "schema": schema, "sessions": sessions, "queries": queries, "think_time": think_time,
+        "latency": latency, "errors": errors, "database": database, "cache": use_cache, "seed": seed,
+    }
+    connector_class = DatabaseConnector if database else GenerationOnlyConnector
+    with MockLLMServer.for_schema(schema, latency=latency, errors=errors, seed=seed) as server:
+        previous = {name: os.environ.get(name) for name in ("QUERYCRAFT_LLM_BACKEND", "QUERYCRAFT_OPENAI_BASE_URL")}
+        os.environ.update(QUERYCRAFT_LLM_BACKEND="openai", QUERYCRAFT_OPENAI_BASE_URL=server.base_url)
+        try:
+            samples, elapsed = generate_load(
+                lambda session: connector_class(schema_name=schema, use_query_cache=use_cache),
+                list(server.answers), sessions=sessions, queries=queries,
+                think_time=think_time, seed=seed,
+            )
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        llm_requests = server.stats["requests"]
+    return dict(summarize_run(samples, elapsed, settings), llm_requests=llm_requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark querycraft against a local mock LLM server")
+    parser.add_argument("--schema", default="pagila")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent interactive sessions")
+    parser.add_argument("--queries", type=int, default=10, help="questions per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between questions (s)")
+    parser.add_argument("--latency", default="fixed:0.05", help="mock LLM delay, e.g. lognormal:0.4,0.3")
+    parser.add_argument("--errors", help="mock LLM failures, e.g. 500:0.02,429:0.01,drop:0.005")
+    parser.add_argument("--database", action="store_true", help="also execute the SQL")
+    parser.add_argument("--cache", action="store_true", help="enable the query cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the run summary to this JSON file")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="baseline summary to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown tolerated")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    report = run(args.schema, args.sessions, args.queries, args.think_time, args.latency,
+                 args.errors, args.database, args.cache, args.seed)
+    print(format_report(report))
+    for error in report["first_errors"]:
+        print(f"  error: {error}")
+    if args.output:
+        save_report(report, args.output)
+
+    if args.update_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    baseline = load_report(args.baseline)
+    if baseline["settings"] != report["settings"]:
+        print("Warning: baseline was recorded with different settings")
+    print(f"Baseline: {format_report(baseline)}")
+    regressions = compare(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
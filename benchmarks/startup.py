@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from benchmarks.report import load_report, save_report
+
+BASELINE_PATH = Path(__file__).parent / "startup_baseline.json"
+REPO_ROOT = Path(__file__).parent.parent
+
+# Modules SQL-only commands must not load: the LLM client stack and numpy
+HEAVY_MODULES = ("groq", "httpx", "pydantic", "numpy", "dotenv")
+
+# Scenario name -> code timed in a fresh interpreter
+SCENARIOS = {
+    "import_cli": "import querycraft.__main__",
+    "sql_only": (
+        "from querycraft.utils.db_connector import DatabaseConnector\n"
+        "db = DatabaseConnector('fruitmart', use_query_cache=False)\n"
+        "db.execution_policy"
+    ),
+    "generation_ready": (
+        "from querycraft.utils.db_connector import DatabaseConnector\n"
+        "db = DatabaseConnector('fruitmart', use_query_cache=False)\n"
+        "db.groq_config.build_system_prompt()\n"
+        "db.groq_config.backend"
+    ),
+}
+
+_PROBE = """
+import sys, time, json, logging
+logging.disable(logging.CRITICAL)
+start = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"))
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code: str, repeats: int = 7) -> dict:
+    """Time ``code`` in fresh interpreters
+
+    Returns:
+        dict: Median and minimum seconds over the runs, and the heavy modules
+            the code loaded
+    """
+    env = dict(os.environ, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "startup-benchmark"))
+    runs = []
+    heavy = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        runs.append(result["seconds"])
+        heavy = result["heavy"]
+    return {"median": statistics.median(runs), "min": min(runs), "heavy_modules": heavy}
+
+
+def import_profile(module: str = "querycraft.utils.db_connector", top: int = 10) -> list:
+    """Slowest imports (cumulative microseconds) from ``python -X importtime``"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative), name.strip()))
+    return [{"module": name, "us": us} for us, name in sorted(entries, reverse=True)[:top]]
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.3) -> list:
+    """Scenarios whose median startup regressed beyond ``tolerance``, or that load heavy modules again
+
+    >>> base = {"scenarios": {"sql_only": {"median": 0.1, "heavy_modules": []}}}
+    >>> compare({"scenarios": {"sql_only": {"median": 0.2, "heavy_modules": ["numpy"]}}}, base)
+    ['sql_only median 0.2s is 100% slower than baseline 0.1s', 'sql_only now loads numpy']
+    """
+    regressions = []
+    for name, reference in baseline["scenarios"].items():
+        current = report["scenarios"].get(name)
+        if current is None:
+            continue
+        change = (current["median"] - reference["median"]) / reference["median"]
+        if change > tolerance:
+            regressions.append(f"{name} median {current['median']:.3g}s is {change:.0%} slower "
+                               f"than baseline {reference['median']:.3g}s")
+        new_heavy = sorted(set(current["heavy_modules"]) - set(reference["heavy_modules"]))
+        if new_heavy:
+            regressions.append(f"{name} now loads {', '.join(new_heavy)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure querycraft cold start in fresh interpreters")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--tolerance", type=float, default=0.3, help="relative slowdown tolerated")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    report = {"scenarios": {name: measure(code, args.repeats) for name, code in SCENARIOS.items()},
+              "slowest_imports": import_profile()}
+    for name, result in report["scenarios"].items():
+        heavy = ", ".join(result["heavy_modules"]) or "none"
+        print(f"{name:>17}: median {result['median'] * 1000:6.1f} ms, min {result['min'] * 1000:6.1f} ms "
+              f"(heavy modules: {heavy})")
+    print("Slowest imports of querycraft.utils.db_connector:")
+    for entry in report["slowest_imports"]:
+        print(f"  {entry['us'] / 1000:6.1f} ms  {entry['module']}")
+
+    if args.update_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    regressions = compare(report, load_report(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,21 @@
+import sys
 from querycraft.utils.db_connector import DatabaseConnector
 
 def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "serve":
+        from querycraft.utils.service import main as serve
+        serve(sys.argv[2:])
+        return
+    if command == "batch":
+        from querycraft.utils.batch import main as batch
+        sys.exit(batch(sys.argv[2:]))
     schema_name = input("Enter the schema name (e.g., fruitmart, pagila-hw): ").strip()
     db = DatabaseConnector(schema_name=schema_name)
-    db.interactive_mode()
+    try:
+        db.interactive_mode()
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,140 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)
+
+    >>> parse_retry_after("2.5"), parse_retry_after(None), parse_retry_after("soon")
+    (2.5, None, None)
+    >>> parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")
+    0.0
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TransientLLMError(Exception):
+    """A backend failure worth retrying (server errors, dropped connections)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        """Initialize the error
+
+        Args:
+            message (str): Description of the failure
+            retry_after (float, optional): Seconds the server asked clients to
+                wait (Retry-After header)
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitError(TransientLLMError):
+    """The provider refused the request because a rate limit was exceeded (HTTP 429)"""
+
+
+class InvalidResponseError(TransientLLMError):
+    """The backend answered, but not with usable content (e.g. prose instead of SQL)
+
+    Retried with the same backoff and attempt budget as transport errors,
+    but it does not count towards opening the circuit.
+    """
+
+
+class Completion:
+    """Text of a chat completion plus token usage when the backend reports it"""
+
+    __slots__ = ("content", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, content: str, prompt_tokens: Optional[int] = None,
+                 completion_tokens: Optional[int] = None):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMBackend(ABC):
+    """Interface between GroqConfig and a chat-completions provider
+
+    Subclasses must implement ``complete`` and ``stream``, or they cannot be
+    instantiated; ``acomplete`` defaults to running ``complete`` in a worker
+    thread.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def complete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                 seed: Optional[int] = None) -> Completion:
+        """Request a full completion
+
+        Raises:
+            TransientLLMError: On failures that may succeed when retried
+        """
+
+    @abstractmethod
+    def stream(self, messages: list, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Yield completion text as it arrives
+
+        Closing the generator early must abort the underlying request.
+        """
+
+    async def acomplete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                        seed: Optional[int] = None) -> Completion:
+        """Async variant of complete"""
+        import asyncio
+        return await asyncio.to_thread(self.complete, messages, model, temperature, max_tokens, seed)
+
+    def close(self) -> None:
+        """Release network resources"""
+
+
+BACKEND_NAMES = ("groq", "openai", "replay")
+
+
+def backend_name(name: Optional[str] = None) -> str:
+    """Backend name to use: ``name``, else QUERYCRAFT_LLM_BACKEND, else "groq"
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    name = (name or os.getenv("QUERYCRAFT_LLM_BACKEND") or "groq").lower()
+    if name not in BACKEND_NAMES:
+        raise ValueError(f"Unknown LLM backend: {name}. Available backends: {', '.join(BACKEND_NAMES)}")
+    return name
+
+
+def create_backend(name: Optional[str] = None, **kwargs) -> LLMBackend:
+    """Create a backend by name
+
+    Args:
+        name (str, optional): "groq", "openai" or "replay"; defaults to the
+            ``QUERYCRAFT_LLM_BACKEND`` environment variable, then "groq"
+        **kwargs: Passed to the backend's constructor
+
+    Returns:
+        LLMBackend: The configured backend
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    name = backend_name(name)
+    if name == "groq":
+        from querycraft.backends.groq_backend import GroqBackend
+        return GroqBackend(**kwargs)
+    if name == "openai":
+        from querycraft.backends.openai_backend import OpenAICompatibleBackend
+        return OpenAICompatibleBackend(**kwargs)
+    from querycraft.backends.replay_backend import RecordReplayBackend
+    return RecordReplayBackend(**kwargs)
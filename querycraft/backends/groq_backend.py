@@ -0,0 +1,113 @@
+import os
+from typing import Iterator, Optional
+from dotenv import load_dotenv
+import groq
+from querycraft.backends.base import LLMBackend, Completion, TransientLLMError, RateLimitError, parse_retry_after
+
+# Errors the request scheduler retries; the client's own retries are disabled
+TRANSIENT_ERRORS = (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)
+
+
+class GroqBackend(LLMBackend):
+    """Chat completions through the official Groq client"""
+
+    name = "groq"
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        """Initialize the Groq clients
+
+        Args:
+            api_key (str, optional): API key; defaults to GROQ_API_KEY
+            base_url (str, optional): Alternative endpoint (defaults to GROQ_BASE_URL or Groq's API)
+
+        Raises:
+            ValueError: If no API key is available
+        """
+        load_dotenv()
+        self.api_key = api_key or os.getenv('GROQ_API_KEY')
+        if not self.api_key:
+            raise ValueError("GROQ_API_KEY not found in environment variables")
+        self.base_url = base_url
+        self.client = groq.Groq(api_key=self.api_key, base_url=base_url, max_retries=0)
+        self._async_client = None
+
+    @property
+    def async_client(self) -> groq.AsyncGroq:
+        """AsyncGroq client, created on first use
+
+        The client binds to the event loop it is first used in, so a backend
+        should only be used for async generation within a single loop.
+        """
+        if self._async_client is None:
+            self._async_client = groq.AsyncGroq(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._async_client
+
+    @staticmethod
+    def _transient(error: Exception) -> TransientLLMError:
+        """TransientLLMError carrying the Retry-After of a Groq client error"""
+        response = getattr(error, "response", None)
+        retry_after = parse_retry_after(response.headers.get("retry-after")) if response is not None else None
+        if isinstance(error, groq.RateLimitError):
+            return RateLimitError(str(error), retry_after)
+        return TransientLLMError(str(error), retry_after)
+
+    @staticmethod
+    def _to_completion(completion) -> Completion:
+        usage = completion.usage
+        return Completion(
+            completion.choices[0].message.content or "",
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None,
+        )
+
+    def complete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                 seed: Optional[int] = None) -> Completion:
+        extra = {"seed": seed} if seed is not None else {}
+        try:
+            completion = self.client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
+            )
+        except TRANSIENT_ERRORS as e:
+            raise self._transient(e) from e
+        return self._to_completion(completion)
+
+    def stream(self, messages: list, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        try:
+            stream = self.client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+        except TRANSIENT_ERRORS as e:
+            raise self._transient(e) from e
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            stream.close()
+
+    async def acomplete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                        seed: Optional[int] = None) -> Completion:
+        extra = {"seed": seed} if seed is not None else {}
+        try:
+            completion = await self.async_client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
+            )
+        except TRANSIENT_ERRORS as e:
+            raise self._transient(e) from e
+        return self._to_completion(completion)
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,123 @@
+import os
+import json
+import asyncio
+from typing import Iterator, Optional
+import httpx
+from querycraft.backends.base import LLMBackend, Completion, TransientLLMError, RateLimitError, parse_retry_after
+
+DEFAULT_BASE_URL = "http://localhost:8000/v1"
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Chat completions over plain HTTP against any OpenAI-compatible server
+
+    Useful for local model servers (vLLM, llama.cpp, Ollama) and for the
+    mock server in ``benchmarks/``.
+    """
+
+    name = "openai"
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 timeout: float = 60.0):
+        """Initialize the HTTP clients
+
+        Args:
+            base_url (str, optional): Server root including the version prefix;
+                defaults to QUERYCRAFT_OPENAI_BASE_URL or http://localhost:8000/v1
+            api_key (str, optional): Bearer token; defaults to OPENAI_API_KEY if set
+            timeout (float): Request timeout in seconds
+        """
+        self.base_url = (base_url or os.getenv("QUERYCRAFT_OPENAI_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.timeout = timeout
+        self.client = httpx.Client(base_url=self.base_url, headers=self.headers, timeout=timeout)
+        self._async_client = None
+        self._async_loop = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """AsyncClient bound to the running event loop, recreated if the loop changes"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, headers=self.headers,
+                                                   timeout=self.timeout)
+            self._async_loop = loop
+        return self._async_client
+
+    @staticmethod
+    def _payload(messages, model, temperature, max_tokens, seed=None, stream=False) -> dict:
+        payload = {
+            "messages": messages,
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if seed is not None:
+            payload["seed"] = seed
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    @staticmethod
+    def _check(response: httpx.Response) -> None:
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        if response.status_code == 429:
+            raise RateLimitError(f"Rate limited: {response.text}", retry_after)
+        if response.status_code >= 500:
+            raise TransientLLMError(f"Server error {response.status_code}: {response.text}", retry_after)
+        if response.status_code >= 400:
+            raise Exception(f"Request failed with {response.status_code}: {response.text}")
+
+    @staticmethod
+    def _to_completion(data: dict) -> Completion:
+        usage = data.get("usage") or {}
+        return Completion(
+            data["choices"][0]["message"].get("content") or "",
+            usage.get("prompt_tokens"),
+            usage.get("completion_tokens"),
+        )
+
+    def complete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                 seed: Optional[int] = None) -> Completion:
+        try:
+            response = self.client.post(
+                "/chat/completions", json=self._payload(messages, model, temperature, max_tokens, seed)
+            )
+        except httpx.TransportError as e:
+            raise TransientLLMError(str(e)) from e
+        self._check(response)
+        return self._to_completion(response.json())
+
+    def stream(self, messages: list, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        payload = self._payload(messages, model, temperature, max_tokens, stream=True)
+        try:
+            with self.client.stream("POST", "/chat/completions", json=payload) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    self._check(response)
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        yield delta
+        except httpx.TransportError as e:
+            raise TransientLLMError(str(e)) from e
+
+    async def acomplete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                        seed: Optional[int] = None) -> Completion:
+        try:
+            response = await self._get_async_client().post(
+                "/chat/completions", json=self._payload(messages, model, temperature, max_tokens, seed)
+            )
+        except httpx.TransportError as e:
+            raise TransientLLMError(str(e)) from e
+        self._check(response)
+        return self._to_completion(response.json())
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+from querycraft.backends.base import LLMBackend, Completion, create_backend
+from querycraft.utils.cache_dir import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+MODES = ("replay", "record", "auto")
+
+
+class RecordReplayBackend(LLMBackend):
+    """Serves completions from prompt-hash fixtures for offline, deterministic runs
+
+    In "record" mode every request is forwarded to an inner backend and its
+    response saved as ``<fixtures_dir>/<hash>.json``; in "replay" mode
+    responses come only from fixtures and a missing fixture is an error;
+    "auto" replays when a fixture exists and records otherwise. The hash
+    covers the messages and every sampling parameter.
+    """
+
+    name = "replay"
+
+    def __init__(self, fixtures_dir: Optional[Path] = None, mode: Optional[str] = None,
+                 inner: Optional[LLMBackend] = None, chunk_size: int = 16):
+        """Initialize the backend
+
+        Args:
+            fixtures_dir (Path, optional): Fixture directory; defaults to
+                QUERYCRAFT_REPLAY_DIR or the querycraft cache dir
+            mode (str, optional): "replay", "record" or "auto"; defaults to
+                QUERYCRAFT_REPLAY_MODE, then "replay"
+            inner (LLMBackend, optional): Backend used when recording; defaults
+                to the Groq backend, created on first use
+            chunk_size (int): Characters per chunk when replaying streams
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        self.mode = (mode or os.getenv("QUERYCRAFT_REPLAY_MODE") or "replay").lower()
+        if self.mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        if fixtures_dir is None:
+            env_dir = os.getenv("QUERYCRAFT_REPLAY_DIR")
+            fixtures_dir = Path(env_dir) if env_dir else get_cache_dir("replay")
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        self.inner = inner
+        self.chunk_size = chunk_size
+        self.stats = {"replayed": 0, "recorded": 0}
+
+    @staticmethod
+    def prompt_hash(messages: list, model: str, temperature: float, max_tokens: int,
+                    seed: Optional[int] = None) -> str:
+        """Fixture key for a request"""
+        payload = json.dumps(
+            {"messages": messages, "model": model, "temperature": temperature,
+             "max_tokens": max_tokens, "seed": seed},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _fixture_path(self, key: str) -> Path:
+        return self.fixtures_dir / f"{key}.json"
+
+    def _replay(self, key: str) -> Optional[Completion]:
+        path = self._fixture_path(key)
+        if not path.exists():
+            return None
+        with open(path, 'r') as f:
+            fixture = json.load(f)
+        self.stats["replayed"] += 1
+        usage = fixture.get("usage") or {}
+        return Completion(fixture["content"], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+    def _record(self, key: str, request: dict, completion: Completion) -> None:
+        fixture = {
+            "request": request,
+            "content": completion.content,
+            "usage": {"prompt_tokens": completion.prompt_tokens,
+                      "completion_tokens": completion.completion_tokens},
+        }
+        path = self._fixture_path(key)
+        # A unique temporary file, so concurrent recorders cannot move each other's file away
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(fixture, f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.stats["recorded"] += 1
+
+    def complete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                 seed: Optional[int] = None) -> Completion:
+        key = self.prompt_hash(messages, model, temperature, max_tokens, seed)
+        if self.mode != "record":
+            completion = self._replay(key)
+            if completion is not None:
+                return completion
+            if self.mode == "replay":
+                raise Exception(f"No recorded response for prompt hash {key} in {self.fixtures_dir}")
+
+        if self.inner is None:
+            self.inner = create_backend("groq")
+        completion = self.inner.complete(messages, model, temperature, max_tokens, seed)
+        request = {"messages": messages, "model": model, "temperature": temperature,
+                   "max_tokens": max_tokens, "seed": seed}
+        self._record(key, request, completion)
+        return completion
+
+    def stream(self, messages: list, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        content = self.complete(messages, model, temperature, max_tokens).content
+        for i in range(0, len(content), self.chunk_size):
+            yield content[i:i + self.chunk_size]
+
+    async def acomplete(self, messages: list, model: str, temperature: float, max_tokens: int,
+                        seed: Optional[int] = None) -> Completion:
+        key = self.prompt_hash(messages, model, temperature, max_tokens, seed)
+        if self.mode == "replay" or (self.mode == "auto" and self._fixture_path(key).exists()):
+            # Replaying is a local file read; no need for a worker thread
+            return self.complete(messages, model, temperature, max_tokens, seed)
+        return await super().acomplete(messages, model, temperature, max_tokens, seed)
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
@@ -1,12 +1,20 @@
 import os
 import time
 import logging
-from dotenv import load_dotenv
-import groq
 import re
+import hashlib
+import threading
 from querycraft.utils.schema_loader import SchemaLoader
-from typing import Optional
-from groq import InternalServerError
+from querycraft.utils.schema_retriever import SchemaRetriever, estimate_tokens
+from querycraft.utils.live_catalog import LiveCatalog
+from querycraft.utils.catalog import SchemaCatalog
+from querycraft.utils.schema_renderer import render_schema
+from querycraft.utils.sql_validator import SqlValidator
+from querycraft.utils.sql_lexer import find_statement_end
+from querycraft.utils.tracing import tracer
+from querycraft.utils.llm_scheduler import RequestScheduler, scheduler as shared_scheduler
+from querycraft.backends.base import LLMBackend, TransientLLMError, InvalidResponseError, backend_name, create_backend
+from typing import Optional, Union
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,36 +25,111 @@ class GroqConfig:
         "pagila-hw2": "pagila",
         "pagila-hw3": "pagila"
     }
+    MODEL = "llama-3.1-8b-instant"
+    TEMPERATURE = 0.05
+    MAX_TOKENS = 1000
+    SQL_STARTERS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+    SCHEMA_FORMATS = ("ddl", "compact")
+
+    # Assembled system prompts shared by every instance, keyed by base schema:
+    # base schema -> (schema fingerprint, prompt)
+    _prompt_cache = {}
+    _prompt_cache_lock = threading.Lock()
+    _prompt_cache_stats = {"hits": 0, "misses": 0}
     
-    def __init__(self, schema_name: str, max_retries: int = 3, retry_delay: float = 1.0):
+    def __init__(self, schema_name: str, max_retries: int = 3, retry_delay: float = 1.0,
+                 retrieval_top_k: Optional[int] = None, schema_token_budget: Optional[int] = None,
+                 example_top_k: Optional[int] = None, example_token_budget: Optional[int] = None,
+                 base_url: Optional[str] = None, stream: bool = False,
+                 backend: Optional[Union[LLMBackend, str]] = None,
+                 live_catalog: Optional[LiveCatalog] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 schema_format: Optional[str] = None):
         """Initialize GroqConfig with a specific schema
         
         Args:
             schema_name (str): Name of the schema to use
+            retrieval_top_k (int, optional): If set, only the top-k tables relevant
+                to each question (plus their join partners) are put in the prompt
+                instead of the whole schema file
+            schema_token_budget (int, optional): Maximum estimated tokens of
+                retrieved schema DDL per prompt; in compact format, maximum
+                tokens of the schema section, with or without retrieval
+            example_top_k (int, optional): If set, only the k example queries most
+                similar to each question are put in the prompt instead of all of them
+            example_token_budget (int, optional): Maximum estimated tokens of
+                selected examples per prompt
+            base_url (str, optional): Alternative chat-completions endpoint,
+                e.g. a local mock server (defaults to GROQ_BASE_URL or Groq's API)
+            stream (bool): Stream completions, stopping at the end of the first
+                complete statement or as soon as the response cannot be SQL
+            backend (LLMBackend or str, optional): Backend instance or name
+                ("groq", "openai", "replay"); defaults to QUERYCRAFT_LLM_BACKEND,
+                then "groq"
+            live_catalog (LiveCatalog, optional): Build the schema section from
+                the running database instead of the schema's .sql file
+            scheduler (RequestScheduler, optional): Budget, backoff and circuit
+                breaker for LLM calls; defaults to the process-wide scheduler.
+                Transient failures are retried up to max_retries attempts per
+                call, with backoff starting at retry_delay seconds
+            schema_format (str, optional): "ddl" puts the schema's DDL in
+                prompts, "compact" one ``table(col type pk, col→table.col)``
+                line per relation (see schema_renderer); defaults to
+                QUERYCRAFT_SCHEMA_FORMAT, then "ddl"
             
         Raises:
-            ValueError: If no schema_name is provided or API key is missing
+            ValueError: If no schema_name is provided or the backend or
+                schema format is unknown. The backend itself (and the Groq
+                client, which needs GROQ_API_KEY) is only created on first use
         """
-        load_dotenv()
-        self.api_key = os.getenv('GROQ_API_KEY')
-        if not self.api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables")
-        
-        self.client = groq.Groq(api_key=self.api_key)
-       
-        available_schemas = SchemaLoader.list_available_schemas()
+        self.base_url = base_url
+        if isinstance(backend, LLMBackend):
+            self._backend = backend
+            self.backend_name = backend.name
+        else:
+            self._backend = None
+            self.backend_name = backend_name(backend)
+        self._backend_lock = threading.Lock()
+        schema_format = (schema_format or os.getenv("QUERYCRAFT_SCHEMA_FORMAT") or "ddl").lower()
+        if schema_format not in self.SCHEMA_FORMATS:
+            raise ValueError(f"schema_format must be one of: {', '.join(self.SCHEMA_FORMATS)}")
+        self.schema_format = schema_format
+        self.scheduler = scheduler or shared_scheduler
 
         if schema_name is None:
             raise ValueError(
                 "Schema name must be provided. "
-                f"Available schemas: {', '.join(available_schemas)}"
+                f"Available schemas: {', '.join(SchemaLoader.list_available_schemas())}"
             )
         
         base_schema_name = self.SCHEMA_MAPPING.get(schema_name, schema_name)
         self.schema_name = schema_name
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.retrieval_top_k = retrieval_top_k
+        self.schema_token_budget = schema_token_budget
+        self.example_top_k = example_top_k
+        self.example_token_budget = example_token_budget
+        self.stream = stream
+        self.live_catalog = live_catalog
         self.schema_loader = SchemaLoader(schema_name=base_schema_name)
+        self._validator = None
+
+    @property
+    def backend(self) -> LLMBackend:
+        """LLM backend, created on first use so SQL-only callers never import
+        or configure an LLM client"""
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    backend_kwargs = {"base_url": self.base_url} if self.base_url else {}
+                    self._backend = create_backend(self.backend_name, **backend_kwargs)
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend: LLMBackend) -> None:
+        self._backend = backend
+        self.backend_name = backend.name
 
     @staticmethod
     def _is_valid_sql(response: str) -> bool:
@@ -75,8 +158,26 @@ class GroqConfig:
         False
         """
         cleaned = response.strip().upper()
-        sql_starters = ['SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH']
-        return any(cleaned.startswith(keyword) for keyword in sql_starters)
+        return any(cleaned.startswith(keyword) for keyword in GroqConfig.SQL_STARTERS)
+
+    @staticmethod
+    def _could_be_sql(prefix: str) -> bool:
+        """Check if a partial response can still become valid SQL
+
+        >>> from querycraft.config.groq_config import GroqConfig
+        >>> GroqConfig._could_be_sql("  SEL")
+        True
+        >>> GroqConfig._could_be_sql("SELECT name")
+        True
+        >>> GroqConfig._could_be_sql("Here")
+        False
+        >>> GroqConfig._could_be_sql("```")
+        False
+        >>> GroqConfig._could_be_sql("")
+        True
+        """
+        cleaned = prefix.lstrip().upper()
+        return any(cleaned[:len(keyword)] == keyword[:len(cleaned)] for keyword in GroqConfig.SQL_STARTERS)
     
     def _clean_sql(self, sql: str) -> str:
         """Clean and standardize SQL query
@@ -108,70 +209,393 @@ class GroqConfig:
     
         return sql
 
-    def generate_sql(self, prompt: str) -> str:
+    @staticmethod
+    def _render_system_prompt(schema_context: str, examples: str) -> str:
+        """Fill the system prompt template"""
+        return f"""You are a SQL expert. Use this schema:
+
+{schema_context}
+
+Example queries:
+{examples}
+
+IMPORTANT:
+1. Return ONLY the raw SQL query - no markdown formatting, no explanations
+2. Do not wrap the query in ```sql``` blocks
+3. Do not include any text like "Here is the query:"
+4. Always use ILIKE instead of LIKE for case-insensitive text matching
+5. Always end queries with a semicolon
+6. Use simple ORDER BY without ASC (it's the default)
+7. Ensure exact schema column names are used
+8. Always specify the table name in the FROM clause
+9. Never use BETWEEN for date ranges - use >= and < instead
+10. Use subqueries only if absolutely necessary."""
+
+    def build_system_prompt(self, question: Optional[str] = None) -> str:
+        """Build the system prompt for this config's base schema
+
+        Without retrieval, the prompt is assembled once per base schema and
+        shared across instances (so pagila-hw, pagila-hw2 and pagila-hw3 reuse
+        the pagila entry). It is rebuilt only when the schema's SQL or YAML
+        content changes.
+
+        With retrieval or example selection enabled and a question given, the
+        schema section only contains the tables relevant to that question and
+        the examples section only the most similar examples.
+
+        Args:
+            question (str, optional): Question the prompt is built for
+
+        Returns:
+            str: System prompt containing the schema and example queries
+        """
+        if question is not None and (self.retrieval_top_k or self.example_top_k):
+            if self.retrieval_top_k:
+                if self.live_catalog is not None:
+                    catalog, live_fingerprint = self.live_catalog.get()
+                    retriever = SchemaRetriever.for_catalog(catalog, self.live_catalog.cache_key, live_fingerprint)
+                else:
+                    retriever = SchemaRetriever.for_schema(self.schema_loader)
+                if self.schema_format == "compact":
+                    relations = retriever.retrieve(question, top_k=self.retrieval_top_k)
+                    schema_context = render_schema(self.schema_catalog(), relations or None,
+                                                   token_budget=self.schema_token_budget)
+                else:
+                    schema_context = retriever.retrieve_context(
+                        question, top_k=self.retrieval_top_k, token_budget=self.schema_token_budget
+                    )
+            else:
+                schema_context = self._schema_context()
+            if self.example_top_k:
+                # Imported here: it needs numpy, which SQL-only callers never load
+                from querycraft.utils.example_selector import ExampleSelector
+                selector = ExampleSelector.for_schema(self.schema_loader)
+                examples = selector.format_examples(
+                    question, k=self.example_top_k, token_budget=self.example_token_budget
+                )
+            else:
+                examples = self.schema_loader.get_examples()
+            return self._render_system_prompt(schema_context, examples)
+
+        base_schema_name = self.schema_loader.schema_name
+        if self.live_catalog is not None:
+            base_schema_name = f"live:{self.live_catalog.cache_key}"
+        if self.schema_format != "ddl":
+            base_schema_name = f"{base_schema_name}:{self.schema_format}:{self.schema_token_budget}"
+        fingerprint = self.schema_fingerprint()
+
+        with self._prompt_cache_lock:
+            entry = self._prompt_cache.get(base_schema_name)
+            if entry and entry[0] == fingerprint:
+                self._prompt_cache_stats["hits"] += 1
+                tracer.current_span().set(prompt_cache="hit")
+                return entry[1]
+            self._prompt_cache_stats["misses"] += 1
+        tracer.current_span().set(prompt_cache="miss")
+
+        with tracer.span("load_schema"):
+            schema_context = self._schema_context()
+            examples = self.schema_loader.get_examples()
+        system_prompt = self._render_system_prompt(schema_context, examples)
+
+        with self._prompt_cache_lock:
+            self._prompt_cache[base_schema_name] = (fingerprint, system_prompt)
+        return system_prompt
+
+    def _schema_context(self) -> str:
+        """Full schema section: the live catalog's DDL or the schema file, or
+        the compact rendering of either"""
+        if self.schema_format == "compact":
+            return render_schema(self.schema_catalog(), token_budget=self.schema_token_budget)
+        if self.live_catalog is not None:
+            return self.live_catalog.schema_context()
+        return self.schema_loader.load_schema()
+
+    def schema_catalog(self) -> SchemaCatalog:
+        """Structured catalog of the tables generated SQL may reference"""
+        if self.live_catalog is not None:
+            return self.live_catalog.catalog()
+        return SchemaCatalog.for_schema(self.schema_loader)
+
+    def sql_validator(self) -> SqlValidator:
+        """Validator for the current catalog, rebuilt when the catalog changes"""
+        catalog = self.schema_catalog()
+        validator = self._validator
+        if validator is None or validator.catalog is not catalog:
+            validator = self._validator = SqlValidator(catalog)
+        return validator
+
+    def schema_fingerprint(self) -> str:
+        """Hash identifying the schema and examples the prompt is built from
+
+        In live mode this combines the database catalog fingerprint with the
+        example YAML, so no .sql file is needed.
+        """
+        if self.live_catalog is None:
+            return self.schema_loader.fingerprint()
+        _, live_fingerprint = self.live_catalog.get()
+        yaml_path = self.schema_loader.yaml_path
+        yaml_digest = self.schema_loader._read_file(yaml_path)[1] if yaml_path.exists() else ""
+        return hashlib.sha256(f"live:{live_fingerprint}:{yaml_digest}".encode()).hexdigest()
+
+    @classmethod
+    def prompt_cache_stats(cls) -> dict:
+        """Hit/miss counters of the shared system prompt cache"""
+        with cls._prompt_cache_lock:
+            return dict(cls._prompt_cache_stats, entries=len(cls._prompt_cache))
+
+    @classmethod
+    def clear_prompt_cache(cls) -> None:
+        """Drop all cached system prompts and reset the counters"""
+        with cls._prompt_cache_lock:
+            cls._prompt_cache.clear()
+            cls._prompt_cache_stats.update(hits=0, misses=0)
+
+    def cache_params(self) -> dict:
+        """Settings that change the generated SQL, for use in cache keys"""
+        return {
+            "backend": self.backend_name,
+            "model": self.MODEL,
+            "temperature": self.TEMPERATURE,
+            "max_tokens": self.MAX_TOKENS,
+            "retrieval_top_k": self.retrieval_top_k,
+            "schema_token_budget": self.schema_token_budget,
+            "schema_format": self.schema_format,
+            "example_top_k": self.example_top_k,
+            "example_token_budget": self.example_token_budget,
+        }
+
+    def _schedule(self, request, estimated_tokens: int = 0, max_attempts: Optional[int] = None):
+        """Run one LLM request through the scheduler"""
+        return self.scheduler.call(
+            request, estimated_tokens, key=self.backend.name,
+            max_attempts=self.max_retries if max_attempts is None else max_attempts,
+            base_delay=self.retry_delay
+        )
+
+    def generate_sql(self, prompt: str, history: Optional[list] = None) -> str:
         """
         Generate SQL query from natural language prompt
         
         Args:
+            prompt (str): Natural language question
+            history (list, optional): Chat messages appended after the
+                question, e.g. a rejected query and why it was rejected
         Returns:
             str: Generated SQL query
         """
-        last_exception = None
-        for attempt in range(self.max_retries):
-            try:
-                schema_context = self.schema_loader.load_schema()
-                examples = self.schema_loader.get_examples()
+        if self.stream:
+            return self.generate_sql_stream(prompt, history)[0]
 
-                system_prompt = f"""You are a SQL expert. Use this schema:
-
-                {schema_context}
-
-                Example queries:
-                {examples}
-
-                IMPORTANT:
-                1. Return ONLY the raw SQL query - no markdown formatting, no explanations
-                2. Do not wrap the query in ```sql``` blocks
-                3. Do not include any text like "Here is the query:"
-                4. Always use ILIKE instead of LIKE for case-insensitive text matching
-                5. Always end queries with a semicolon
-                6. Use simple ORDER BY without ASC (it's the default)
-                7. Ensure exact schema column names are used
-                8. Always specify the table name in the FROM clause
-                9. Never use BETWEEN for date ranges - use >= and < instead
-                10. Use subqueries only if absolutely necessary."""
-                
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ]
-
-
-                completion = self.client.chat.completions.create(
-                    messages=messages,
-                    model="llama-3.1-8b-instant",
-                    temperature=0.05,
-                    max_tokens=1000
-                )
+        try:
+            with tracer.span("build_prompt"):
+                system_prompt = self.build_system_prompt(prompt)
+        except Exception as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ] + (history or [])
+        estimated_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+
+        def request():
+            with tracer.span("llm_call") as span:
+                completion = self.backend.complete(messages, self.MODEL, self.TEMPERATURE, self.MAX_TOKENS)
+                span.set(prompt_tokens=completion.prompt_tokens,
+                         completion_tokens=completion.completion_tokens)
+            if not self._is_valid_sql(completion.content):
+                raise InvalidResponseError("LLM response is not a valid SQL query")
+            return completion
+
+        try:
+            completion = self._schedule(request, estimated_tokens)
+            with tracer.span("clean_sql"):
+                return self._clean_sql(completion.content.strip())
+        except InvalidResponseError as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+        except TransientLLMError as e:
+            raise Exception(f"Error after {self.max_retries} retries: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+
+    def generate_candidate(self, prompt: str, temperature: Optional[float] = None,
+                           seed: Optional[int] = None) -> Optional[str]:
+        """
+        Request a single SQL candidate without retrying
+
+        Used for speculative generation, where several candidates with
+        different sampling settings are requested concurrently.
+
+        Args:
+            prompt (str): Natural language question
+            temperature (float, optional): Sampling temperature (defaults to TEMPERATURE)
+            seed (int, optional): Sampling seed
+        Returns:
+            str: Cleaned SQL, or None if the response is not a valid SQL query
+        """
+        messages = [
+            {"role": "system", "content": self.build_system_prompt(prompt)},
+            {"role": "user", "content": prompt}
+        ]
+        with tracer.span("llm_call", seed=seed) as span:
+            completion = self._schedule(
+                lambda: self.backend.complete(
+                    messages,
+                    self.MODEL,
+                    self.TEMPERATURE if temperature is None else temperature,
+                    self.MAX_TOKENS,
+                    seed=seed
+                ),
+                sum(estimate_tokens(message["content"]) for message in messages),
+                max_attempts=1
+            )
+            span.set(prompt_tokens=completion.prompt_tokens,
+                     completion_tokens=completion.completion_tokens)
+        response = completion.content.strip()
+        if not self._is_valid_sql(response):
+            return None
+        return self._clean_sql(response)
+
+    def _stream_completion(self, messages: list) -> tuple:
+        """Stream one completion, stopping as early as the content allows
+
+        Returns:
+            tuple: (response text, stats dict with ttft, latency and stop_reason)
+        """
+        start = time.perf_counter()
+        ttft = None
+        text = ""
+        stop_reason = "complete"
+        # Once this much non-whitespace text has arrived, the statement keyword is known
+        decided_at = max(len(keyword) for keyword in self.SQL_STARTERS)
+        prefix_checked = False
+        stream = self.backend.stream(messages, self.MODEL, self.TEMPERATURE, self.MAX_TOKENS)
+        try:
+            for delta in stream:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                text += delta
+
+                if not prefix_checked:
+                    if not self._could_be_sql(text):
+                        stop_reason = "not_sql"
+                        break
+                    prefix_checked = len(text.lstrip()) >= decided_at
+                if ';' in delta:
+                    end = find_statement_end(text)
+                    if end != -1:
+                        text = text[:end]
+                        stop_reason = "statement_end"
+                        break
+        finally:
+            stream.close()
 
-                response = completion.choices[0].message.content.strip()
+        return text.strip(), {
+            "ttft": ttft,
+            "latency": time.perf_counter() - start,
+            "stop_reason": stop_reason,
+        }
 
-                if not self._is_valid_sql(response):
-                    if attempt < self.max_retries - 1:
-                        continue
-                    raise Exception("LLM response is not a valid SQL query")
-                
-                return self._clean_sql(response)
+    def generate_sql_stream(self, prompt: str, history: Optional[list] = None) -> tuple:
+        """
+        Generate SQL with streamed completions
 
-            except InternalServerError as e:
-                last_exception = e
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                continue
-            except Exception as e:
-                raise Exception(f"Error generating SQL: {str(e)}")
+        Each attempt is validated while tokens arrive: it is abandoned as soon
+        as the response cannot be SQL (so the retry starts sooner) and cut off
+        at the semicolon ending the first complete statement.
 
-        raise Exception(f"Error after {self.max_retries} retries: {str(last_exception)}")
+        Args:
+            prompt (str): Natural language question
+            history (list, optional): Chat messages appended after the question
+        Returns:
+            tuple: (generated SQL, stats dict with ttft of the accepted attempt,
+                total latency, attempts and early stops)
+        """
+        try:
+            with tracer.span("build_prompt"):
+                system_prompt = self.build_system_prompt(prompt)
+        except Exception as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ] + (history or [])
+        estimated_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        start = time.perf_counter()
+        stats = {"ttft": None, "latency": 0.0, "attempts": 0, "early_stops": 0}
+
+        def request():
+            stats["attempts"] += 1
+            with tracer.span("llm_stream") as span:
+                response, attempt_stats = self._stream_completion(messages)
+                span.set(ttft=attempt_stats["ttft"], stop_reason=attempt_stats["stop_reason"])
+            if attempt_stats["stop_reason"] != "complete":
+                stats["early_stops"] += 1
+            stats["ttft"] = attempt_stats["ttft"]
+            if not self._is_valid_sql(response):
+                raise InvalidResponseError("LLM response is not a valid SQL query")
+            return response
+
+        try:
+            response = self._schedule(request, estimated_tokens)
+        except InvalidResponseError as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+        except TransientLLMError as e:
+            raise Exception(f"Error after {self.max_retries} retries: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+
+        stats["latency"] = time.perf_counter() - start
+        logger.info(
+            f"Streamed SQL in {stats['latency']:.3f}s "
+            f"(ttft {stats['ttft'] or 0:.3f}s, {stats['attempts']} attempt(s))"
+        )
+        return self._clean_sql(response), stats
+
+    async def agenerate_sql(self, prompt: str) -> str:
+        """
+        Generate SQL query from natural language prompt without blocking the event loop
+
+        Args:
+            prompt (str): Natural language question
+        Returns:
+            str: Generated SQL query
+        """
+        try:
+            with tracer.span("build_prompt"):
+                system_prompt = self.build_system_prompt(prompt)
+        except Exception as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        estimated_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+
+        async def request():
+            with tracer.span("llm_call") as span:
+                completion = await self.backend.acomplete(messages, self.MODEL, self.TEMPERATURE, self.MAX_TOKENS)
+                span.set(prompt_tokens=completion.prompt_tokens,
+                         completion_tokens=completion.completion_tokens)
+            if not self._is_valid_sql(completion.content):
+                raise InvalidResponseError("LLM response is not a valid SQL query")
+            return completion
+
+        try:
+            completion = await self.scheduler.acall(
+                request, estimated_tokens, key=self.backend.name,
+                max_attempts=self.max_retries, base_delay=self.retry_delay
+            )
+            return self._clean_sql(completion.content.strip())
+        except InvalidResponseError as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
+        except TransientLLMError as e:
+            raise Exception(f"Error after {self.max_retries} retries: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error generating SQL: {str(e)}")
 
     def test_connection(self) -> bool:
         """Test if Groq API connection is working"""
@@ -0,0 +1,216 @@
+import sys
+import json
+import time
+import argparse
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.query_cache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+
+def parse_record(line: str, line_no: int, default_schema: Optional[str] = None) -> dict:
+    """Question record from one JSONL input line
+
+    A line is either a JSON string (the question) or an object with
+    ``question`` and optionally ``schema`` and ``id``. Records without an id
+    are identified by their line number, which is what resuming relies on.
+
+    >>> parse_record('{"question": "How many films?", "schema": "pagila"}', 3)
+    {'id': '3', 'schema': 'pagila', 'question': 'How many films?'}
+    >>> parse_record('"How many baskets?"', 1, default_schema="fruitmart")["schema"]
+    'fruitmart'
+
+    Raises:
+        ValueError: If the line is not valid JSON or lacks a question or schema
+    """
+    record = json.loads(line)
+    if isinstance(record, str):
+        record = {"question": record}
+    if not isinstance(record, dict) or not isinstance(record.get("question"), str) or not record["question"].strip():
+        raise ValueError("record must be a JSON string or an object with a question")
+    schema_name = record.get("schema") or default_schema
+    if not schema_name:
+        raise ValueError("record has no schema and no default schema was given")
+    return {"id": str(record.get("id", line_no)), "schema": schema_name, "question": record["question"].strip()}
+
+
+def completed_ids(path) -> set:
+    """Ids of questions answered without error in an existing output file
+
+    Lines cut short by an interrupted run are ignored, as are failed
+    records, so resuming retries them.
+    """
+    done = set()
+    path = Path(path)
+    if not path.exists():
+        return done
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "id" in record:
+                if record.get("error") is None:
+                    done.add(record["id"])
+                else:
+                    done.discard(record["id"])
+    return done
+
+
+def answer(connector, record: dict, bypass_cache: bool = False, row_limit: Optional[int] = None) -> dict:
+    """Result record for one question; failures are recorded, not raised"""
+    start = time.perf_counter()
+    result = dict(record, sql_query=None, result=None, cache_hit=False, error=None)
+    try:
+        response = connector.execute_natural_query(record["question"], bypass_cache=bypass_cache,
+                                                   row_limit=row_limit)
+        result.update(sql_query=response["sql_query"], result=response["result"],
+                      cache_hit=response["cache_hit"])
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(lines: Iterable[str], connector_for: Callable, write: Callable, workers: int = 4,
+              default_schema: Optional[str] = None, done: Optional[set] = None,
+              bypass_cache: bool = False, row_limit: Optional[int] = None) -> dict:
+    """Answer questions read from JSONL lines, writing each result as soon as it finishes
+
+    Input is consumed lazily: at most ``2 * workers`` questions are in
+    flight, so arbitrarily large inputs run in constant memory. Results are
+    written from the worker that finishes them, in completion order rather
+    than input order, and ``write`` is never called concurrently.
+
+    Args:
+        lines (iterable): JSONL input (see parse_record)
+        connector_for (callable): Schema name -> DatabaseConnector (or any
+            object with ``execute_natural_query``); called once per schema
+        write (callable): Called with each result record
+        workers (int): Questions answered at the same time
+        default_schema (str, optional): Schema of records that name none
+        done (set, optional): Ids to skip, e.g. from completed_ids
+        bypass_cache (bool): Regenerate SQL even if it is cached
+        row_limit (int, optional): Return at most this many rows per question
+
+    Returns:
+        dict: Counts of answered, failed and skipped questions and the elapsed time
+    """
+    done = done or set()
+    stats = {"answered": 0, "errors": 0, "skipped": 0}
+    connectors = {}
+    start = time.perf_counter()
+
+    lock = threading.Lock()
+    write_errors = []
+
+    def finish(result):
+        with lock:
+            write(result)
+            stats["errors" if result["error"] is not None else "answered"] += 1
+
+    def on_done(future):
+        if future.cancelled():
+            return
+        try:
+            finish(future.result())
+        except Exception as e:
+            # Raised again in the caller once the workers are done
+            write_errors.append(e)
+
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for line_no, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = parse_record(line, line_no, default_schema)
+                except ValueError as e:
+                    finish({"id": str(line_no), "error": f"Invalid record: {e}"})
+                    continue
+                if record["id"] in done:
+                    stats["skipped"] += 1
+                    continue
+                if record["schema"] not in connectors:
+                    try:
+                        connectors[record["schema"]] = connector_for(record["schema"])
+                    except Exception as e:
+                        finish(dict(record, error=f"Could not open schema: {e}"))
+                        continue
+                future = executor.submit(answer, connectors[record["schema"]], record, bypass_cache, row_limit)
+                future.add_done_callback(on_done)
+                pending.add(future)
+                if len(pending) >= 2 * workers:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        except KeyboardInterrupt:
+            # Drop queued questions; the ones already running are still
+            # recorded as they finish, so the output file is a complete checkpoint
+            for future in pending:
+                future.cancel()
+            logger.warning("Interrupted; rerun with --resume to continue")
+            raise
+    if write_errors:
+        raise write_errors[0]
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m querycraft batch",
+                                     description="Answer questions from a JSONL file, one JSON result per line")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL questions (default: stdin)")
+    parser.add_argument("--output", "-o", help="JSONL results (default: stdout)")
+    parser.add_argument("--schema", help="schema for records that do not name one")
+    parser.add_argument("--workers", type=int, default=4, help="questions answered at the same time")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip questions already answered in the output file; retry failed ones")
+    parser.add_argument("--no-cache", action="store_true", help="regenerate SQL even if it is cached")
+    parser.add_argument("--row-limit", type=int, help="return at most this many rows per question")
+    args = parser.parse_args(argv)
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    done = completed_ids(args.output) if args.resume else set()
+    query_cache = QueryCache()
+
+    def connector_for(schema_name):
+        return DatabaseConnector(schema_name=schema_name, query_cache=query_cache)
+
+    source = sys.stdin if args.input == "-" else open(args.input, 'r')
+    if args.output:
+        path = Path(args.output)
+        sink = open(path, 'a' if args.resume else 'w')
+        if sink.tell() > 0:
+            # A crash can leave half a line; start the next record on a fresh one
+            with open(path, 'rb') as f:
+                f.seek(-1, 2)
+                if f.read(1) != b"\n":
+                    sink.write("\n")
+    else:
+        sink = sys.stdout
+
+    def write(result):
+        sink.write(json.dumps(result, default=str) + "\n")
+        sink.flush()
+
+    try:
+        stats = run_batch(source, connector_for, write, workers=args.workers, default_schema=args.schema,
+                          done=done, bypass_cache=args.no_cache, row_limit=args.row_limit)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        query_cache.close()
+    print(f"{stats['answered']} answered, {stats['errors']} failed, {stats['skipped']} skipped "
+          f"in {stats['elapsed']:.1f}s", file=sys.stderr)
+    return 1 if stats["errors"] else 0
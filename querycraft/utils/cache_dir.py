@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    """Per-user cache directory: ``$XDG_CACHE_HOME/querycraft``, or ``~/.cache/querycraft``"""
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "querycraft"
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """Directory for querycraft's on-disk caches, created on demand
+
+    Defaults to the per-user cache directory (see ``default_cache_dir``), so
+    caches are shared between working directories and never land in a
+    checkout. The ``QUERYCRAFT_CACHE_DIR`` environment variable moves it.
+
+    Args:
+        *parts (str): Optional subdirectory components
+
+    Returns:
+        Path: The (existing) cache directory
+    """
+    path = Path(os.getenv("QUERYCRAFT_CACHE_DIR") or default_cache_dir()).joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,798 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from querycraft.utils.cache_dir import get_cache_dir
+from querycraft.utils.sql_lexer import significant_tokens, statement_tables
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parser or artifact layout changes so old artifacts are rebuilt
+CATALOG_FORMAT_VERSION = 2
+
+# Next character sequence that can change the scanner state outside literals
+_SPECIAL = re.compile(r"--|/\*|'|\"|\$(?:[A-Za-z_]\w*)?\$|;")
+_BLOCK_COMMENT = re.compile(r"/\*|\*/")
+_STANDARD_STRING_END = re.compile(r"''|'")
+_ESCAPE_STRING_END = re.compile(r"\\.|''|'", re.DOTALL)
+_LEADING_WORD = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*([A-Za-z]+)", re.DOTALL)
+_COPY_FROM_STDIN = re.compile(r"\bFROM\s+stdin\b", re.IGNORECASE)
+
+# Statements the catalog reads; everything else is skipped without tokenizing
+_CATALOG_STATEMENTS = {"create", "alter", "comment"}
+# Words that end a column's type and start its constraints
+_COLUMN_CONSTRAINT_WORDS = {
+    "not", "null", "default", "primary", "references", "constraint", "check", "unique",
+    "collate", "generated",
+}
+_TABLE_CONSTRAINT_WORDS = {"constraint", "primary", "foreign", "unique", "check", "exclude", "like"}
+
+
+def iter_statements(lines: Iterable[str]) -> Iterator[str]:
+    """Split SQL into statements in a single streaming pass
+
+    Semicolons inside string literals, quoted identifiers, dollar-quoted
+    bodies and comments do not end a statement, and the data section that
+    follows ``COPY ... FROM stdin`` in pg_dump output is skipped. Only the
+    current statement is held in memory, so arbitrarily large dumps can be
+    read line by line.
+
+    >>> list(iter_statements(["SELECT ';' AS x; -- done;\\n", "CREATE TABLE t (a int);"]))
+    ["SELECT ';' AS x;", '-- done;\\nCREATE TABLE t (a int);']
+    >>> list(iter_statements(["COPY t (a) FROM stdin;\\n", "1;2\\n", "\\\\.\\n", "SELECT 1;\\n"]))
+    ['COPY t (a) FROM stdin;', 'SELECT 1;']
+    """
+    buffer = []
+    state = None  # None, "'", "E'", '"', "/*" or a dollar-quote tag
+    comment_depth = 0
+    copy_data = False
+
+    for line in lines:
+        if copy_data:
+            if line.rstrip("\r\n") == "\\.":
+                copy_data = False
+            continue
+
+        start = 0
+        pos = 0
+        while pos < len(line):
+            if state is None:
+                match = _SPECIAL.search(line, pos)
+                if match is None:
+                    break
+                token = match.group()
+                pos = match.end()
+                if token == "--":
+                    break
+                if token == "/*":
+                    state, comment_depth = "/*", 1
+                elif token == "'":
+                    escaped = match.start() > 0 and line[match.start() - 1] in "Ee" and \
+                        (match.start() < 2 or not (line[match.start() - 2].isalnum() or line[match.start() - 2] == "_"))
+                    state = "E'" if escaped else "'"
+                elif token == '"':
+                    state = '"'
+                elif token.startswith("$"):
+                    state = token
+                else:
+                    buffer.append(line[start:pos])
+                    statement = "".join(buffer).strip()
+                    buffer = []
+                    start = pos
+                    if statement:
+                        yield statement
+                        if re.match(r"COPY\b", statement, re.IGNORECASE) and _COPY_FROM_STDIN.search(statement):
+                            copy_data = True
+                            start = len(line)
+                            break
+            elif state in ("'", "E'"):
+                pattern = _ESCAPE_STRING_END if state == "E'" else _STANDARD_STRING_END
+                while True:
+                    match = pattern.search(line, pos)
+                    if match is None:
+                        pos = len(line)
+                        break
+                    pos = match.end()
+                    if match.group() == "'":
+                        state = None
+                        break
+            elif state == '"':
+                end = line.find('"', pos)
+                while end != -1 and line[end + 1:end + 2] == '"':
+                    end = line.find('"', end + 2)
+                if end == -1:
+                    pos = len(line)
+                else:
+                    pos, state = end + 1, None
+            elif state == "/*":
+                match = _BLOCK_COMMENT.search(line, pos)
+                if match is None:
+                    pos = len(line)
+                else:
+                    pos = match.end()
+                    comment_depth += 1 if match.group() == "/*" else -1
+                    if comment_depth == 0:
+                        state = None
+            else:
+                end = line.find(state, pos)
+                if end == -1:
+                    pos = len(line)
+                else:
+                    pos, state = end + len(state), None
+
+        if start < len(line):
+            buffer.append(line[start:])
+
+    statement = "".join(buffer).strip()
+    if statement and significant_tokens(statement):
+        yield statement
+
+
+def _unquote(value: str) -> str:
+    if value.startswith('"'):
+        return value[1:-1].replace('""', '"')
+    return value.lower()
+
+
+def _join(tokens: list) -> str:
+    """Render tokens back into compact SQL text
+
+    >>> _join(significant_tokens("numeric ( 5 , 2 ) [ ]"))
+    'numeric(5,2)[]'
+    """
+    text = ""
+    for token in tokens:
+        value = token.value
+        if text and value not in ("(", ")", ",", "[", "]", ".", "::") and \
+                not text.endswith(("(", "[", ".", "::", ",")):
+            text += " "
+        text += value
+    return text
+
+
+def _qualified_name(tokens: list, i: int) -> tuple:
+    """Read a possibly schema-qualified name at tokens[i]
+
+    Returns:
+        tuple: (schema or None, name, index after the name)
+    """
+    parts = [_unquote(tokens[i].value)]
+    i += 1
+    while i + 1 < len(tokens) and tokens[i].value == "." and tokens[i + 1].kind in ("word", "ident"):
+        parts.append(_unquote(tokens[i + 1].value))
+        i += 2
+    return (parts[-2] if len(parts) > 1 else None), parts[-1], i
+
+
+def _matching_paren(tokens: list, i: int) -> int:
+    """Index of the ")" closing the "(" at tokens[i]"""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j].value == "(":
+            depth += 1
+        elif tokens[j].value == ")":
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens)
+
+
+def _split_top_level(tokens: list) -> list:
+    """Split tokens on commas outside parentheses"""
+    parts, current, depth = [], [], 0
+    for token in tokens:
+        if token.value in ("(", "["):
+            depth += 1
+        elif token.value in (")", "]"):
+            depth -= 1
+        elif token.value == "," and depth == 0:
+            parts.append(current)
+            current = []
+            continue
+        current.append(token)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _name_list(tokens: list, i: int) -> tuple:
+    """Read a parenthesized identifier list at tokens[i]
+
+    Returns:
+        tuple: (tuple of names, index after the closing parenthesis)
+    """
+    end = _matching_paren(tokens, i)
+    names = tuple(_unquote(t.value) for t in tokens[i + 1:end] if t.kind in ("word", "ident"))
+    return names, end + 1
+
+
+def _word(tokens: list, i: int) -> Optional[str]:
+    return tokens[i].value.lower() if i < len(tokens) and tokens[i].kind == "word" else None
+
+
+class Column:
+    """A table or view column"""
+
+    __slots__ = ("name", "type", "nullable", "default", "comment")
+
+    def __init__(self, name: str, type: Optional[str] = None, nullable: bool = True,
+                 default: Optional[str] = None, comment: Optional[str] = None):
+        self.name = name
+        self.type = type
+        self.nullable = nullable
+        self.default = default
+        self.comment = comment
+
+    def to_list(self) -> list:
+        return [self.name, self.type, self.nullable, self.default, self.comment]
+
+
+class ForeignKey:
+    """A foreign key from columns of one table to columns of another"""
+
+    __slots__ = ("columns", "ref_table", "ref_columns", "name")
+
+    def __init__(self, columns: tuple, ref_table: str, ref_columns: tuple = (), name: Optional[str] = None):
+        self.columns = tuple(columns)
+        self.ref_table = ref_table
+        self.ref_columns = tuple(ref_columns)
+        self.name = name
+
+    def to_list(self) -> list:
+        return [list(self.columns), self.ref_table, list(self.ref_columns), self.name]
+
+
+class Table:
+    """A table, or a view when ``kind`` is "view"
+
+    Views record the relations their query reads in ``references``;
+    tables derive them from their foreign keys.
+    """
+
+    __slots__ = ("name", "schema", "kind", "columns", "primary_key", "foreign_keys",
+                 "partition_of", "partition_key", "comment", "view_references", "ddl")
+
+    def __init__(self, name: str, schema: Optional[str] = None, kind: str = "table"):
+        self.name = name
+        self.schema = schema
+        self.kind = kind
+        self.columns = []
+        self.primary_key = ()
+        self.foreign_keys = []
+        self.partition_of = None
+        self.partition_key = None
+        self.comment = None
+        self.view_references = ()
+        self.ddl = ""
+
+    def column(self, name: str) -> Optional[Column]:
+        for column in self.columns:
+            if column.name == name:
+                return column
+        return None
+
+    @property
+    def column_names(self) -> list:
+        return [column.name for column in self.columns]
+
+    @property
+    def references(self) -> set:
+        """Names of the relations this one joins to or reads from"""
+        if self.kind == "view":
+            return set(self.view_references)
+        return {fk.ref_table for fk in self.foreign_keys}
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.name}" if self.schema else self.name
+
+    def to_ddl(self) -> str:
+        """Render pg_dump-style DDL for catalogs built without source text
+
+        >>> table = Table("film", "public")
+        >>> table.columns = [Column("film_id", "integer", False), Column("title", "text")]
+        >>> table.primary_key = ("film_id",)
+        >>> print(table.to_ddl())
+        CREATE TABLE public.film (
+            film_id integer NOT NULL,
+            title text,
+            PRIMARY KEY (film_id)
+        );
+        """
+        if self.kind == "view":
+            return self.ddl or f"CREATE VIEW {self.qualified_name};"
+        lines = []
+        for column in self.columns:
+            line = f"    {column.name} {column.type}"
+            if column.default is not None:
+                line += f" DEFAULT {column.default}"
+            if not column.nullable:
+                line += " NOT NULL"
+            lines.append(line)
+        if self.primary_key:
+            lines.append(f"    PRIMARY KEY ({', '.join(self.primary_key)})")
+        for fk in self.foreign_keys:
+            references = f"{fk.ref_table}({', '.join(fk.ref_columns)})" if fk.ref_columns else fk.ref_table
+            lines.append(f"    FOREIGN KEY ({', '.join(fk.columns)}) REFERENCES {references}")
+        ddl = f"CREATE TABLE {self.qualified_name} (\n" + ",\n".join(lines) + "\n)"
+        if self.partition_key:
+            ddl += f"\nPARTITION BY {self.partition_key}"
+        return ddl + ";"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name, "schema": self.schema, "kind": self.kind,
+            "columns": [column.to_list() for column in self.columns],
+            "primary_key": list(self.primary_key),
+            "foreign_keys": [fk.to_list() for fk in self.foreign_keys],
+            "partition_of": self.partition_of, "partition_key": self.partition_key,
+            "comment": self.comment, "view_references": list(self.view_references),
+            "ddl": self.ddl,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Table":
+        table = cls(data["name"], data["schema"], data["kind"])
+        table.columns = [Column(*values) for values in data["columns"]]
+        table.primary_key = tuple(data["primary_key"])
+        table.foreign_keys = [ForeignKey(*values) for values in data["foreign_keys"]]
+        table.partition_of = data["partition_of"]
+        table.partition_key = data["partition_key"]
+        table.comment = data["comment"]
+        table.view_references = tuple(data["view_references"])
+        table.ddl = data["ddl"]
+        return table
+
+
+class UserType:
+    """An enum or domain type"""
+
+    __slots__ = ("name", "kind", "labels", "base_type")
+
+    def __init__(self, name: str, kind: str, labels: tuple = (), base_type: Optional[str] = None):
+        self.name = name
+        self.kind = kind
+        self.labels = tuple(labels)
+        self.base_type = base_type
+
+    def to_list(self) -> list:
+        return [self.name, self.kind, list(self.labels), self.base_type]
+
+
+class SchemaCatalog:
+    """Tables, views, columns, keys and types of a schema
+
+    Built from DDL with ``parse`` (or from a live database, see
+    ``live_catalog``) and cached as a JSON artifact next to the other
+    querycraft caches, keyed by the source file's content hash.
+    """
+
+    # Shared across instances: resolved sql path -> (sha256, catalog)
+    _memory_cache = {}
+    _memory_cache_lock = threading.Lock()
+
+    def __init__(self):
+        self.tables = {}
+        self.types = {}
+
+    # Lookup
+
+    def relations(self, include_partitions: bool = False) -> list:
+        """Tables and views in definition order, partitions folded into their parent"""
+        return [t for t in self.tables.values() if include_partitions or t.partition_of is None]
+
+    def get(self, name: str) -> Optional[Table]:
+        return self.tables.get(name.lower())
+
+    def resolve(self, name: str) -> Optional[Table]:
+        """Look up a relation by name, mapping partitions to their parent"""
+        table = self.get(name)
+        while table is not None and table.partition_of is not None and table.partition_of in self.tables:
+            table = self.tables[table.partition_of]
+        return table
+
+    def schema_context(self) -> str:
+        """DDL of every relation except partitions, for use in prompts"""
+        return "\n\n".join(table.ddl or table.to_ddl() for table in self.relations())
+
+    # Parsing
+
+    @classmethod
+    def parse(cls, lines: Iterable[str]) -> "SchemaCatalog":
+        """Build a catalog from DDL text, streamed line by line
+
+        Handles ``CREATE TABLE`` (including ``PARTITION BY`` and ``PARTITION
+        OF``), ``CREATE [MATERIALIZED] VIEW``, ``CREATE TYPE ... AS ENUM``,
+        ``CREATE DOMAIN``, the ``ALTER TABLE ... ADD CONSTRAINT`` and
+        ``ATTACH PARTITION`` statements pg_dump emits for keys and partitions,
+        and ``COMMENT ON``. Other statements are skipped.
+
+        >>> catalog = SchemaCatalog.parse([
+        ...     "CREATE TABLE a (id int PRIMARY KEY, name text NOT NULL);",
+        ...     "CREATE TABLE b (id int, a_id int REFERENCES a(id));",
+        ...     "ALTER TABLE ONLY b ADD CONSTRAINT b_pkey PRIMARY KEY (id);",
+        ... ])
+        >>> catalog.get("b").primary_key, catalog.get("b").references
+        (('id',), {'a'})
+        >>> catalog.get("a").column("name").nullable
+        False
+        """
+        catalog = cls()
+        for statement in iter_statements(lines):
+            match = _LEADING_WORD.match(statement)
+            if match is None or match.group(1).lower() not in _CATALOG_STATEMENTS:
+                continue
+            try:
+                catalog._apply(statement)
+            except (IndexError, ValueError) as e:
+                logger.warning(f"Skipping unparseable statement ({e}): {statement[:80]}")
+        catalog._fold_unattached_partitions()
+        return catalog
+
+    @classmethod
+    def from_file(cls, path) -> "SchemaCatalog":
+        """Parse a DDL file without reading it into memory at once"""
+        with open(path, "r") as f:
+            return cls.parse(f)
+
+    def _apply(self, statement: str) -> None:
+        tokens = significant_tokens(statement)
+        words = [t.value.lower() if t.kind == "word" else None for t in tokens[:8]]
+        if words[0] == "create":
+            i = 1
+            if words[1:3] == ["or", "replace"]:
+                i = 3
+            while _word(tokens, i) in ("unlogged", "temp", "temporary", "global", "local",
+                                       "materialized", "recursive", "foreign"):
+                i += 1
+            kind = _word(tokens, i)
+            if kind == "table":
+                self._create_table(statement, tokens, i + 1)
+            elif kind == "view":
+                self._create_view(statement, tokens, i + 1)
+            elif kind == "type":
+                self._create_type(tokens, i + 1)
+            elif kind == "domain":
+                self._create_domain(tokens, i + 1)
+        elif words[0] == "alter" and words[1] == "table":
+            self._alter_table(tokens, 2)
+        elif words[0] == "comment" and words[1] == "on":
+            self._comment(tokens)
+
+    def _create_table(self, statement: str, tokens: list, i: int) -> None:
+        if [_word(tokens, i), _word(tokens, i + 1), _word(tokens, i + 2)] == ["if", "not", "exists"]:
+            i += 3
+        schema, name, i = _qualified_name(tokens, i)
+        table = Table(name, schema)
+        table.ddl = statement
+
+        if _word(tokens, i) == "partition" and _word(tokens, i + 1) == "of":
+            _, parent, i = _qualified_name(tokens, i + 2)
+            table.partition_of = parent
+        if i < len(tokens) and tokens[i].value == "(":
+            end = _matching_paren(tokens, i)
+            for element in _split_top_level(tokens[i + 1:end]):
+                self._table_element(table, element)
+            i = end + 1
+        if _word(tokens, i) == "partition" and _word(tokens, i + 1) == "by":
+            table.partition_key = _join(tokens[i + 2:]).rstrip(";").strip()
+        self.tables[name] = table
+
+    def _table_element(self, table: Table, element: list) -> None:
+        first = _word(element, 0)
+        if first in _TABLE_CONSTRAINT_WORDS:
+            self._table_constraint(table, element)
+            return
+        if not element or element[0].kind not in ("word", "ident"):
+            return
+
+        column = Column(_unquote(element[0].value))
+        j = 1
+        while j < len(element) and _word(element, j) not in _COLUMN_CONSTRAINT_WORDS:
+            j += 1
+        column.type = _join(element[1:j]) or None
+        while j < len(element):
+            word = _word(element, j)
+            if word == "not" and _word(element, j + 1) == "null":
+                column.nullable = False
+                j += 2
+            elif word == "primary" and _word(element, j + 1) == "key":
+                table.primary_key = (column.name,)
+                column.nullable = False
+                j += 2
+            elif word == "references":
+                _, ref_table, j = _qualified_name(element, j + 1)
+                ref_columns = ()
+                if j < len(element) and element[j].value == "(":
+                    ref_columns, j = _name_list(element, j)
+                table.foreign_keys.append(ForeignKey((column.name,), ref_table, ref_columns))
+            elif word == "default":
+                k = j + 1
+                depth = 0
+                while k < len(element):
+                    value = element[k].value
+                    depth += (value == "(") - (value == ")")
+                    if depth == 0 and _word(element, k) in _COLUMN_CONSTRAINT_WORDS - {"null"}:
+                        break
+                    k += 1
+                column.default = _join(element[j + 1:k])
+                j = k
+            else:
+                j += 1
+        table.columns.append(column)
+
+    def _table_constraint(self, table: Table, element: list) -> None:
+        name = None
+        j = 0
+        if _word(element, 0) == "constraint":
+            name = _unquote(element[1].value)
+            j = 2
+        word = _word(element, j)
+        if word == "primary" and _word(element, j + 1) == "key":
+            table.primary_key, _ = _name_list(element, j + 2)
+            for column in table.columns:
+                if column.name in table.primary_key:
+                    column.nullable = False
+        elif word == "foreign" and _word(element, j + 1) == "key":
+            columns, j = _name_list(element, j + 2)
+            if _word(element, j) != "references":
+                return
+            _, ref_table, j = _qualified_name(element, j + 1)
+            ref_columns = ()
+            if j < len(element) and element[j].value == "(":
+                ref_columns, j = _name_list(element, j)
+            table.foreign_keys.append(ForeignKey(columns, ref_table, ref_columns, name))
+
+    def _alter_table(self, tokens: list, i: int) -> None:
+        if _word(tokens, i) == "if" and _word(tokens, i + 1) == "exists":
+            i += 2
+        if _word(tokens, i) == "only":
+            i += 1
+        _, name, i = _qualified_name(tokens, i)
+        table = self.tables.get(name)
+        body = tokens[i:-1] if tokens[-1].value == ";" else tokens[i:]
+        for action in _split_top_level(body):
+            word = _word(action, 0)
+            if word == "add" and table is not None:
+                self._table_constraint(table, action[1:])
+            elif word == "attach" and _word(action, 1) == "partition":
+                _, child, _ = _qualified_name(action, 2)
+                if child in self.tables:
+                    self.tables[child].partition_of = name
+
+    def _create_view(self, statement: str, tokens: list, i: int) -> None:
+        schema, name, i = _qualified_name(tokens, i)
+        view = Table(name, schema, kind="view")
+        view.ddl = statement
+        explicit = ()
+        if i < len(tokens) and tokens[i].value == "(":
+            explicit, i = _name_list(tokens, i)
+        while i < len(tokens) and _word(tokens, i) != "as":
+            i += 1  # WITH (options)
+        query = tokens[i + 1:]
+        names = list(explicit) or self._select_list_names(query)
+        view.columns = [Column(column) for column in names]
+        reads, _ = statement_tables(" ".join(t.value for t in query))
+        view.view_references = tuple(sorted(reads))
+        self.tables[name] = view
+
+    @staticmethod
+    def _select_list_names(query: list) -> list:
+        """Output column names of the outermost SELECT list"""
+        depth = 0
+        start = end = None
+        for j, token in enumerate(query):
+            if token.value == "(":
+                depth += 1
+            elif token.value == ")":
+                depth -= 1
+            elif depth == 0 and token.kind == "word":
+                word = token.value.lower()
+                if word == "select" and start is None:
+                    start = j + 1
+                    if _word(query, start) == "distinct":
+                        start += 1
+                elif word in ("from", "where", "group", "order", "limit", "union") and start is not None:
+                    end = j
+                    break
+        if start is None:
+            return []
+        names = []
+        for item in _split_top_level(query[start:end]):
+            last = item[-1]
+            if last.kind in ("word", "ident") and (
+                    len(item) == 1 or item[-2].value in (".", ")", "]")
+                    or item[-2].kind in ("word", "ident", "number", "string")):
+                names.append(_unquote(last.value))
+            elif last.value == ")" and item[0].kind == "word":
+                names.append(item[0].value.lower())
+            else:
+                names.append("?column?")
+        return names
+
+    def _create_type(self, tokens: list, i: int) -> None:
+        _, name, i = _qualified_name(tokens, i)
+        if _word(tokens, i) == "as" and _word(tokens, i + 1) == "enum":
+            end = _matching_paren(tokens, i + 2)
+            labels = tuple(t.value[1:-1].replace("''", "'") for t in tokens[i + 3:end] if t.kind == "string")
+            self.types[name] = UserType(name, "enum", labels)
+        else:
+            self.types[name] = UserType(name, "composite")
+
+    def _create_domain(self, tokens: list, i: int) -> None:
+        _, name, i = _qualified_name(tokens, i)
+        if _word(tokens, i) == "as":
+            i += 1
+        j = i
+        while j < len(tokens) and _word(tokens, j) not in _COLUMN_CONSTRAINT_WORDS and tokens[j].value != ";":
+            j += 1
+        self.types[name] = UserType(name, "domain", base_type=_join(tokens[i:j]))
+
+    def _comment(self, tokens: list) -> None:
+        kind = _word(tokens, 2)
+        if kind not in ("table", "view", "column"):
+            return
+        parts = [_unquote(tokens[3].value)]
+        j = 4
+        while j + 1 < len(tokens) and tokens[j].value == ".":
+            parts.append(_unquote(tokens[j + 1].value))
+            j += 2
+        if _word(tokens, j) != "is" or tokens[j + 1].kind != "string":
+            return
+        text = tokens[j + 1].value[1:-1].replace("''", "'")
+        if kind == "column" and len(parts) >= 2:
+            table = self.tables.get(parts[-2])
+            column = table.column(parts[-1]) if table is not None else None
+            if column is not None:
+                column.comment = text
+        elif parts[-1] in self.tables:
+            self.tables[parts[-1]].comment = text
+
+    def _fold_unattached_partitions(self) -> None:
+        """Treat ``<parent>_p...`` tables as partitions of a partitioned parent
+
+        Trimmed dumps often keep the partition tables but drop the
+        ``ATTACH PARTITION`` statements that link them.
+        """
+        parents = [t.name for t in self.tables.values() if t.partition_key is not None]
+        for table in self.tables.values():
+            if table.partition_of is None and table.kind == "table":
+                for parent in parents:
+                    if table.name != parent and table.name.startswith(f"{parent}_p"):
+                        table.partition_of = parent
+
+    # Serialization
+
+    def to_dict(self) -> dict:
+        return {
+            "version": CATALOG_FORMAT_VERSION,
+            "tables": [table.to_dict() for table in self.tables.values()],
+            "types": [user_type.to_list() for user_type in self.types.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SchemaCatalog":
+        catalog = cls()
+        for table_data in data["tables"]:
+            table = Table.from_dict(table_data)
+            catalog.tables[table.name] = table
+        for values in data["types"]:
+            catalog.types[values[0]] = UserType(*values)
+        return catalog
+
+    def save(self, path: Path, **metadata) -> None:
+        """Write the catalog as a compact JSON artifact (atomically)"""
+        data = dict(self.to_dict(), **metadata)
+        path = Path(path)
+        # A unique temporary file, so concurrent saves cannot move each other's file away
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _read_artifact(path: Path) -> Optional[dict]:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != CATALOG_FORMAT_VERSION:
+            return None
+        return data
+
+    @staticmethod
+    def _file_digest(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def load(cls, sql_path, artifact_dir: Optional[Path] = None) -> "SchemaCatalog":
+        """Load the catalog of a DDL file, parsing it only when it changed
+
+        The artifact remembers the file's size, mtime and content hash. An
+        unchanged stat skips hashing altogether; a changed stat with the
+        same content just refreshes the stored stat.
+
+        Args:
+            sql_path (Path): DDL file (e.g. a pg_dump schema)
+            artifact_dir (Path, optional): Where artifacts are kept; defaults
+                to the querycraft cache dir
+
+        Returns:
+            SchemaCatalog: The parsed catalog
+        """
+        sql_path = Path(sql_path).resolve()
+        artifact_dir = Path(artifact_dir) if artifact_dir is not None else get_cache_dir("catalog")
+        key = hashlib.sha256(str(sql_path).encode()).hexdigest()[:16]
+        artifact_path = artifact_dir / f"{sql_path.stem}-{key}.json"
+
+        stat = sql_path.stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        data = cls._read_artifact(artifact_path)
+        if data is not None and data.get("source_signature") == signature:
+            return cls.from_dict(data)
+
+        digest = cls._file_digest(sql_path)
+        if data is not None and data.get("source_sha256") == digest:
+            catalog = cls.from_dict(data)
+        else:
+            start = time.perf_counter()
+            catalog = cls.from_file(sql_path)
+            logger.info(f"Parsed {sql_path.name} into {len(catalog.tables)} relations "
+                        f"in {time.perf_counter() - start:.3f}s")
+        catalog.save(artifact_path, source_signature=signature, source_sha256=digest)
+        return catalog
+
+    @classmethod
+    def for_schema(cls, schema_loader) -> "SchemaCatalog":
+        """Get the shared catalog for a SchemaLoader's SQL file
+
+        Args:
+            schema_loader (SchemaLoader): Loader whose SQL file should be cataloged
+
+        Returns:
+            SchemaCatalog: Catalog, reused while the file is unchanged
+        """
+        _, digest = schema_loader._read_file(schema_loader.sql_path)
+        key = schema_loader.sql_path.resolve()
+        with cls._memory_cache_lock:
+            entry = cls._memory_cache.get(key)
+            if entry and entry[0] == digest:
+                return entry[1]
+        catalog = cls.load(schema_loader.sql_path)
+        with cls._memory_cache_lock:
+            cls._memory_cache[key] = (digest, catalog)
+        return catalog
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m querycraft.utils.catalog <schema.sql>")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    catalog = SchemaCatalog.from_file(sys.argv[1])
+    parsed = time.perf_counter() - start
+    start = time.perf_counter()
+    SchemaCatalog.load(sys.argv[1])
+    loaded = time.perf_counter() - start
+    for table in catalog.relations():
+        keys = f" pk({', '.join(table.primary_key)})" if table.primary_key else ""
+        fks = "".join(f" {','.join(fk.columns)}->{fk.ref_table}" for fk in table.foreign_keys)
+        print(f"{table.kind} {table.name}: {len(table.columns)} columns{keys}{fks}")
+    print(f"Parsed in {parsed * 1000:.1f}ms, loaded via artifact in {loaded * 1000:.1f}ms")
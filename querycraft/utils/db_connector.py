@@ -1,104 +1,627 @@
 import subprocess
 from pathlib import Path
 import os
+import json
 import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+import psycopg2
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from querycraft.config.groq_config import GroqConfig
+from typing import Optional
+from querycraft.utils.pg_engine import get_pool, format_psql_rows
+from querycraft.utils.result_set import ResultSet
+from querycraft.utils.query_cache import QueryCache
+from querycraft.utils.result_cache import ResultCache
+from querycraft.utils.live_catalog import LiveCatalog
+from querycraft.utils.sql_lexer import canonicalize
+from querycraft.utils.sql_validator import SqlValidator
+from querycraft.utils.sql_template import parameterize, question_template, bind_question, render_bound
+from querycraft.utils.execution_policy import (
+    ExecutionPolicy, EXPLAINABLE_STATEMENTS, apply_row_limit, statement_kind
+)
+from querycraft.utils.tracing import tracer, Span
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DatabaseConnector:
-    def __init__(self, schema_name: str):
+    BACKENDS = ("auto", "pool", "subprocess")
+    SCHEMA_SOURCES = ("file", "live")
+    VALIDATION_MODES = ("reject", "warn", "off")
+    MAX_REGENERATIONS = 2
+    # Rows fetched per round trip from server-side cursors
+    BATCH_SIZE = 1000
+
+    def __init__(self, schema_name: str, backend: str = "auto",
+                 query_cache: Optional[QueryCache] = None, use_query_cache: bool = True,
+                 result_cache: Optional[ResultCache] = None, schema_source: str = "file",
+                 validation: str = "warn", execution_policy: Optional[ExecutionPolicy] = None,
+                 prepare_statements: bool = True):
         """Initialize database connector
         
         Args:
             schema_name (str): Name of the schema/database directory
+            backend (str): "pool" executes through a shared psycopg2 connection
+                pool, "subprocess" through docker-compose/psql, and "auto" uses
+                the pool and falls back to the subprocess when the database
+                cannot be reached directly
+            query_cache (QueryCache, optional): Question -> SQL cache to use;
+                defaults to the on-disk cache in the user cache directory,
+                which ``close`` closes again
+            use_query_cache (bool): Set to False to always call the LLM
+            result_cache (ResultCache, optional): Cache for results of read-only
+                statements, invalidated when the tables they read change
+                (pool backend only)
+            schema_source (str): "file" puts querycraft/schemas/<name>/<name>.sql
+                in prompts; "live" introspects the connected database instead,
+                re-reading its catalog only when it changes
+            validation (str): How generated SQL that references unknown
+                tables, aliases or columns is handled before it reaches the
+                database. "warn" (the default) only logs and reports them,
+                "reject" regenerates it with the problems as feedback (up to
+                MAX_REGENERATIONS times) and raises if it is still invalid,
+                "off" skips the check
+            execution_policy (ExecutionPolicy, optional): Cost gates, statement
+                timeout and interactive row limit; defaults to the
+                execution_policy section of the schema's YAML file
+            prepare_statements (bool): Lift literals out of queries run on the
+                pool and execute them as prepared statements, so queries that
+                differ only in literals reuse one plan per connection
         Raises:
-            ValueError: If schema_name is not provided
+            ValueError: If schema_name is not provided or backend,
+                schema_source or validation is unknown
         """
         if not schema_name:
             raise ValueError("schema_name must be provided")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"backend must be one of: {', '.join(self.BACKENDS)}")
+        if schema_source not in self.SCHEMA_SOURCES:
+            raise ValueError(f"schema_source must be one of: {', '.join(self.SCHEMA_SOURCES)}")
+        if validation not in self.VALIDATION_MODES:
+            raise ValueError(f"validation must be one of: {', '.join(self.VALIDATION_MODES)}")
         self.project_root = Path(os.getcwd())
         self.db_path = self.project_root / "test_databases" / schema_name
         self.schema_name = schema_name
-        self.groq_config = GroqConfig(schema_name=schema_name)
+        self.backend = backend
+        self.schema_source = schema_source
+        self.validation = validation
+        self.prepare_statements = prepare_statements
+        self.live_catalog = None
+        if schema_source == "live":
+            pool = self._get_pool()
+            if pool is None:
+                raise Exception("Live schema introspection needs a direct database connection")
+            self.live_catalog = LiveCatalog(pool, schema_name)
+        # Built on first use, so SQL-only callers skip prompt and LLM setup
+        self._groq_config = None
+        self._execution_policy = execution_policy
+        self._lazy_lock = threading.RLock()
+        self.query_cache = (query_cache or QueryCache()) if use_query_cache else None
+        # Caches passed in belong to the caller, who closes them
+        self._owns_query_cache = use_query_cache and query_cache is None
+        self.result_cache = result_cache
         logger.info(f"Database path: {self.db_path}")
         logger.info(f"Using schema: {schema_name}")
 
-    def execute_sql(self, sql_query: str) -> str:
-        """Execute a SQL query using docker-compose and psql
-        
+    @property
+    def groq_config(self) -> GroqConfig:
+        """SQL generation settings and LLM backend, created on first use"""
+        if self._groq_config is None:
+            with self._lazy_lock:
+                if self._groq_config is None:
+                    self._groq_config = GroqConfig(schema_name=self.schema_name, live_catalog=self.live_catalog)
+        return self._groq_config
+
+    @property
+    def execution_policy(self) -> ExecutionPolicy:
+        """Execution policy, read from the schema's YAML file on first use"""
+        if self._execution_policy is None:
+            with self._lazy_lock:
+                if self._execution_policy is None:
+                    self._execution_policy = ExecutionPolicy.for_schema(self.groq_config.schema_loader)
+        return self._execution_policy
+
+    def _get_pool(self):
+        """Get the shared connection pool, switching to the subprocess backend
+        in auto mode if the database cannot be reached"""
+        try:
+            return get_pool(self.schema_name, self.db_path)
+        except psycopg2.OperationalError as e:
+            if self.backend != "auto":
+                raise Exception(f"Could not connect to database: {e}")
+            logger.warning(f"Connection pool unavailable, falling back to psql subprocess: {e}")
+            self.backend = "subprocess"
+            return None
+
+    def _statement_timeout(self, timeout_ms: Optional[int] = None) -> Optional[int]:
+        """The policy's statement_timeout, lowered to a per-call timeout if one is given"""
+        policy_ms = self.execution_policy.statement_timeout_ms
+        if timeout_ms is None:
+            return policy_ms
+        timeout_ms = max(1, int(timeout_ms))
+        return timeout_ms if policy_ms is None else min(policy_ms, timeout_ms)
+
+    def _check_cost(self, pool, sql_query: str, timeout_ms: Optional[int] = None) -> None:
+        """Run EXPLAIN and apply the execution policy's cost gates"""
+        policy = self.execution_policy
+        if not policy.explains or statement_kind(sql_query) not in EXPLAINABLE_STATEMENTS:
+            return
+        explain_query = f"EXPLAIN (FORMAT JSON) {sql_query}"
+        try:
+            if pool is not None:
+                _, rows = pool.execute(explain_query, statement_timeout_ms=self._statement_timeout(timeout_ms))
+                plan = rows[0][0]
+            else:
+                plan = self._execute_subprocess(explain_query, timeout_ms=timeout_ms)
+        except psycopg2.Error as e:
+            logger.error(f"SQL Error: {e}")
+            raise Exception(f"SQL execution failed: {e}")
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        cost, rows = policy.check_plan(plan)
+        tracer.current_span().set(estimated_cost=cost, estimated_rows=rows)
+
+    def _truncate(self, rows: list, row_limit: Optional[int]) -> list:
+        """Cut rows down to the row limit, counting the gate when it fires"""
+        if row_limit is None or len(rows) <= row_limit:
+            return rows
+        self.execution_policy.record("row_limit")
+        tracer.current_span().set(truncated=True)
+        return rows[:row_limit]
+
+    @contextmanager
+    def _sql_errors(self, timeout_ms: Optional[int] = None):
+        """Turn database errors into querycraft's execution errors, counting timeouts"""
+        try:
+            yield
+        except psycopg2.extensions.QueryCanceledError as e:
+            self.execution_policy.record("statement_timeout")
+            logger.error(f"SQL Error: {e}")
+            raise Exception(
+                f"SQL execution failed: statement_timeout of {self._statement_timeout(timeout_ms)} ms exceeded"
+            )
+        except psycopg2.Error as e:
+            logger.error(f"SQL Error: {e}")
+            raise Exception(f"SQL execution failed: {e}")
+
+    def _execute_pooled(self, pool, sql_query: str, row_limit: Optional[int] = None,
+                        timeout_ms: Optional[int] = None) -> str:
+        """Execute a SQL query on a pooled connection"""
+        self._check_cost(pool, sql_query, timeout_ms)
+        with self._sql_errors(timeout_ms):
+            with pool.stream(sql_query, batch_size=self.BATCH_SIZE,
+                             statement_timeout_ms=self._statement_timeout(timeout_ms),
+                             prepare=self.prepare_statements) as result:
+                if result.columns is None:
+                    return result.status
+                type_names = [column.type_name for column in result.columns]
+                rows = result.fetchall(row_limit + 1 if row_limit is not None else None)
+
+        rows = self._truncate(rows, row_limit)
+        tracer.current_span().set(rows=len(rows))
+        if not rows:
+            return "No results found"
+        return format_psql_rows(rows, type_names)
+
+    def _execute_subprocess(self, sql_query: str, row_limit: Optional[int] = None,
+                            timeout_ms: Optional[int] = None) -> str:
+        """Execute a SQL query using docker-compose and psql"""
+        timeout = self._statement_timeout(timeout_ms)
+        command = ["docker-compose", "exec", "-T"]
+        if timeout is not None:
+            command += ["-e", f"PGOPTIONS=-c statement_timeout={timeout}"]
+        command += ["pg", "psql", "-U", "postgres", "-t", "-A", "-c", sql_query]
+
+        logger.info(f"Executing command in {self.db_path}: {command}")
+
+        result = subprocess.run(
+            command,
+            cwd=self.db_path,
+            capture_output=True,
+            text=True
+        )
+
+        logger.info(f"Raw stdout: '{result.stdout}'")
+        logger.info(f"Raw stderr: '{result.stderr}'")
+
+        if result.returncode != 0:
+            logger.error(f"SQL Error: {result.stderr}")
+            if "statement timeout" in result.stderr:
+                self.execution_policy.record("statement_timeout")
+            raise Exception(f"SQL execution failed: {result.stderr}")
+
+        rows = result.stdout.strip().split('\n')
+        if len(rows) == 1 and not rows[0]:
+            tracer.current_span().set(rows=0)
+            return "No results found"
+        rows = self._truncate(rows, row_limit)
+        tracer.current_span().set(rows=len(rows))
+        return "\n".join(rows)
+
+    def query(self, sql_query: str, row_limit: Optional[int] = None,
+              batch_size: Optional[int] = None) -> ResultSet:
+        """Execute a SQL query and stream its rows with column names and types
+
+        Rows are read from a server-side cursor in batches while the result
+        set is consumed, under the same execution policy as ``execute_sql``.
+        The result holds a pooled connection until it is exhausted or closed:
+
+            with db.query("SELECT * FROM rental") as result:
+                for batch in result.batches():
+                    ...
+
         Args:
             sql_query (str): SQL query to execute
-            
+            row_limit (int, optional): Add (or lower) a LIMIT on read-only
+                queries; one extra row is returned to signal truncation
+            batch_size (int, optional): Rows per round trip (default BATCH_SIZE)
+
         Returns:
-            str: Query results
+            ResultSet: Lazily fetched rows and column metadata
+
+        Raises:
+            Exception: If there is no direct database connection, the
+                execution policy rejects the query or it fails to start
         """
-        try:
-            original_dir = os.getcwd()
-            os.chdir(self.db_path)
+        with tracer.span("execute", backend="pool", streamed=True):
+            if row_limit is not None:
+                sql_query, _ = apply_row_limit(sql_query, row_limit)
+            pool = self._get_pool() if self.backend != "subprocess" else None
+            if pool is None:
+                raise Exception("Streaming results need a direct database connection")
+            self._check_cost(pool, sql_query)
+            with self._sql_errors():
+                return pool.stream(sql_query, batch_size=batch_size or self.BATCH_SIZE,
+                                   statement_timeout_ms=self.execution_policy.statement_timeout_ms)
 
-            logger.info(f"Executing in directory: {os.getcwd()}")
-    
-            command = f'docker-compose exec -T pg psql -U postgres -t -A -c "{sql_query}"'
+    def execute_sql(self, sql_query: str, row_limit: Optional[int] = None,
+                    statement_timeout_ms: Optional[int] = None) -> str:
+        """Execute a SQL query under the execution policy
 
-            logger.info(f"Executing command: {command}")
+        Statements over the policy's cost gates are refused (or logged)
+        before they run, and the policy's statement_timeout applies.
 
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            
-            os.chdir(original_dir)
+        Args:
+            sql_query (str): SQL query to execute
+            row_limit (int, optional): Return at most this many rows of a
+                read-only query; a LIMIT is added to (or lowered in) the query
+            statement_timeout_ms (int, optional): Lower the policy's
+                statement_timeout for this call, e.g. to a caller's deadline
             
-            logger.info(f"Raw stdout: '{result.stdout}'")
-            logger.info(f"Raw stderr: '{result.stderr}'")
+        Returns:
+            str: Query results in psql unaligned format (``|``-separated
+                columns, one row per line); use ``query`` for typed rows
+        """
+        try:
+            with tracer.span("execute", backend=self.backend) as span:
+                if row_limit is not None:
+                    sql_query, limited = apply_row_limit(sql_query, row_limit)
+                    span.set(row_limit=row_limit, limit_added=limited)
+                pool = self._get_pool() if self.backend != "subprocess" else None
+                if pool is not None and self.result_cache is not None:
+                    return self.result_cache.execute(
+                        pool, sql_query,
+                        lambda query: self._execute_pooled(pool, query, row_limit, statement_timeout_ms)
+                    )
+                if pool is not None:
+                    return self._execute_pooled(pool, sql_query, row_limit, statement_timeout_ms)
 
-            if result.returncode != 0:
-                logger.error(f"SQL Error: {result.stderr}")
-                raise Exception(f"SQL execution failed: {result.stderr}")
-                
-            rows = result.stdout.strip().split('\n')
-            if len(rows) == 1 and not rows[0]:
-                return "No results found"
-            return "\n".join(rows)
+                self._check_cost(None, sql_query, statement_timeout_ms)
+                result = self._execute_subprocess(sql_query, row_limit, statement_timeout_ms)
+                if self.result_cache is not None:
+                    mode, tables = ResultCache.classify(sql_query)
+                    if mode == "write":
+                        self.result_cache.invalidate(tables)
+                return result
 
         except Exception as e:
             logger.error(f"Error: {str(e)}")
             raise
-        
-        finally:
-            if 'original_dir' in locals():
-                os.chdir(original_dir)
 
     
-    def execute_natural_query(self, question: str) -> dict:
+    def _query_cache_key(self, question: str) -> str:
+        """Cache key for a question under the current schema and model settings"""
+        return QueryCache.make_key(
+            question,
+            self.schema_name,
+            self.groq_config.schema_fingerprint(),
+            self.groq_config.cache_params()
+        )
+
+    def _template_lookup(self, question: str) -> Optional[str]:
+        """SQL for a question from a cached question with the same template
+
+        "Films longer than 120 minutes" reuses the SQL cached for "Films
+        longer than 90 minutes" with 90 replaced by 120 in the query.
+        """
+        question_text, values = question_template(question)
+        if not values:
+            return None
+        entry = self.query_cache.get_entry(self._query_cache_key("template:" + question_text), count=False)
+        if entry is None or entry[1] is None:
+            return None
+        sql_query, bindings = entry
+        return render_bound(parameterize(sql_query), bindings, values)
+
+    def _template_store(self, question: str, sql_query: str) -> None:
+        """Cache SQL under its question template when every literal of the
+        question appears verbatim in the SQL"""
+        question_text, values = question_template(question)
+        if not values:
+            return
+        bindings = bind_question(parameterize(sql_query), values)
+        if bindings is not None:
+            self.query_cache.put(self._query_cache_key("template:" + question_text), sql_query,
+                                 question, self.schema_name, bindings=bindings)
+
+    def _generate_speculative(self, question: str, candidates: int) -> tuple:
+        """Request several SQL candidates at once and keep the first that plans
+
+        Candidates use increasing temperatures and distinct seeds. Each valid,
+        distinct candidate is validated against the catalog (in "reject" mode
+        invalid ones are dropped, otherwise their issues are only recorded)
+        and checked with EXPLAIN on a pooled connection, under the policy's
+        statement_timeout, as soon as it arrives. The first one Postgres can
+        plan wins and in-flight EXPLAINs are cancelled. Pending LLM requests
+        cannot be interrupted, so they finish in the background and are ignored.
+
+        Args:
+            question (str): Natural language question
+            candidates (int): Number of concurrent candidates
+
+        Returns:
+            tuple: (winning SQL, dict describing the speculative run: distinct
+                valid candidates, duplicates, rejected and explained counts, the
+                winner and each candidate's validation issues)
+        """
+        pool = self._get_pool() if self.backend != "subprocess" else None
+        executor = ThreadPoolExecutor(max_workers=candidates * 2)
+        active_conns = set()
+        active_lock = threading.Lock()
+
+        def explain(sql_query):
+            conn = pool.getconn()
+            with active_lock:
+                active_conns.add(conn)
+            try:
+                pool._set_statement_timeout(conn, self.execution_policy.statement_timeout_ms)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN {sql_query}")
+                return sql_query
+            finally:
+                with active_lock:
+                    active_conns.discard(conn)
+                pool.putconn(conn)
+
+        # Each candidate runs in a copy of the caller's context so its spans
+        # nest under the current trace
+        generation_futures = {
+            executor.submit(
+                contextvars.copy_context().run,
+                self.groq_config.generate_candidate,
+                question,
+                temperature=min(1.0, self.groq_config.TEMPERATURE + 0.25 * i),
+                seed=i
+            ): i
+            for i in range(candidates)
+        }
+        explain_futures = {}
+        pending = set(generation_futures)
+        seen = set()
+        errors = []
+        info = {"candidates": candidates, "valid": 0, "duplicates": 0, "rejected": 0, "explained": 0,
+                "winner": None, "issues": []}
+        validator = self.groq_config.sql_validator() if self.validation != "off" else None
+
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in generation_futures:
+                        index = generation_futures[future]
+                        try:
+                            sql_query = future.result()
+                        except Exception as e:
+                            errors.append(f"candidate {index}: {e}")
+                            continue
+                        if sql_query is None:
+                            errors.append(f"candidate {index}: not a valid SQL query")
+                            continue
+                        key = canonicalize(sql_query)
+                        if key in seen:
+                            info["duplicates"] += 1
+                            continue
+                        seen.add(key)
+                        info["valid"] += 1
+                        if validator is not None:
+                            validation = validator.validate(sql_query)
+                            info["issues"] += [dict(issue.to_dict(), candidate=index) for issue in validation.issues]
+                            if not validation.ok and self.validation == "reject":
+                                info["rejected"] += 1
+                                SqlValidator.record_round_trip_saved()
+                                errors.append(f"candidate {index}: {'; '.join(i.message for i in validation.issues)}")
+                                continue
+                            if not validation.ok:
+                                logger.warning(f"Candidate {index} does not match the schema:\n{validation.feedback()}")
+                        if pool is None:
+                            info["winner"] = index
+                            return sql_query, info
+                        explain_future = executor.submit(explain, sql_query)
+                        explain_futures[explain_future] = index
+                        pending.add(explain_future)
+                    else:
+                        index = explain_futures[future]
+                        info["explained"] += 1
+                        try:
+                            sql_query = future.result()
+                        except Exception as e:
+                            errors.append(f"candidate {index}: EXPLAIN failed: {e}")
+                            continue
+                        info["winner"] = index
+                        return sql_query, info
+
+            raise Exception(f"No candidate SQL could be planned: {'; '.join(errors)}")
+
+        finally:
+            for future in pending:
+                future.cancel()
+            with active_lock:
+                for conn in active_conns:
+                    conn.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _validate_generated(self, question: str, sql_query: str) -> tuple:
+        """Check generated SQL against the schema catalog before it is executed
+
+        In "reject" mode an invalid query is sent back to the LLM together
+        with the problems found, so a bad table or column name costs another
+        generation instead of a failed database round trip.
+
+        Args:
+            question (str): Natural language question the SQL answers
+            sql_query (str): Generated SQL
+
+        Returns:
+            tuple: (SQL to execute, dict describing the validation)
+
+        Raises:
+            Exception: If the SQL is still invalid after MAX_REGENERATIONS
+                attempts in "reject" mode
+        """
+        validator = self.groq_config.sql_validator()
+        history = []
+        elapsed = 0.0
+        regenerations = 0
+        with tracer.span("validate") as span:
+            while True:
+                result = validator.validate(sql_query)
+                elapsed += result.elapsed
+                if result.ok or self.validation != "reject":
+                    break
+                SqlValidator.record_round_trip_saved()
+                if regenerations == self.MAX_REGENERATIONS:
+                    break
+                logger.warning(f"Generated SQL failed validation, regenerating:\n{result.feedback()}")
+                history += [
+                    {"role": "assistant", "content": sql_query},
+                    {"role": "user", "content": "That query does not match the schema:\n"
+                                                f"{result.feedback()}\nReply with the corrected SQL query only."},
+                ]
+                regenerations += 1
+                sql_query = self.groq_config.generate_sql(question, history)
+            span.set(ok=result.ok, regenerations=regenerations)
+
+        if not result.ok:
+            if self.validation == "reject":
+                raise Exception(f"Generated SQL does not match the schema:\n{result.feedback()}")
+            logger.warning(f"Generated SQL does not match the schema:\n{result.feedback()}")
+        return sql_query, {
+            "ok": result.ok,
+            "regenerations": regenerations,
+            "issues": [issue.to_dict() for issue in result.issues],
+            "elapsed": elapsed,
+        }
+
+    def _run_natural_query(self, question: str, bypass_cache: bool, speculative: int,
+                           row_limit: Optional[int] = None,
+                           statement_timeout_ms: Optional[int] = None) -> dict:
+        """Look up or generate the SQL for a question and execute it"""
+        cache_key = None
+        sql_query = None
+        template_hit = False
+        if self.query_cache is not None:
+            with tracer.span("query_cache") as span:
+                cache_key = self._query_cache_key(question)
+                if not bypass_cache:
+                    sql_query = self.query_cache.get(cache_key, count=False)
+                    if sql_query is None:
+                        sql_query = self._template_lookup(question)
+                        template_hit = sql_query is not None
+                    self.query_cache.record_lookup(sql_query is not None)
+                span.set(hit=sql_query is not None, template_hit=template_hit)
+
+        cache_hit = sql_query is not None
+        generation = None
+        speculation = None
+        validation = None
+        if not cache_hit:
+            mode = "speculative" if speculative > 1 else "stream" if self.groq_config.stream else "sequential"
+            with tracer.span("generate", mode=mode, retries=0):
+                if speculative > 1:
+                    sql_query, speculation = self._generate_speculative(question, speculative)
+                elif self.groq_config.stream:
+                    sql_query, generation = self.groq_config.generate_sql_stream(question)
+                else:
+                    sql_query = self.groq_config.generate_sql(question)
+            if self.validation != "off" and speculative <= 1:
+                sql_query, validation = self._validate_generated(question, sql_query)
+        logger.info(f"Generated SQL{' (cached)' if cache_hit else ''}: {sql_query}")
+        
+        result = self.execute_sql(sql_query, row_limit=row_limit, statement_timeout_ms=statement_timeout_ms)
+
+        if cache_key is not None and (template_hit or not cache_hit):
+            self.query_cache.put(cache_key, sql_query, question, self.schema_name)
+            if not cache_hit:
+                self._template_store(question, sql_query)
+
+        response = {
+            "question": question,
+            "sql_query": sql_query,
+            "result": result,
+            "cache_hit": cache_hit
+        }
+        if template_hit:
+            response["template_hit"] = True
+        if generation is not None:
+            response["generation"] = generation
+        if speculation is not None:
+            response["speculative"] = speculation
+        if validation is not None:
+            response["validation"] = validation
+        return response
+
+    def execute_natural_query(self, question: str, bypass_cache: bool = False,
+                              speculative: int = 0, row_limit: Optional[int] = None,
+                              statement_timeout_ms: Optional[int] = None) -> dict:
         """Execute a natural language query
         
         Args:
             question (str): Natural language question
+            bypass_cache (bool): Regenerate the SQL even if it is cached; the
+                fresh SQL replaces the cached entry
+            speculative (int): If greater than 1, request this many candidates
+                concurrently and use the first one that passes EXPLAIN instead
+                of the sequential retry loop
+            row_limit (int, optional): Return at most this many rows
+            statement_timeout_ms (int, optional): Lower the policy's
+                statement_timeout for this question's query
             
         Returns:
-            dict: Contains question, SQL, and results
+            dict: Contains question, SQL, results and whether the SQL came
+                from the query cache; in streaming mode also generation timings,
+                in speculative mode a summary of the candidates, and for freshly
+                generated SQL the result of catalog validation
         """
         try:
-            sql_query = self.groq_config.generate_sql(question)
-            logger.info(f"Generated SQL: {sql_query}")
-            
-            result = self.execute_sql(sql_query) 
-    
-            return {
-                "question": question,
-                "sql_query": sql_query,
-                "result": result
-            }
-            
+            with tracer.span("natural_query", schema=self.schema_name) as trace:
+                response = self._run_natural_query(question, bypass_cache, speculative, row_limit,
+                                                   statement_timeout_ms)
+            if isinstance(trace, Span):
+                response["trace"] = trace.to_dict()
+            return response
+
         except Exception as e:
             logger.error(f"Error executing natural query: {e}")
             raise
 
+    def close(self) -> None:
+        """Close the query cache this connector opened; a cache passed in is left open"""
+        if self._owns_query_cache and self.query_cache is not None:
+            self.query_cache.close()
+            self.query_cache = None
+
     def interactive_mode(self):
         """Start interactive query mode"""
         print("Welcome to SQL Query Assistant!")
@@ -111,9 +634,17 @@ class DatabaseConnector:
                 break
                 
             try:
-                result = self.execute_natural_query(question)
+                row_limit = self.execution_policy.interactive_row_limit
+                # One row past the limit tells a cut-off result from one that just fits
+                result = self.execute_natural_query(
+                    question, row_limit=row_limit + 1 if row_limit is not None else None
+                )
                 print("\nGenerated SQL:", result["sql_query"])
-                print("Result:", result["result"])
+                rows = result["result"].split("\n")
+                if row_limit is not None and len(rows) > row_limit:
+                    print(f"Result (first {row_limit} rows):", "\n".join(rows[:row_limit]))
+                else:
+                    print("Result:", result["result"])
             except Exception as e:
                 print(f"Error: {e}")
 
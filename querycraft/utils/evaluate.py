@@ -0,0 +1,216 @@
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.latency_stats import summarize
+from querycraft.utils.tracing import tracer
+
+# Marker sql_to_llm appends before generated SQL in a question file
+LLM_OUTPUT_MARKER = "\n-- LLM Generated SQL\n"
+ROW_COUNT_PATTERN = re.compile(r"^\(\d+ rows?\)$")
+SEPARATOR_PATTERN = re.compile(r"^-+(\+-+)*$")
+# Pipeline stages reported per question
+STAGES = ("query_cache", "generate", "validate", "execute")
+
+
+class Case:
+    """One question of a suite with its expected rows"""
+
+    __slots__ = ("suite", "name", "question", "expected_rows")
+
+    def __init__(self, suite: str, name: str, question: str, expected_rows: list):
+        self.suite = suite
+        self.name = name
+        self.question = question
+        self.expected_rows = expected_rows
+
+
+def parse_psql_output(text: str) -> list:
+    """Rows of psql output as tuples of strings
+
+    Aligned output (header, dashed separator, ``(n rows)`` footer) and
+    unaligned ``psql -t -A`` output are both accepted; the header is dropped.
+
+    >>> parse_psql_output(" title | rate\\n-------+------\\n ALI   | 4.99\\n(1 row)\\n")
+    [('ALI', '4.99')]
+    >>> parse_psql_output("1|Apple\\n2|")
+    [('1', 'Apple'), ('2', '')]
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if lines and ROW_COUNT_PATTERN.match(lines[-1].strip()):
+        lines = lines[:-1]
+    if len(lines) >= 2 and SEPARATOR_PATTERN.match(lines[1].strip()):
+        return [tuple(cell.strip() for cell in line.split(" | ")) for line in lines[2:]]
+    if text.strip() == "No results found":
+        return []
+    return [tuple(cell.strip() for cell in line.split("|")) for line in lines]
+
+
+def row_multiset_hash(rows) -> str:
+    """Order-insensitive hash of a multiset of rows
+
+    Each row is hashed on its own and the row hashes are summed, so row
+    order does not matter but duplicate rows do.
+
+    >>> row_multiset_hash([("1", "a"), ("2", "b")]) == row_multiset_hash([("2", "b"), ("1", "a")])
+    True
+    >>> row_multiset_hash([("1",)]) == row_multiset_hash([("1",), ("1",)])
+    False
+    """
+    total = 0
+    count = 0
+    for row in rows:
+        digest = hashlib.sha256("\x1f".join(str(cell).strip() for cell in row).encode()).digest()
+        total = (total + int.from_bytes(digest[:16], "big")) % (1 << 128)
+        count += 1
+    return f"{count}:{total:032x}"
+
+
+def load_suite(suite_dir: Path) -> list:
+    """Questions of a pagila-hw style suite (``sql/NN.sql`` and ``expected/NN.out``)
+
+    Output appended by sql_to_llm is not part of the question. Questions
+    without an expected output are skipped.
+    """
+    suite_dir = Path(suite_dir)
+    cases = []
+    for sql_file in sorted((suite_dir / "sql").glob("*.sql")):
+        expected_file = suite_dir / "expected" / f"{sql_file.stem}.out"
+        if not expected_file.exists():
+            continue
+        question = sql_file.read_text().split(LLM_OUTPUT_MARKER)[0].strip()
+        cases.append(Case(suite_dir.name, sql_file.stem, question, parse_psql_output(expected_file.read_text())))
+    return cases
+
+
+def _stage_metrics(trace: Optional[dict]) -> tuple:
+    """Seconds per stage and token totals from a natural query trace"""
+    latency = {}
+    tokens = {"prompt": 0, "completion": 0}
+    if trace is None:
+        return latency, tokens
+    for child in trace.get("children", []):
+        if child["name"] in STAGES:
+            latency[child["name"]] = latency.get(child["name"], 0.0) + (child["duration"] or 0.0)
+    pending = [trace]
+    while pending:
+        span = pending.pop()
+        tokens["prompt"] += span.get("prompt_tokens") or 0
+        tokens["completion"] += span.get("completion_tokens") or 0
+        pending.extend(span.get("children", []))
+    return latency, tokens
+
+
+def run_case(db, case: Case, use_cache: bool = False) -> dict:
+    """Answer one question and compare its rows with the expected ones"""
+    start = time.perf_counter()
+    result = {"suite": case.suite, "name": case.name, "passed": False, "sql": None, "error": None}
+    response = None
+    try:
+        response = db.execute_natural_query(case.question, bypass_cache=not use_cache)
+        rows = parse_psql_output(response["result"])
+        result["sql"] = response["sql_query"]
+        result["expected_hash"] = row_multiset_hash(case.expected_rows)
+        result["actual_hash"] = row_multiset_hash(rows)
+        result["passed"] = result["expected_hash"] == result["actual_hash"]
+        result["rows"] = {"expected": len(case.expected_rows), "actual": len(rows)}
+    except Exception as e:
+        result["error"] = str(e)
+    latency, tokens = _stage_metrics(response.get("trace") if response else None)
+    latency["total"] = time.perf_counter() - start
+    result["latency"] = latency
+    result["tokens"] = tokens
+    return result
+
+
+def evaluate(cases: list, connector_for: Callable, workers: int = 4, use_cache: bool = False) -> dict:
+    """Run cases from any number of suites concurrently
+
+    Args:
+        cases (list): Case objects
+        connector_for (callable): Suite name -> DatabaseConnector (or any
+            object with ``execute_natural_query``); called once per suite
+        workers (int): Questions evaluated at the same time
+        use_cache (bool): Serve SQL from the query cache when possible;
+            by default every question is generated afresh
+
+    Returns:
+        dict: Totals, per-suite accuracy, latency summaries per stage, token
+            totals and one entry per case
+    """
+    connectors = {suite: connector_for(suite) for suite in dict.fromkeys(case.suite for case in cases)}
+    was_enabled = tracer.enabled
+    tracer.enable()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda case: run_case(connectors[case.suite], case, use_cache), cases))
+    finally:
+        if not was_enabled:
+            tracer.disable()
+    elapsed = time.perf_counter() - start
+
+    suites = {}
+    for result in results:
+        suite = suites.setdefault(result["suite"], {"passed": 0, "total": 0})
+        suite["passed"] += result["passed"]
+        suite["total"] += 1
+    for suite in suites.values():
+        suite["accuracy"] = suite["passed"] / suite["total"]
+
+    return {
+        "passed": sum(result["passed"] for result in results),
+        "total": len(results),
+        "elapsed": elapsed,
+        "suites": suites,
+        "latency": {
+            stage: summarize(result["latency"][stage] for result in results if stage in result["latency"])
+            for stage in STAGES + ("total",)
+        },
+        "tokens": {
+            kind: sum(result["tokens"][kind] for result in results) for kind in ("prompt", "completion")
+        },
+        "cases": results,
+    }
+
+
+def main(suites: list, workers: int = 4, output: Optional[str] = None, use_cache: bool = False) -> dict:
+    cases = [case for suite in suites for case in load_suite(Path("test_databases") / suite)]
+
+    def connector_for(suite):
+        return DatabaseConnector(schema_name=suite, use_query_cache=use_cache)
+
+    report = evaluate(cases, connector_for, workers=workers, use_cache=use_cache)
+
+    for suite, stats in report["suites"].items():
+        print(f"{suite:>12}: {stats['passed']}/{stats['total']} passed")
+    for result in report["cases"]:
+        if not result["passed"]:
+            print(f"  FAIL {result['suite']}/{result['name']}: {result['error'] or result.get('rows')}")
+    total = report["latency"]["total"]
+    print(f"{report['passed']}/{report['total']} passed in {report['elapsed']:.2f}s "
+          f"(p50 {total['p50']:.2f}s, p95 {total['p95']:.2f}s per question, "
+          f"{report['tokens']['prompt'] + report['tokens']['completion']} tokens)")
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate generated SQL against expected query results")
+    parser.add_argument("suites", nargs="+", help="directories under test_databases, e.g. pagila-hw")
+    parser.add_argument("--workers", type=int, default=4, help="questions evaluated concurrently")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--cache", action="store_true", help="serve SQL from the query cache")
+    args = parser.parse_args()
+
+    report = main(args.suites, workers=args.workers, output=args.output, use_cache=args.cache)
+    sys.exit(0 if report["passed"] == report["total"] else 1)
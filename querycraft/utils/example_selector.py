@@ -0,0 +1,198 @@
+import os
+import re
+import zlib
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from querycraft.utils.cache_dir import get_cache_dir
+from querycraft.utils.schema_retriever import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def _example_key(example: dict) -> str:
+    """Stable identity of an example, used to reuse its vector across rebuilds"""
+    text = f"{example.get('question', '')}\x00{example.get('sql', '')}"
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def format_example(example: dict) -> str:
+    """Render one example the way SchemaLoader.get_examples does"""
+    return f"Question: {example['question']}\nSQL: {example['sql']}\n"
+
+
+class ExampleSelector:
+    """Top-k few-shot example selection over a schema's example_queries
+
+    Example questions are embedded as hashed word and character n-gram
+    TF-IDF vectors in a dense NumPy matrix. Raw n-gram counts are persisted
+    per example, keyed by a hash of the example, so when the YAML changes only
+    new or edited examples are re-vectorized.
+    """
+
+    # Shared across instances: resolved yaml path -> (content digest, selector)
+    _selector_cache = {}
+    _selector_cache_lock = threading.Lock()
+
+    def __init__(self, examples: list[dict], index_path: Optional[Path] = None,
+                 dim: int = 4096, char_ngrams: tuple = (3, 4)):
+        """Build (or incrementally update) the index
+
+        Args:
+            examples (list): Entries of the YAML's example_queries
+            index_path (Path, optional): .npz file persisting the count vectors
+            dim (int): Number of hash buckets per vector
+            char_ngrams (tuple): Smallest and largest character n-gram length
+        """
+        self.examples = [ex for ex in examples if ex.get('question') and ex.get('sql')]
+        self.index_path = Path(index_path) if index_path else None
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self.vectorized = 0
+
+        counts = self._load_counts()
+        self._build(counts)
+        if self.index_path is not None and self.vectorized:
+            self._save_counts()
+
+    @classmethod
+    def for_schema(cls, schema_loader) -> "ExampleSelector":
+        """Get the shared selector for a SchemaLoader, updating it if the YAML changed
+
+        Args:
+            schema_loader (SchemaLoader): Loader whose example_queries should be indexed
+
+        Returns:
+            ExampleSelector: Cached selector for the schema
+        """
+        yaml_path = schema_loader.yaml_path
+        digest = schema_loader._read_file(yaml_path)[1] if yaml_path.exists() else ""
+        key = yaml_path.resolve()
+        with cls._selector_cache_lock:
+            entry = cls._selector_cache.get(key)
+            if entry and entry[0] == digest:
+                return entry[1]
+
+        index_path = get_cache_dir("examples") / f"{schema_loader.schema_name}.npz"
+        selector = cls(schema_loader.get_example_list(), index_path=index_path)
+        with cls._selector_cache_lock:
+            cls._selector_cache[key] = (digest, selector)
+        return selector
+
+    def _features(self, text: str) -> dict[int, float]:
+        """Hashed word unigram/bigram and character n-gram counts for a text"""
+        words = re.findall(r'[a-z0-9_]+', text.lower())
+        grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        low, high = self.char_ngrams
+        for word in words:
+            padded = f" {word} "
+            for n in range(low, high + 1):
+                grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+        features = {}
+        for gram in grams:
+            bucket = zlib.crc32(gram.encode()) % self.dim
+            features[bucket] = features.get(bucket, 0.0) + 1.0
+        return features
+
+    def _vectorize(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for bucket, count in self._features(text).items():
+            vector[bucket] = count
+        return vector
+
+    def _load_counts(self) -> dict:
+        """Load persisted count vectors keyed by example hash"""
+        if self.index_path is None or not self.index_path.exists():
+            return {}
+        try:
+            with np.load(self.index_path) as data:
+                if int(data["dim"]) != self.dim or tuple(data["char_ngrams"]) != self.char_ngrams:
+                    return {}
+                return dict(zip(data["keys"].tolist(), data["counts"]))
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable example index {self.index_path}: {e}")
+            return {}
+
+    def _save_counts(self) -> None:
+        """Persist count vectors atomically"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_path.parent, prefix=f".{self.index_path.name}.",
+                                        suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, keys=np.array(self._keys), counts=self._counts,
+                         dim=self.dim, char_ngrams=np.array(self.char_ngrams))
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _build(self, cached_counts: dict) -> None:
+        """Assemble the TF-IDF matrix, vectorizing only examples not in the cache"""
+        self._keys = [_example_key(ex) for ex in self.examples]
+        self._counts = np.zeros((len(self.examples), self.dim), dtype=np.float32)
+        for row, (key, example) in enumerate(zip(self._keys, self.examples)):
+            if key in cached_counts:
+                self._counts[row] = cached_counts[key]
+            else:
+                self._counts[row] = self._vectorize(example['question'])
+                self.vectorized += 1
+
+        document_frequency = (self._counts > 0).sum(axis=0)
+        self._idf = (np.log((1 + len(self.examples)) / (1 + document_frequency)) + 1).astype(np.float32)
+        weighted = np.log1p(self._counts) * self._idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._matrix = weighted / norms
+        self._tokens = [estimate_tokens(format_example(ex)) for ex in self.examples]
+
+    def rank(self, question: str) -> np.ndarray:
+        """Cosine similarity of every example to a question"""
+        features = self._features(question)
+        if not features or not self.examples:
+            return np.zeros(len(self.examples), dtype=np.float32)
+        buckets = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        weights = np.log1p(np.fromiter(features.values(), dtype=np.float32, count=len(features)))
+        weights *= self._idf[buckets]
+        return self._matrix[:, buckets] @ (weights / np.linalg.norm(weights))
+
+    def select(self, question: str, k: int = 3, token_budget: Optional[int] = None) -> list[dict]:
+        """Pick the k examples most similar to a question
+
+        Args:
+            question (str): Natural language question
+            k (int): Maximum number of examples
+            token_budget (int, optional): Maximum estimated tokens of rendered examples
+
+        Returns:
+            list: Example dicts, most similar first
+        """
+        if not self.examples or k <= 0:
+            return []
+        scores = self.rank(question)
+        k = min(k, len(self.examples))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        selected = []
+        used = 0
+        for row in ordered:
+            cost = self._tokens[row]
+            if token_budget is not None and used + cost > token_budget:
+                continue
+            selected.append(self.examples[row])
+            used += cost
+        return selected
+
+    def format_examples(self, question: str, k: int = 3, token_budget: Optional[int] = None) -> str:
+        """Rendered prompt section with the selected examples"""
+        selected = self.select(question, k=k, token_budget=token_budget)
+        if not selected:
+            return "No example queries available."
+        return "\n".join(format_example(ex) for ex in selected)
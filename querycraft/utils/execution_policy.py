@@ -0,0 +1,233 @@
+import logging
+import threading
+from typing import Optional
+from querycraft.utils.sql_lexer import tokenize, significant_tokens
+
+logger = logging.getLogger(__name__)
+
+# Statements EXPLAIN accepts; anything else (DDL, SET, ...) skips the cost gates
+EXPLAINABLE_STATEMENTS = {"select", "with", "insert", "update", "delete", "values", "table"}
+GATE_ACTIONS = ("reject", "warn")
+
+
+def statement_kind(sql_query: str) -> Optional[str]:
+    """Lower-cased first keyword of a statement
+
+    >>> statement_kind("  with t AS (SELECT 1) SELECT * FROM t")
+    'with'
+    """
+    tokens = significant_tokens(sql_query)
+    while tokens and tokens[0].value == '(':
+        tokens = tokens[1:]
+    if not tokens or tokens[0].kind != 'word':
+        return None
+    return tokens[0].value.lower()
+
+
+def apply_row_limit(sql_query: str, limit: int) -> tuple:
+    """Make a read-only query return at most ``limit`` rows
+
+    A missing top-level LIMIT is appended and a literal one above ``limit``
+    is lowered. One extra row is requested so callers can tell whether the
+    result was cut off.
+
+    Args:
+        sql_query (str): SQL statement
+        limit (int): Maximum number of rows to return
+
+    Returns:
+        tuple: (possibly rewritten SQL, whether it was changed)
+
+    >>> apply_row_limit("SELECT * FROM film;", 100)
+    ('SELECT * FROM film\\nLIMIT 101', True)
+    >>> apply_row_limit("SELECT 1; -- one row", 100)
+    ('SELECT 1\\nLIMIT 101', True)
+    >>> apply_row_limit("SELECT * FROM film LIMIT 5000", 100)
+    ('SELECT * FROM film LIMIT 101', True)
+    >>> apply_row_limit("SELECT * FROM (SELECT 1 LIMIT 500) t LIMIT 10", 100)
+    ('SELECT * FROM (SELECT 1 LIMIT 500) t LIMIT 10', False)
+    >>> apply_row_limit("DELETE FROM film", 100)
+    ('DELETE FROM film', False)
+    """
+    if statement_kind(sql_query) not in ("select", "with", "values", "table"):
+        return sql_query, False
+    tokens = significant_tokens(sql_query)
+    depth = 0
+    for j, token in enumerate(tokens):
+        if token.value == '(':
+            depth += 1
+        elif token.value == ')':
+            depth -= 1
+        elif depth == 0 and token.kind == 'word':
+            word = token.value.lower()
+            if word in ('insert', 'update', 'delete'):
+                return sql_query, False  # data-modifying CTE
+            if word == 'fetch':
+                return sql_query, False
+            if word == 'limit':
+                if j + 1 < len(tokens) and tokens[j + 1].kind == 'number' and int(float(tokens[j + 1].value)) > limit:
+                    return _replace_token(sql_query, j + 1, str(limit + 1)), True
+                if j + 1 < len(tokens) and tokens[j + 1].kind == 'word' and tokens[j + 1].value.lower() == 'all':
+                    return _replace_token(sql_query, j + 1, str(limit + 1)), True
+                return sql_query, False
+    # Drop the terminator with any comments and whitespace around it
+    parts = tokenize(sql_query)
+    end = len(parts)
+    while end and (parts[end - 1].kind in ('whitespace', 'comment') or parts[end - 1].value == ';'):
+        end -= 1
+    body = "".join(token.value for token in parts[:end])
+    return f"{body}\nLIMIT {limit + 1}", True
+
+
+def literal_row_limit(sql_query: str) -> Optional[int]:
+    """Top-level literal LIMIT of a read-only query, or None if its size is not bounded by one
+
+    >>> literal_row_limit("SELECT * FROM film LIMIT 101"), literal_row_limit("SELECT * FROM film")
+    (101, None)
+    >>> literal_row_limit("SELECT * FROM (SELECT 1 LIMIT 5) t")
+    """
+    if statement_kind(sql_query) not in ("select", "with", "values", "table"):
+        return None
+    tokens = significant_tokens(sql_query)
+    depth = 0
+    for j, token in enumerate(tokens):
+        if token.value == '(':
+            depth += 1
+        elif token.value == ')':
+            depth -= 1
+        elif depth == 0 and token.kind == 'word' and token.value.lower() == 'limit':
+            if j + 1 < len(tokens) and tokens[j + 1].kind == 'number':
+                return int(float(tokens[j + 1].value))
+            return None
+    return None
+
+
+def _replace_token(sql_query: str, index: int, value: str) -> str:
+    """Replace the index-th significant token, leaving comments and spacing untouched"""
+    parts = []
+    seen = -1
+    for token in tokenize(sql_query):
+        if token.kind not in ('whitespace', 'comment'):
+            seen += 1
+            if seen == index:
+                token = token._replace(value=value)
+        parts.append(token.value)
+    return "".join(parts)
+
+
+def plan_estimates(plan) -> tuple:
+    """Total cost and row estimate of the top node of an EXPLAIN (FORMAT JSON) plan
+
+    >>> plan_estimates([{"Plan": {"Node Type": "Seq Scan", "Total Cost": 98.5, "Plan Rows": 1000}}])
+    (98.5, 1000)
+    """
+    top = plan[0]["Plan"]
+    return float(top["Total Cost"]), int(top["Plan Rows"])
+
+
+class ExecutionPolicy:
+    """Limits applied to generated SQL before and while it runs
+
+    Cost gates compare the planner's estimates from ``EXPLAIN`` against
+    ``max_cost`` and ``max_estimated_rows`` before the statement is executed.
+    ``statement_timeout_ms`` is set on the database session, and
+    ``interactive_row_limit`` caps the rows of read-only queries run from the
+    interactive prompt. Policies are configured per schema in the
+    ``execution_policy`` section of the schema's YAML file.
+    """
+
+    GATES = ("max_cost", "max_estimated_rows", "statement_timeout", "row_limit")
+
+    def __init__(self, max_cost: Optional[float] = None, max_estimated_rows: Optional[int] = None,
+                 on_exceed: str = "reject", statement_timeout_ms: Optional[int] = 30000,
+                 interactive_row_limit: Optional[int] = 100):
+        """Initialize the policy
+
+        Args:
+            max_cost (float, optional): Largest acceptable planner cost estimate
+            max_estimated_rows (int, optional): Largest acceptable planner row
+                estimate for the statement's result
+            on_exceed (str): "reject" raises before executing a statement
+                over a cost gate, "warn" logs and executes it anyway
+            statement_timeout_ms (int, optional): Postgres statement_timeout for
+                the session; None leaves the server default
+            interactive_row_limit (int, optional): Maximum rows returned by a
+                read-only query in interactive mode
+
+        Raises:
+            ValueError: If on_exceed is unknown
+        """
+        if on_exceed not in GATE_ACTIONS:
+            raise ValueError(f"on_exceed must be one of: {', '.join(GATE_ACTIONS)}")
+        self.max_cost = max_cost
+        self.max_estimated_rows = max_estimated_rows
+        self.on_exceed = on_exceed
+        self.statement_timeout_ms = statement_timeout_ms
+        self.interactive_row_limit = interactive_row_limit
+        self.stats = {"explained": 0, "rejected": 0, "gates": dict.fromkeys(self.GATES, 0)}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, config: Optional[dict]) -> "ExecutionPolicy":
+        """Build a policy from an ``execution_policy`` YAML section
+
+        >>> ExecutionPolicy.from_dict({"max_cost": 1e6, "statement_timeout_ms": None}).statement_timeout_ms is None
+        True
+        """
+        config = dict(config or {})
+        unknown = set(config) - {"max_cost", "max_estimated_rows", "on_exceed",
+                                 "statement_timeout_ms", "interactive_row_limit"}
+        if unknown:
+            raise ValueError(f"Unknown execution_policy settings: {', '.join(sorted(unknown))}")
+        return cls(**config)
+
+    @classmethod
+    def for_schema(cls, schema_loader) -> "ExecutionPolicy":
+        """Policy configured in a schema's YAML file, or the defaults"""
+        if not schema_loader.yaml_path.exists():
+            return cls()
+        data = schema_loader._load_yaml(schema_loader.yaml_path) or {}
+        return cls.from_dict(data.get("execution_policy"))
+
+    @property
+    def explains(self) -> bool:
+        """Whether statements need an EXPLAIN before they are executed"""
+        return self.max_cost is not None or self.max_estimated_rows is not None
+
+    def record(self, gate: str) -> None:
+        """Count one firing of a gate"""
+        with self._lock:
+            self.stats["gates"][gate] += 1
+
+    def snapshot(self) -> dict:
+        """Copy of the counters"""
+        with self._lock:
+            return dict(self.stats, gates=dict(self.stats["gates"]))
+
+    def check_plan(self, plan) -> tuple:
+        """Apply the cost gates to an EXPLAIN (FORMAT JSON) plan
+
+        Returns:
+            tuple: (estimated cost, estimated rows)
+
+        Raises:
+            Exception: If an estimate exceeds its gate and on_exceed is "reject"
+        """
+        cost, rows = plan_estimates(plan)
+        with self._lock:
+            self.stats["explained"] += 1
+        problems = []
+        if self.max_cost is not None and cost > self.max_cost:
+            self.record("max_cost")
+            problems.append(f"estimated cost {cost:.0f} exceeds max_cost {self.max_cost:g}")
+        if self.max_estimated_rows is not None and rows > self.max_estimated_rows:
+            self.record("max_estimated_rows")
+            problems.append(f"estimated {rows} rows exceeds max_estimated_rows {self.max_estimated_rows}")
+        if problems:
+            message = "; ".join(problems)
+            if self.on_exceed == "reject":
+                with self._lock:
+                    self.stats["rejected"] += 1
+                raise Exception(f"Query rejected by execution policy: {message}")
+            logger.warning(f"Query exceeds execution policy: {message}")
+        return cost, rows
@@ -0,0 +1,34 @@
+import math
+
+
+def percentile(values, q: float) -> float:
+    """Linearly interpolated percentile of a sequence
+
+    Args:
+        values: Numbers to summarize
+        q (float): Percentile between 0 and 100
+
+    >>> percentile([1, 2, 3, 4], 50)
+    2.5
+    >>> percentile([5], 99)
+    5.0
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return float(ordered[low] + (ordered[high] - ordered[low]) * (rank - low))
+
+
+def summarize(values) -> dict:
+    """Count, mean and tail percentiles of latency samples (seconds)"""
+    values = list(values)
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
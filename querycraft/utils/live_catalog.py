@@ -0,0 +1,243 @@
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+from querycraft.utils.cache_dir import get_cache_dir
+from querycraft.utils.catalog import SchemaCatalog, Table, Column, ForeignKey, UserType
+from querycraft.utils.sql_lexer import statement_tables
+
+logger = logging.getLogger(__name__)
+
+# One round trip summarizing everything the catalog is built from. Table
+# rewrites change relfilenode, column changes change pg_attribute, new keys
+# add pg_constraint rows and CREATE OR REPLACE VIEW updates pg_rewrite.
+FINGERPRINT_QUERY = """
+SELECT md5(concat_ws('|',
+    (SELECT string_agg(c.oid || ':' || c.relname || ':' || c.relkind || ':' || c.relfilenode, ',' ORDER BY c.oid)
+       FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+      WHERE n.nspname = ANY(%(schemas)s) AND c.relkind IN ('r', 'p', 'v', 'm')),
+    (SELECT string_agg(a.attrelid || ':' || a.attnum || ':' || a.attname || ':' || a.atttypid || ':'
+                       || a.atttypmod || ':' || a.attnotnull, ',' ORDER BY a.attrelid, a.attnum)
+       FROM pg_attribute a
+       JOIN pg_class c ON c.oid = a.attrelid
+       JOIN pg_namespace n ON n.oid = c.relnamespace
+      WHERE n.nspname = ANY(%(schemas)s) AND c.relkind IN ('r', 'p', 'v', 'm')
+        AND a.attnum > 0 AND NOT a.attisdropped),
+    (SELECT string_agg(con.oid::text, ',' ORDER BY con.oid)
+       FROM pg_constraint con JOIN pg_namespace n ON n.oid = con.connamespace
+      WHERE n.nspname = ANY(%(schemas)s)),
+    (SELECT string_agg(r.ev_class || ':' || r.xmin, ',' ORDER BY r.ev_class)
+       FROM pg_rewrite r
+       JOIN pg_class c ON c.oid = r.ev_class
+       JOIN pg_namespace n ON n.oid = c.relnamespace
+      WHERE n.nspname = ANY(%(schemas)s)),
+    (SELECT string_agg(d.objoid || ':' || d.objsubid || ':' || md5(d.description), ',' ORDER BY d.objoid, d.objsubid)
+       FROM pg_description d
+       JOIN pg_class c ON c.oid = d.objoid AND d.classoid = 'pg_class'::regclass
+       JOIN pg_namespace n ON n.oid = c.relnamespace
+      WHERE n.nspname = ANY(%(schemas)s))
+))
+"""
+
+RELATIONS_QUERY = """
+SELECT n.nspname, c.relname, c.relkind, parent.relname,
+       CASE WHEN c.relkind = 'p' THEN pg_get_partkeydef(c.oid) END,
+       obj_description(c.oid, 'pg_class'),
+       CASE WHEN c.relkind IN ('v', 'm') THEN pg_get_viewdef(c.oid, true) END
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_inherits i ON i.inhrelid = c.oid AND c.relispartition
+LEFT JOIN pg_class parent ON parent.oid = i.inhparent
+WHERE n.nspname = ANY(%(schemas)s) AND c.relkind IN ('r', 'p', 'v', 'm')
+ORDER BY n.nspname, c.relname
+"""
+
+COLUMNS_QUERY = """
+SELECT c.table_schema, c.table_name, c.column_name,
+       CASE WHEN c.data_type = 'USER-DEFINED' THEN c.udt_schema || '.' || c.udt_name
+            WHEN c.data_type = 'ARRAY' THEN ltrim(c.udt_name, '_') || '[]'
+            WHEN c.character_maximum_length IS NOT NULL
+                THEN c.data_type || '(' || c.character_maximum_length || ')'
+            WHEN c.data_type = 'numeric' AND c.numeric_precision IS NOT NULL
+                THEN 'numeric(' || c.numeric_precision || ',' || c.numeric_scale || ')'
+            ELSE c.data_type END,
+       c.is_nullable = 'YES',
+       c.column_default,
+       col_description(format('%%I.%%I', c.table_schema, c.table_name)::regclass, c.ordinal_position::int)
+FROM information_schema.columns c
+WHERE c.table_schema = ANY(%(schemas)s)
+ORDER BY c.table_schema, c.table_name, c.ordinal_position
+"""
+
+CONSTRAINTS_QUERY = """
+SELECT n.nspname, rel.relname, con.conname, con.contype,
+       ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+             JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+             ORDER BY k.ord)::text[],
+       frel.relname,
+       ARRAY(SELECT a.attname FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, ord)
+             JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+             ORDER BY k.ord)::text[]
+FROM pg_constraint con
+JOIN pg_class rel ON rel.oid = con.conrelid
+JOIN pg_namespace n ON n.oid = rel.relnamespace
+LEFT JOIN pg_class frel ON frel.oid = con.confrelid
+WHERE n.nspname = ANY(%(schemas)s) AND con.contype IN ('p', 'f') AND con.conparentid = 0
+ORDER BY n.nspname, rel.relname, con.conname
+"""
+
+TYPES_QUERY = """
+SELECT t.typname, t.typtype,
+       ARRAY(SELECT e.enumlabel FROM pg_enum e WHERE e.enumtypid = t.oid ORDER BY e.enumsortorder)::text[],
+       CASE WHEN t.typtype = 'd' THEN format_type(t.typbasetype, t.typtypmod) END
+FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace
+WHERE n.nspname = ANY(%(schemas)s) AND t.typtype IN ('e', 'd')
+ORDER BY t.typname
+"""
+
+
+class LiveCatalog:
+    """Schema catalog introspected from a running database
+
+    The catalog is rebuilt from ``information_schema`` and ``pg_catalog``
+    only when a one-query fingerprint of the catalog tables changes. Results
+    are shared in memory by every instance for the same database and kept on
+    disk, so a restarted process only pays for the fingerprint query.
+    """
+
+    # Shared across instances: cache key -> (fingerprint, catalog)
+    _memory_cache = {}
+    _memory_cache_lock = threading.Lock()
+
+    def __init__(self, pool, name: str, schemas: tuple = ("public",),
+                 artifact_dir: Optional[Path] = None, check_interval: float = 5.0):
+        """Initialize the live catalog
+
+        Args:
+            pool (PostgresPool): Pool used for introspection queries
+            name (str): Name of the database/schema, used for cache keys
+            schemas (tuple): Postgres schemas (namespaces) to include
+            artifact_dir (Path, optional): Where catalogs are kept on disk;
+                defaults to the querycraft cache dir
+            check_interval (float): Seconds during which the last fingerprint
+                is trusted without asking the database again
+        """
+        self.pool = pool
+        self.name = name
+        self.schemas = tuple(schemas)
+        self.artifact_dir = Path(artifact_dir) if artifact_dir is not None else get_cache_dir("live_catalog")
+        self.check_interval = check_interval
+        self.stats = {"checks": 0, "introspections": 0, "disk_hits": 0}
+        self._last_check = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{','.join(self.schemas)}"
+
+    @property
+    def artifact_path(self) -> Path:
+        digest = hashlib.sha256(self.cache_key.encode()).hexdigest()[:16]
+        return self.artifact_dir / f"{self.name}-{digest}.json"
+
+    def _query(self, sql_query: str) -> list:
+        _, rows = self.pool.execute(sql_query, {"schemas": list(self.schemas)})
+        return rows
+
+    def fingerprint(self) -> str:
+        """Hash of the catalog state, computed by the database in one query"""
+        self.stats["checks"] += 1
+        return self._query(FINGERPRINT_QUERY)[0][0] or ""
+
+    def introspect(self) -> SchemaCatalog:
+        """Build a catalog from the database's system catalogs"""
+        start = time.perf_counter()
+        catalog = SchemaCatalog()
+
+        for schema, name, relkind, parent, partition_key, comment, view_definition in self._query(RELATIONS_QUERY):
+            table = Table(name, schema, kind="view" if relkind in ("v", "m") else "table")
+            table.partition_of = parent
+            table.partition_key = partition_key
+            table.comment = comment
+            if view_definition is not None:
+                keyword = "MATERIALIZED VIEW" if relkind == "m" else "VIEW"
+                table.ddl = f"CREATE {keyword} {schema}.{name} AS\n{view_definition.rstrip().rstrip(';')};"
+                table.view_references = tuple(sorted(statement_tables(view_definition)[0]))
+            catalog.tables[name] = table
+
+        for schema, table_name, name, data_type, nullable, default, comment in self._query(COLUMNS_QUERY):
+            table = catalog.tables.get(table_name)
+            if table is not None:
+                table.columns.append(Column(name, data_type, nullable, default, comment))
+
+        for schema, table_name, name, contype, columns, ref_table, ref_columns in self._query(CONSTRAINTS_QUERY):
+            table = catalog.tables.get(table_name)
+            if table is None:
+                continue
+            if contype == "p":
+                table.primary_key = tuple(columns)
+            else:
+                table.foreign_keys.append(ForeignKey(columns, ref_table, ref_columns, name))
+
+        for name, typtype, labels, base_type in self._query(TYPES_QUERY):
+            if typtype == "e":
+                catalog.types[name] = UserType(name, "enum", labels)
+            else:
+                catalog.types[name] = UserType(name, "domain", base_type=base_type)
+
+        for table in catalog.tables.values():
+            if table.kind == "table":
+                table.ddl = table.to_ddl()
+
+        self.stats["introspections"] += 1
+        logger.info(f"Introspected {len(catalog.tables)} relations of {self.cache_key} "
+                    f"in {time.perf_counter() - start:.3f}s")
+        return catalog
+
+    def _load_artifact(self, fingerprint: str) -> Optional[SchemaCatalog]:
+        data = SchemaCatalog._read_artifact(self.artifact_path)
+        if data is None or data.get("fingerprint") != fingerprint:
+            return None
+        self.stats["disk_hits"] += 1
+        return SchemaCatalog.from_dict(data)
+
+    def get(self) -> tuple:
+        """Current catalog and its fingerprint, re-introspecting only after a change
+
+        Returns:
+            tuple: (SchemaCatalog, fingerprint)
+        """
+        with self._lock:
+            with self._memory_cache_lock:
+                entry = self._memory_cache.get(self.cache_key)
+            now = time.monotonic()
+            if entry is not None and self._last_check is not None and \
+                    now - self._last_check < self.check_interval:
+                return entry[1], entry[0]
+
+            fingerprint = self.fingerprint()
+            self._last_check = now
+            if entry is not None and entry[0] == fingerprint:
+                return entry[1], fingerprint
+
+            catalog = self._load_artifact(fingerprint)
+            if catalog is None:
+                catalog = self.introspect()
+                catalog.save(self.artifact_path, fingerprint=fingerprint)
+            with self._memory_cache_lock:
+                self._memory_cache[self.cache_key] = (fingerprint, catalog)
+            return catalog, fingerprint
+
+    def catalog(self) -> SchemaCatalog:
+        return self.get()[0]
+
+    def schema_context(self) -> str:
+        """DDL of every table and view, rendered from the live catalog"""
+        return self.catalog().schema_context()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._memory_cache_lock:
+            cls._memory_cache.clear()
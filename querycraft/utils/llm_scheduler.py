@@ -0,0 +1,355 @@
+import os
+import time
+import random
+import logging
+import threading
+from typing import Awaitable, Callable, Optional
+from querycraft.backends.base import TransientLLMError, RateLimitError, InvalidResponseError
+from querycraft.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend that has been failing"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate
+
+    ``reserve`` takes tokens immediately and returns how long the caller
+    must wait for them, so waiting happens outside the lock and callers are
+    served in the order they reserved, from threads and coroutines alike.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """Initialize a full bucket
+
+        Args:
+            per_minute (float): Refill rate
+            capacity (float, optional): Burst size; defaults to one minute's worth
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens (at most the capacity)
+
+        >>> bucket = TokenBucket(60, capacity=1)
+        >>> bucket.reserve(), round(bucket.reserve(), 1)
+        (0.0, 1.0)
+
+        Returns:
+            float: Seconds until the tokens are actually available
+        """
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+            return -self._level / self.rate if self._level < 0 else 0.0
+
+    def charge(self, amount: float) -> None:
+        """Take tokens known only after a request, possibly leaving the bucket in debt"""
+        with self._lock:
+            self._refill()
+            self._level -= amount
+
+
+class CircuitBreaker:
+    """Fails fast after repeated transient failures of a backend
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are refused for ``reset_timeout`` seconds. Then one trial call is
+    let through (half open): success closes the circuit, failure opens it
+    again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[float]:
+        """Whether a call may proceed
+
+        Returns:
+            float: None if the call may proceed, otherwise the seconds until
+                the circuit half-opens
+        """
+        with self._lock:
+            if self.state == "closed":
+                return None
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self._trial_running:
+                return 0.0
+            self.state = "half_open"
+            self._trial_running = True
+            return None
+
+    def release(self) -> None:
+        """Free the half-open trial slot of a call that ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self.state == "half_open":
+                self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Count a transient failure
+
+        Returns:
+            bool: True if this failure opened the circuit
+        """
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class RequestScheduler:
+    """Shared gate for every LLM call of the process
+
+    Each call waits for the requests/tokens-per-minute budget and for any
+    Retry-After pause, then runs. Transient failures are retried with
+    exponential backoff and full jitter (never sooner than the server's
+    Retry-After), and a per-backend circuit breaker refuses calls while a
+    backend keeps failing.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, seed: Optional[int] = None):
+        """Initialize the scheduler
+
+        Args:
+            max_attempts (int): Attempts per call, including the first
+            base_delay (float): Backoff before the first retry (seconds); the
+                cap doubles with every retry
+            max_delay (float): Upper bound of a single backoff
+            requests_per_minute (float, optional): Request budget; None for unlimited
+            tokens_per_minute (float, optional): Token budget; None for unlimited
+            failure_threshold (int): Consecutive failures that open a circuit
+            reset_timeout (float): Seconds a circuit stays open
+            seed (int, optional): Seed for the jitter
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._rng = random.Random(seed)
+        self._breakers = {}
+        self._paused_until = {}
+        self._lock = threading.Lock()
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {
+            "calls": 0, "attempts": 0, "retries": 0, "rate_limited": 0, "failures": 0,
+            "backoff_seconds": 0.0, "budget_wait_seconds": 0.0,
+            "circuit_opened": 0, "circuit_rejections": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "RequestScheduler":
+        """Scheduler with budgets from QUERYCRAFT_LLM_RPM and QUERYCRAFT_LLM_TPM"""
+        return cls(requests_per_minute=float(os.getenv("QUERYCRAFT_LLM_RPM") or 0) or None,
+                   tokens_per_minute=float(os.getenv("QUERYCRAFT_LLM_TPM") or 0) or None)
+
+    def configure(self, requests_per_minute: Optional[float] = None,
+                  tokens_per_minute: Optional[float] = None) -> None:
+        """Replace the process-wide budgets; None means unlimited"""
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def _count(self, name: str, amount=1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+
+    def _before_attempt(self, key: str, estimated_tokens: int) -> float:
+        """Check the circuit and reserve budget
+
+        Returns:
+            float: Seconds to wait before the attempt may start
+
+        Raises:
+            CircuitOpenError: If the backend's circuit is open
+        """
+        remaining = self.breaker(key).allow()
+        if remaining is not None:
+            self._count("circuit_rejections")
+            raise CircuitOpenError(f"LLM backend {key} is failing; not retrying for {remaining:.1f}s")
+        with self._lock:
+            self.stats["attempts"] += 1
+            paused = max(0.0, self._paused_until.get(key, 0.0) - time.monotonic())
+        budget = 0.0
+        if self.requests is not None:
+            budget = max(budget, self.requests.reserve(1))
+        if self.tokens is not None and estimated_tokens:
+            budget = max(budget, self.tokens.reserve(estimated_tokens))
+        if budget:
+            self._count("budget_wait_seconds", budget)
+        return max(paused, budget)
+
+    def _after_success(self, key: str, result) -> None:
+        self.breaker(key).record_success()
+        completion_tokens = getattr(result, "completion_tokens", None)
+        if self.tokens is not None and completion_tokens:
+            self.tokens.charge(completion_tokens)
+
+    def _after_failure(self, key: str, error: TransientLLMError, retry: int, base_delay: float) -> float:
+        """Record a transient failure and choose the backoff before the next attempt"""
+        if isinstance(error, InvalidResponseError):
+            # The backend answered, so it is not down
+            self.breaker(key).record_success()
+        elif self.breaker(key).record_failure():
+            self._count("circuit_opened")
+            logger.warning(f"LLM backend {key} failed {self.failure_threshold} times in a row; "
+                           f"failing fast for {self.reset_timeout:.0f}s")
+        delay = self._rng.uniform(0, min(self.max_delay, base_delay * 2 ** retry))
+        retry_after = error.retry_after
+        if isinstance(error, RateLimitError):
+            self._count("rate_limited")
+        if retry_after is not None:
+            # Everyone waits out the server's pause, not only this caller
+            delay = retry_after + self._rng.uniform(0, base_delay)
+            with self._lock:
+                self._paused_until[key] = max(self._paused_until.get(key, 0.0), time.monotonic() + retry_after)
+        return delay
+
+    def _attempts(self, max_attempts: Optional[int]) -> int:
+        with self._lock:
+            self.stats["calls"] += 1
+        return max(1, max_attempts if max_attempts is not None else self.max_attempts)
+
+    def call(self, request: Callable, estimated_tokens: int = 0, key: str = "default",
+             max_attempts: Optional[int] = None, base_delay: Optional[float] = None):
+        """Run a backend request under the budget, retry policy and circuit breaker
+
+        Args:
+            request (callable): Performs one attempt; raises TransientLLMError
+                on failures worth retrying
+            estimated_tokens (int): Prompt tokens charged to the token budget
+                up front; completion tokens of the result are charged after
+            key (str): Circuit breaker / Retry-After scope, e.g. the backend name
+            max_attempts (int, optional): Overrides the scheduler's max_attempts
+            base_delay (float, optional): Overrides the scheduler's base_delay
+
+        Returns:
+            The request's result
+
+        Raises:
+            TransientLLMError: The last failure, once attempts are exhausted
+            CircuitOpenError: If the backend's circuit is open
+        """
+        attempts = self._attempts(max_attempts)
+        base_delay = self.base_delay if base_delay is None else base_delay
+        for retry in range(attempts):
+            wait = self._before_attempt(key, estimated_tokens)
+            try:
+                if wait:
+                    time.sleep(wait)
+                result = request()
+            except TransientLLMError as e:
+                delay = self._after_failure(key, e, retry, base_delay)
+                if retry == attempts - 1:
+                    self._count("failures")
+                    raise
+                self._retrying(e, delay)
+                time.sleep(delay)
+                continue
+            except Exception:
+                # The backend answered (e.g. a 400), so it is not down
+                self.breaker(key).record_success()
+                raise
+            except BaseException:
+                # Cancelled or interrupted: no verdict on the backend
+                self.breaker(key).release()
+                raise
+            self._after_success(key, result)
+            return result
+
+    async def acall(self, request: Callable[[], Awaitable], estimated_tokens: int = 0, key: str = "default",
+                    max_attempts: Optional[int] = None, base_delay: Optional[float] = None):
+        """Async variant of ``call``; ``request`` returns an awaitable"""
+        import asyncio
+        attempts = self._attempts(max_attempts)
+        base_delay = self.base_delay if base_delay is None else base_delay
+        for retry in range(attempts):
+            wait = self._before_attempt(key, estimated_tokens)
+            try:
+                if wait:
+                    await asyncio.sleep(wait)
+                result = await request()
+            except TransientLLMError as e:
+                delay = self._after_failure(key, e, retry, base_delay)
+                if retry == attempts - 1:
+                    self._count("failures")
+                    raise
+                self._retrying(e, delay)
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self.breaker(key).record_success()
+                raise
+            except BaseException:
+                self.breaker(key).release()
+                raise
+            self._after_success(key, result)
+            return result
+
+    def _retrying(self, error: TransientLLMError, delay: float) -> None:
+        with self._lock:
+            self.stats["retries"] += 1
+            self.stats["backoff_seconds"] += delay
+        tracer.current_span().incr("retries")
+        logger.info(f"Retrying LLM request in {delay:.2f}s: {error}")
+
+    def snapshot(self) -> dict:
+        """Copy of the counters plus the state of every circuit"""
+        with self._lock:
+            stats = dict(self.stats)
+            breakers = dict(self._breakers)
+        stats["circuits"] = {key: breaker.state for key, breaker in breakers.items()}
+        return stats
+
+    def reset(self) -> None:
+        """Clear counters, circuits and Retry-After pauses"""
+        with self._lock:
+            self.stats = self._empty_stats()
+            self._breakers.clear()
+            self._paused_until.clear()
+
+
+# Process-wide scheduler shared by every GroqConfig
+scheduler = RequestScheduler.from_env()
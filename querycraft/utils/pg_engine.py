@@ -0,0 +1,528 @@
+import os
+import re
+import time
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+import psycopg2.errors
+from psycopg2 import pool as pg_pool
+
+from querycraft.utils.result_set import ResultSet, ColumnInfo, format_psql_value, format_psql_rows  # noqa: F401
+from querycraft.utils.sql_lexer import significant_tokens, is_write_statement
+from querycraft.utils.sql_template import SqlTemplate, parameterize
+from querycraft.utils.execution_policy import literal_row_limit
+
+logger = logging.getLogger(__name__)
+
+# Statements a server-side cursor can be declared for
+STREAMABLE_STATEMENTS = {"select", "values", "table", "with"}
+
+DEFAULT_CONNECT_SETTINGS = {
+    "host": "localhost",
+    "port": 5432,
+    "user": "postgres",
+    "password": "",
+    "dbname": "postgres",
+}
+
+KEEPALIVE_SETTINGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+    "connect_timeout": 5,
+}
+
+LIBPQ_ENV_VARS = {
+    "PGHOST": "host",
+    "PGPORT": "port",
+    "PGUSER": "user",
+    "PGPASSWORD": "password",
+    "PGDATABASE": "dbname",
+}
+
+
+def _compose_settings(compose_path: Path) -> dict:
+    """Read connection settings from the ``pg`` service of a docker-compose file
+
+    Args:
+        compose_path (Path): Path to docker-compose.yml
+
+    Returns:
+        dict: Partial connect settings (port, user, password, dbname)
+    """
+    import yaml
+    with open(compose_path, 'r') as f:
+        try:
+            compose = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}")
+
+    service = (compose.get("services") or {}).get("pg") or {}
+    settings = {}
+
+    for mapping in service.get("ports") or []:
+        parts = str(mapping).split(":")
+        if len(parts) >= 2 and parts[-1].split("/")[0] == "5432":
+            settings["port"] = int(parts[-2])
+            break
+
+    environment = service.get("environment") or {}
+    if isinstance(environment, list):
+        environment = dict(
+            item.split("=", 1) for item in environment if "=" in item
+        )
+
+    env_keys = {
+        "POSTGRES_USER": "user",
+        "POSTGRES_PASSWORD": "password",
+        "POSTGRES_DB": "dbname",
+    }
+    for env_key, setting in env_keys.items():
+        if environment.get(env_key) is not None:
+            settings[setting] = str(environment[env_key])
+
+    if "dbname" not in settings and "user" in settings:
+        settings["dbname"] = settings["user"]
+    return settings
+
+
+def dsn_env_var(schema_dir: Path) -> str:
+    """Environment variable holding the DSN override of one schema
+
+    >>> dsn_env_var(Path("test_databases/pagila-hw"))
+    'QUERYCRAFT_PG_DSN_PAGILA_HW'
+    """
+    return "QUERYCRAFT_PG_DSN_" + re.sub(r'[^A-Z0-9]', '_', Path(schema_dir).name.upper())
+
+
+def resolve_dsn(schema_dir: Path) -> dict:
+    """Resolve psycopg2 connect settings for a schema directory
+
+    Precedence (highest first):
+        1. ``QUERYCRAFT_PG_DSN_<SCHEMA>`` environment variable (full libpq
+           DSN for this schema only, see ``dsn_env_var``)
+        2. libpq environment variables (PGHOST, PGPORT, ...)
+        3. The ``pg`` service in ``<schema_dir>/docker-compose.yml``
+        4. Local defaults (postgres@localhost:5432), with a warning, since
+           whatever listens there may be an unrelated database
+
+    Args:
+        schema_dir (Path): Schema/database directory, e.g. test_databases/fruitmart
+
+    Returns:
+        dict: Keyword arguments for psycopg2.connect
+    """
+    dsn = os.getenv(dsn_env_var(schema_dir))
+    if dsn:
+        return {"dsn": dsn}
+
+    settings = dict(DEFAULT_CONNECT_SETTINGS)
+
+    compose_path = Path(schema_dir) / "docker-compose.yml"
+    compose = {}
+    if compose_path.exists():
+        try:
+            compose = _compose_settings(compose_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {compose_path}: {e}")
+    settings.update(compose)
+
+    for env_var, setting in LIBPQ_ENV_VARS.items():
+        value = os.getenv(env_var)
+        if value:
+            settings[setting] = value
+
+    if "port" not in compose and not os.getenv("PGPORT"):
+        logger.warning(f"No Postgres port for {Path(schema_dir).name}: {compose_path} publishes none and "
+                       f"PGPORT is unset; trying {settings['host']}:{settings['port']}, which may be a "
+                       f"different database. Set {dsn_env_var(schema_dir)} to choose one.")
+    settings["port"] = int(settings["port"])
+    return settings
+
+
+class PostgresPool:
+    """Thread-safe psycopg2 connection pool with health checks
+
+    ``ThreadedConnectionPool`` raises instead of blocking when it runs dry, so
+    checkouts are gated by a semaphore sized to ``maxconn``.
+
+    Session state (statement_timeout, prepared statements) is tracked per
+    connection and forgotten as soon as the connection is closed, including
+    when ``ThreadedConnectionPool`` closes connections beyond ``minconn``.
+    """
+
+    def __init__(self, connect_settings: dict, minconn: int = 1, maxconn: int = 8,
+                 health_check_interval: float = 30.0, max_prepared: int = 64):
+        """Initialize the pool
+
+        Args:
+            connect_settings (dict): Keyword arguments for psycopg2.connect
+            minconn (int): Connections opened eagerly
+            maxconn (int): Upper bound on concurrent connections
+            health_check_interval (float): Idle seconds after which a connection
+                is pinged before being handed out
+            max_prepared (int): Prepared statements kept per connection before
+                the least recently used one is deallocated
+
+        Raises:
+            psycopg2.OperationalError: If the database cannot be reached
+        """
+        settings = dict(KEEPALIVE_SETTINGS)
+        settings.update(connect_settings)
+        self.maxconn = maxconn
+        self.health_check_interval = health_check_interval
+        self.max_prepared = max_prepared
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, **settings)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+        # id(conn) -> statement_timeout (ms) last set on that session
+        self._timeouts = {}
+        # id(conn) -> OrderedDict of prepared statement names, least recently used first
+        self._prepared = {}
+        # Template keys PREPARE failed for; these run as plain SQL
+        self._unpreparable = OrderedDict()
+        self.prepared_stats = {"prepared": 0, "reused": 0, "evicted": 0, "fallbacks": 0, "reprepared": 0}
+        self._cursor_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, conn) -> bool:
+        """Ping a connection that has been idle longer than the check interval"""
+        if conn.closed:
+            return False
+        with self._lock:
+            last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Check out a healthy autocommit connection, blocking while the pool is full"""
+        self._slots.acquire()
+        try:
+            conn = self._pool.getconn()
+            if not self._is_healthy(conn):
+                logger.info("Discarding stale database connection")
+                self._forget(conn)
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+            conn.autocommit = True
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return a connection to the pool"""
+        try:
+            close = close or bool(conn.closed)
+            if not close:
+                with self._lock:
+                    self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=close)
+            # The pool closes connections beyond minconn itself
+            if close or conn.closed:
+                self._forget(conn)
+        finally:
+            self._slots.release()
+
+    def _forget(self, conn) -> None:
+        """Drop the session state tracked for a connection that is being closed"""
+        with self._lock:
+            self._last_used.pop(id(conn), None)
+            self._timeouts.pop(id(conn), None)
+            self._prepared.pop(id(conn), None)
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection
+
+        Connections that fail at the transport level are closed instead of
+        being returned to the pool.
+        """
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken)
+
+    def _set_statement_timeout(self, conn, timeout_ms: Optional[int]) -> None:
+        """Set statement_timeout on a session, skipping the round trip if it is already set"""
+        if timeout_ms is None:
+            return
+        with self._lock:
+            current = self._timeouts.get(id(conn))
+        if current == timeout_ms:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("SET statement_timeout = %s", (timeout_ms,))
+        with self._lock:
+            self._timeouts[id(conn)] = timeout_ms
+
+    def _prepared_statement(self, conn, template: SqlTemplate) -> Optional[str]:
+        """EXECUTE statement for a template, preparing it on the session if needed
+
+        Prepared statements are kept in a per-connection LRU of
+        ``max_prepared`` entries; evicted ones are deallocated.
+
+        Returns:
+            str: EXECUTE statement, or None if the template cannot be
+                prepared and the original SQL should run instead
+        """
+        name = template.statement_name
+        with self._lock:
+            if template.key in self._unpreparable:
+                self.prepared_stats["fallbacks"] += 1
+                return None
+            prepared = self._prepared.setdefault(id(conn), OrderedDict())
+            if name in prepared:
+                prepared.move_to_end(name)
+                self.prepared_stats["reused"] += 1
+                return template.execute_statement(name)
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(template.prepare_statement(name))
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            raise
+        except psycopg2.Error as e:
+            logger.debug(f"Could not prepare {template.text!r}: {e}")
+            with self._lock:
+                self._unpreparable[template.key] = None
+                if len(self._unpreparable) > self.max_prepared * 16:
+                    self._unpreparable.popitem(last=False)
+                self.prepared_stats["fallbacks"] += 1
+            return None
+
+        with self._lock:
+            prepared[name] = None
+            self.prepared_stats["prepared"] += 1
+            evicted = []
+            while len(prepared) > self.max_prepared:
+                evicted.append(prepared.popitem(last=False)[0])
+            self.prepared_stats["evicted"] += len(evicted)
+        for old_name in evicted:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DEALLOCATE {old_name}")
+        return template.execute_statement(name)
+
+    def _execute_prepared(self, conn, cursor, template: SqlTemplate, statement: str) -> None:
+        """Run an EXECUTE statement, re-preparing it once if the session's copy is unusable
+
+        A prepared statement stops working when a table it reads changes shape
+        ("cached plan must not change result type") or when the session no
+        longer has it, e.g. after a reconnect reused the connection's id.
+        """
+        try:
+            cursor.execute(statement)
+            return
+        except psycopg2.errors.InvalidSqlStatementName:
+            exists = False
+        except psycopg2.errors.FeatureNotSupported as e:
+            if "cached plan" not in str(e):
+                raise
+            exists = True
+
+        name = template.statement_name
+        logger.info(f"Re-preparing {name}: the session's prepared statement is stale")
+        with self._lock:
+            self._prepared.get(id(conn), {}).pop(name, None)
+            self.prepared_stats["reprepared"] += 1
+        if exists:
+            with conn.cursor() as deallocate:
+                deallocate.execute(f"DEALLOCATE {name}")
+        cursor.execute(self._prepared_statement(conn, template) or template.render())
+
+    def execute(self, sql_query: str, params: Optional[tuple] = None,
+                statement_timeout_ms: Optional[int] = None, max_rows: Optional[int] = None) -> tuple:
+        """Execute a statement on a pooled connection
+
+        Args:
+            sql_query (str): SQL to execute
+            params (tuple, optional): Query parameters for psycopg2
+            statement_timeout_ms (int, optional): Set statement_timeout on the
+                session (kept for later statements); None leaves it unchanged
+            max_rows (int, optional): Fetch at most this many rows
+
+        Returns:
+            tuple: (column names, rows) for queries returning rows, or
+                (None, status message) for statements that do not
+
+        Raises:
+            psycopg2.extensions.QueryCanceledError: If the statement timed out
+        """
+        with self.connection() as conn:
+            self._set_statement_timeout(conn, statement_timeout_ms)
+            with conn.cursor() as cursor:
+                cursor.execute(sql_query, params)
+                if cursor.description is None:
+                    return None, cursor.statusmessage
+                columns = [col.name for col in cursor.description]
+                rows = cursor.fetchall() if max_rows is None else cursor.fetchmany(max_rows)
+                return columns, rows
+
+    @staticmethod
+    def _streamable(sql_query: str) -> bool:
+        """Whether a statement can run in a server-side (named) cursor"""
+        tokens = significant_tokens(sql_query)
+        return bool(tokens) and tokens[0].value.lower() in STREAMABLE_STATEMENTS and \
+            not is_write_statement(sql_query)
+
+    @staticmethod
+    def _unbounded(sql_query: str, batch_size: int) -> bool:
+        """Whether a query may return more than one batch of rows"""
+        limit = literal_row_limit(sql_query)
+        return limit is None or limit > batch_size
+
+    def stream(self, sql_query: str, params: Optional[tuple] = None, batch_size: int = 1000,
+               statement_timeout_ms: Optional[int] = None, prepare: bool = False) -> ResultSet:
+        """Execute a statement and read its rows lazily
+
+        Queries run in a server-side cursor inside a transaction, so only
+        ``batch_size`` rows at a time are transferred and held in memory.
+        Other statements run on a regular cursor. The connection stays checked
+        out until the result set is exhausted or closed.
+
+        With ``prepare``, literals are lifted out of the statement and the
+        resulting template runs as a prepared statement, so statements that
+        differ only in their literals reuse one plan. Postgres cannot declare
+        a cursor for EXECUTE, so prepared statements use a regular cursor;
+        queries are therefore only prepared when a literal LIMIT of at most
+        ``batch_size`` bounds their result, and others stream from a
+        server-side cursor as usual.
+
+        Args:
+            sql_query (str): SQL to execute
+            params (tuple, optional): Query parameters for psycopg2
+            batch_size (int): Rows fetched per round trip
+            statement_timeout_ms (int, optional): Set statement_timeout on the
+                session; None leaves it unchanged
+            prepare (bool): Run the statement as a prepared template
+
+        Returns:
+            ResultSet: Rows with column names and types
+
+        Raises:
+            psycopg2.Error: If the statement fails
+        """
+        conn = self.getconn()
+        cursor = None
+        try:
+            self._set_statement_timeout(conn, statement_timeout_ms)
+            streamable = self._streamable(sql_query)
+            template = None
+            if prepare and params is None and not (streamable and self._unbounded(sql_query, batch_size)):
+                template = parameterize(sql_query)
+            statement = self._prepared_statement(conn, template) if template and template.params else None
+            if statement is not None:
+                cursor = conn.cursor()
+                self._execute_prepared(conn, cursor, template, statement)
+            elif streamable:
+                conn.autocommit = False
+                cursor = conn.cursor(name=f"querycraft_{next(self._cursor_ids)}")
+                cursor.itersize = batch_size
+                cursor.execute(sql_query, params)
+            else:
+                cursor = conn.cursor()
+                cursor.execute(sql_query, params)
+            # Named cursors only describe their columns after the first fetch
+            first = cursor.fetchmany(batch_size) if cursor.name or cursor.description is not None else None
+        except Exception as e:
+            self._release(conn, cursor, failed=True,
+                          broken=isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)))
+            raise
+
+        if cursor.description is None:
+            status = cursor.statusmessage
+            self._release(conn, cursor)
+            return ResultSet(None, status=status)
+
+        columns = [ColumnInfo(col.name, col.type_code) for col in cursor.description]
+        released = False
+
+        def batches():
+            batch = first
+            while batch:
+                yield batch
+                if len(batch) < batch_size:
+                    break
+                batch = cursor.fetchmany(batch_size)
+
+        def close():
+            nonlocal released
+            if not released:
+                released = True
+                self._release(conn, cursor)
+
+        return ResultSet(columns, batches(), on_close=close, status=cursor.statusmessage)
+
+    def _release(self, conn, cursor, failed: bool = False, broken: bool = False) -> None:
+        """Close a streaming cursor, end its transaction and return the connection"""
+        try:
+            if cursor is not None and not cursor.closed:
+                cursor.close()
+            if not conn.autocommit and not conn.closed:
+                if failed:
+                    conn.rollback()
+                else:
+                    conn.commit()
+                conn.autocommit = True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+        except psycopg2.Error:
+            conn.rollback()
+            conn.autocommit = True
+        finally:
+            self.putconn(conn, close=broken)
+
+    def closeall(self) -> None:
+        """Close every connection held by the pool"""
+        self._pool.closeall()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(schema_name: str, schema_dir: Path, **pool_kwargs) -> PostgresPool:
+    """Get (or lazily create) the shared pool for a schema
+
+    Args:
+        schema_name (str): Name of the schema/database
+        schema_dir (Path): Directory used to resolve connection settings
+        **pool_kwargs: Extra arguments for PostgresPool on first creation
+
+    Returns:
+        PostgresPool: Pool shared by every connector using this schema
+    """
+    with _pools_lock:
+        pool = _pools.get(schema_name)
+        if pool is None:
+            settings = resolve_dsn(schema_dir)
+            pool = PostgresPool(settings, **pool_kwargs)
+            _pools[schema_name] = pool
+            logger.info(f"Created connection pool for schema: {schema_name}")
+        return pool
+
+
+def close_all_pools() -> None:
+    """Close and forget every shared pool"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
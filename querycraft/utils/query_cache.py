@@ -0,0 +1,184 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+from querycraft.utils.cache_dir import get_cache_dir
+
+QUOTED_PATTERN = re.compile(r"('(?:[^']|'')*'|\"[^\"]*\")")
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different phrasings share a cache entry
+
+    Case and whitespace are folded and trailing punctuation is dropped, but
+    quoted literals are kept verbatim since they usually end up in the SQL.
+
+    >>> normalize_question("  How many fruits   are in basket B?? ")
+    'how many fruits are in basket b'
+    >>> normalize_question("Films rated 'PG-13'")
+    "films rated 'PG-13'"
+    """
+    parts = QUOTED_PATTERN.split(question)
+    normalized = "".join(part if i % 2 else part.lower() for i, part in enumerate(parts))
+    return " ".join(normalized.split()).rstrip("?.!;: ")
+
+
+class QueryCache:
+    """Disk-backed question -> SQL cache with LRU eviction and a TTL
+
+    Entries are keyed on the normalized question, the schema name, a hash of
+    the schema content and the model parameters, so editing the schema or
+    switching models never serves stale SQL. Template entries additionally
+    store ``bindings``: which literals of the question fill which literals
+    of the SQL, so questions differing only in those literals share one entry.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 10000,
+                 ttl: Optional[float] = 7 * 24 * 3600):
+        """Open (or create) the cache database
+
+        Args:
+            path (Path, optional): SQLite file; defaults to the querycraft cache dir
+            max_entries (int): Entries kept before least recently used ones are evicted
+            ttl (float, optional): Seconds an entry stays valid; None disables expiry
+        """
+        self.path = Path(path) if path else get_cache_dir() / "query_cache.sqlite3"
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_cache ("
+            " key TEXT PRIMARY KEY,"
+            " schema_name TEXT NOT NULL,"
+            " question TEXT NOT NULL,"
+            " sql TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(query_cache)")}
+        if "bindings" not in columns:
+            self._conn.execute("ALTER TABLE query_cache ADD COLUMN bindings TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS query_cache_last_access ON query_cache (last_access)"
+        )
+
+    @staticmethod
+    def make_key(question: str, schema_name: str, schema_hash: str, model_params: dict) -> str:
+        """Build the cache key for a question
+
+        Args:
+            question (str): Natural language question
+            schema_name (str): Schema the question is asked against
+            schema_hash (str): Content hash of the schema
+            model_params (dict): Model name, sampling and prompt settings
+
+        Returns:
+            str: Hex digest identifying the entry
+        """
+        payload = json.dumps(
+            [normalize_question(question), schema_name, schema_hash, model_params],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """Look up cached SQL, refreshing its LRU position
+
+        Args:
+            key (str): Cache key
+            count (bool): Record the lookup in ``stats``; callers combining
+                several lookups into one answer record it with ``record_lookup``
+
+        Returns:
+            str: Cached SQL, or None on a miss or expired entry
+        """
+        entry = self.get_entry(key, count)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str, count: bool = True) -> Optional[tuple]:
+        """Look up cached SQL and its bindings, refreshing its LRU position
+
+        Args:
+            key (str): Cache key
+            count (bool): Record the lookup in ``stats``
+
+        Returns:
+            tuple: (sql, bindings list or None), or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sql, created_at, bindings FROM query_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+                row = None
+            if count:
+                self.stats["hits" if row is not None else "misses"] += 1
+            if row is None:
+                return None
+            self._conn.execute("UPDATE query_cache SET last_access = ? WHERE key = ?", (now, key))
+            return row[0], json.loads(row[2]) if row[2] is not None else None
+
+    def record_lookup(self, hit: bool) -> None:
+        """Count one lookup made of uncounted ``get`` calls as a hit or a miss"""
+        with self._lock:
+            self.stats["hits" if hit else "misses"] += 1
+
+    def put(self, key: str, sql: str, question: str = "", schema_name: str = "",
+            bindings: Optional[list] = None) -> None:
+        """Store SQL for a key and evict least recently used entries past max_entries"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_cache"
+                " (key, schema_name, question, sql, created_at, last_access, bindings)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, schema_name, question, sql, now, now,
+                 json.dumps(bindings) if bindings is not None else None)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM query_cache WHERE key IN"
+                    " (SELECT key FROM query_cache ORDER BY last_access LIMIT ?)",
+                    (excess,)
+                )
+                self.stats["evictions"] += excess
+
+    def purge_expired(self) -> int:
+        """Delete every entry older than the TTL
+
+        Returns:
+            int: Number of entries removed
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM query_cache WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Delete every entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache")
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache since it was opened"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
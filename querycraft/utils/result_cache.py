@@ -0,0 +1,185 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from querycraft.utils.sql_lexer import (
+    canonicalize, statement_tables, is_write_statement, has_volatile_functions
+)
+
+logger = logging.getLogger(__name__)
+
+# One round trip returning a modification counter per table. Counters come from
+# the statistics system, so writes made by other sessions become visible once
+# their transaction's stats are flushed (usually well under a second).
+TABLE_VERSION_QUERY = """
+SELECT relname, n_tup_ins + n_tup_upd + n_tup_del, coalesce(n_live_tup, 0)
+FROM pg_stat_user_tables
+WHERE relname = ANY(%s)
+ORDER BY relname, schemaname
+"""
+
+
+class CachedResult:
+    """A cached statement result and the table versions it was computed against"""
+
+    __slots__ = ("result", "tables", "versions", "size")
+
+    def __init__(self, result: str, tables: frozenset, versions: dict, size: int):
+        self.result = result
+        self.tables = tables
+        self.versions = versions
+        self.size = size
+
+
+class ResultCache:
+    """In-memory LRU cache of query results with table-level invalidation
+
+    Entries are keyed on the canonicalized SQL and remember a modification
+    counter for each table the statement reads. A lookup re-probes those
+    counters (one cheap catalog query) and discards the entry if any table
+    changed. Write statements are never cached and immediately invalidate
+    every entry that reads the tables they write.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        """Initialize the cache
+
+        Args:
+            max_entries (int): Maximum number of cached results
+            max_bytes (int): Maximum total size of cached results (approximate)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "bypasses": 0, "evictions": 0}
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def classify(sql_query: str) -> tuple:
+        """Decide how a statement interacts with the cache
+
+        Returns:
+            tuple: (mode, tables) where mode is "write" (bypass and invalidate
+                the returned tables), "uncacheable" or "read"
+        """
+        reads, writes = statement_tables(sql_query)
+        if writes or is_write_statement(sql_query):
+            return "write", frozenset(reads | writes)
+        if not reads or has_volatile_functions(sql_query):
+            return "uncacheable", frozenset(reads)
+        return "read", frozenset(reads)
+
+    @staticmethod
+    def probe_versions(pool, tables: frozenset) -> Optional[dict]:
+        """Fetch current modification counters for tables
+
+        Returns:
+            dict: table -> version tuple, or None if some table is not a plain
+                user table (views, catalogs) and so cannot be tracked
+        """
+        _, rows = pool.execute(TABLE_VERSION_QUERY, (sorted(tables),))
+        versions = {}
+        for relname, modifications, live in rows:
+            versions.setdefault(relname, []).append((modifications, live))
+        if set(versions) != set(tables):
+            return None
+        return {name: tuple(v) for name, v in versions.items()}
+
+    def get(self, key: str, current_versions: Optional[dict]) -> Optional[str]:
+        """Look up a result if none of its tables changed
+
+        Args:
+            key (str): Canonicalized SQL
+            current_versions (dict): Output of probe_versions for the statement's tables
+
+        Returns:
+            str: Cached result, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if current_versions is None or entry.versions != current_versions:
+                self._remove(key)
+                self.stats["invalidations"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.result
+
+    def put(self, key: str, result: str, tables: frozenset, versions: dict) -> None:
+        """Store a result, evicting least recently used entries past the limits"""
+        size = len(key) + len(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedResult(result, tables, versions, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self, tables) -> int:
+        """Drop every entry that reads any of the given tables
+
+        Returns:
+            int: Number of entries removed
+        """
+        tables = set(tables)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.tables & tables]
+            for key in stale:
+                self._remove(key)
+            self.stats["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def execute(self, pool, sql_query: str, run) -> str:
+        """Execute a statement through the cache
+
+        Args:
+            pool (PostgresPool): Pool used to probe table versions
+            sql_query (str): Statement to execute
+            run (callable): Executes the statement and returns its result string
+
+        Returns:
+            str: Statement result, from the cache when still valid
+        """
+        mode, tables = self.classify(sql_query)
+        if mode == "write":
+            self.stats["bypasses"] += 1
+            try:
+                return run(sql_query)
+            finally:
+                self.invalidate(tables)
+        if mode == "uncacheable":
+            self.stats["bypasses"] += 1
+            return run(sql_query)
+
+        key = canonicalize(sql_query)
+        versions = self.probe_versions(pool, tables)
+        if versions is None:
+            self.stats["bypasses"] += 1
+            return run(sql_query)
+
+        cached = self.get(key, versions)
+        if cached is not None:
+            logger.info(f"Result cache hit for: {key}")
+            return cached
+
+        result = run(sql_query)
+        self.put(key, result, tables, versions)
+        return result
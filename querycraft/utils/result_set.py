@@ -0,0 +1,306 @@
+import re
+import json
+import math
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Optional, Callable, Iterator
+from psycopg2 import extensions
+
+# Names of common Postgres type OIDs; others fall back to psycopg2's typecaster names
+TYPE_NAMES = {
+    16: "boolean", 17: "bytea", 18: "char", 19: "name", 20: "bigint", 21: "smallint",
+    23: "integer", 25: "text", 26: "oid", 114: "json", 700: "real", 701: "double precision",
+    790: "money", 1042: "character", 1043: "character varying", 1082: "date",
+    1083: "time", 1114: "timestamp", 1184: "timestamptz", 1186: "interval",
+    1266: "timetz", 1700: "numeric", 2950: "uuid", 3802: "jsonb",
+    1000: "boolean[]", 1005: "smallint[]", 1007: "integer[]", 1009: "text[]",
+    1015: "character varying[]", 1016: "bigint[]", 1021: "real[]", 1022: "double precision[]",
+}
+
+# numpy dtypes for columnar materialization of NULL-free numeric columns (by
+# name, so numpy is only imported when arrays are requested)
+NUMPY_DTYPES = {
+    "boolean": "bool", "smallint": "int16", "integer": "int32", "bigint": "int64",
+    "oid": "int64", "real": "float32", "double precision": "float64",
+}
+
+
+# Column types psycopg2 decodes into dicts and lists
+JSON_TYPES = {"json", "jsonb"}
+
+
+def _trim_fraction(text: str) -> str:
+    """Drop trailing zeros of fractional seconds, as Postgres does"""
+    return re.sub(r'(\.\d*?[1-9])0+(?=$|[+-])', r'\1', text)
+
+
+def format_psql_interval(value: timedelta) -> str:
+    """Format an interval like Postgres' default (``postgres``) IntervalStyle
+
+    >>> format_psql_interval(timedelta(days=1, hours=2))
+    '1 day 02:00:00'
+    >>> format_psql_interval(timedelta(days=3)), format_psql_interval(timedelta(minutes=5, seconds=1.5))
+    ('3 days', '00:05:01.5')
+    >>> format_psql_interval(-timedelta(days=2, hours=2)), format_psql_interval(-timedelta(hours=2))
+    ('-2 days -02:00:00', '-02:00:00')
+    """
+    sign = '-' if value < timedelta(0) else ''
+    value = abs(value)
+    parts = []
+    if value.days:
+        parts.append(f"{sign}{value.days} day{'' if value.days == 1 else 's'}")
+    if value.seconds or value.microseconds or not value.days:
+        hours, rest = divmod(value.seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        clock = f"{sign}{hours:02d}:{minutes:02d}:{seconds:02d}"
+        if value.microseconds:
+            clock += f".{value.microseconds:06d}".rstrip('0')
+        parts.append(clock)
+    return ' '.join(parts)
+
+
+def format_psql_value(value, type_name: Optional[str] = None) -> str:
+    """Format a Python value the way ``psql -t -A`` prints it
+
+    Args:
+        value: Value as decoded by psycopg2
+        type_name (str, optional): Postgres type of the column; needed to
+            tell json arrays from Postgres arrays
+
+    >>> format_psql_value(None)
+    ''
+    >>> format_psql_value(True)
+    't'
+    >>> format_psql_value(['Trailers', 'Deleted Scenes'])
+    '{Trailers,"Deleted Scenes"}'
+    >>> format_psql_value(datetime(2022, 2, 15, 10, 2, 19))
+    '2022-02-15 10:02:19'
+    >>> format_psql_value({"a": [1, "x"]}), format_psql_value([1, 2], "jsonb")
+    ('{"a": [1, "x"]}', '[1, 2]')
+    >>> format_psql_value(float("inf")), format_psql_value(float("nan"))
+    ('Infinity', 'NaN')
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, dict) or (type_name in JSON_TYPES and not isinstance(value, str)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, float) and not math.isfinite(value):
+        return 'NaN' if math.isnan(value) else ('Infinity' if value > 0 else '-Infinity')
+    if isinstance(value, timedelta):
+        return format_psql_interval(value)
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            text = format_psql_value(item) if item is not None else 'NULL'
+            if item is not None and (text == '' or re.search(r'[\s,{}"\\]', text)):
+                text = '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+            items.append(text)
+        return '{' + ','.join(items) + '}'
+    if isinstance(value, datetime):
+        return _trim_fraction(re.sub(r'([+-]\d\d):00$', r'\1', value.isoformat(sep=' ')))
+    if isinstance(value, (date, dt_time)):
+        return _trim_fraction(re.sub(r'([+-]\d\d):00$', r'\1', value.isoformat()))
+    if isinstance(value, (bytes, memoryview)):
+        return '\\x' + bytes(value).hex()
+    return str(value)
+
+
+def format_psql_rows(rows, type_names: Optional[list] = None) -> str:
+    """Join result rows into ``psql -t -A`` unaligned output
+
+    Args:
+        rows: Result rows
+        type_names (list, optional): Postgres type of each column
+
+    >>> format_psql_rows([(1, 'Apple'), (2, None)])
+    '1|Apple\\n2|'
+    """
+    if not type_names:
+        return "\n".join("|".join(format_psql_value(value) for value in row) for row in rows)
+    return "\n".join(
+        "|".join(format_psql_value(value, type_name) for value, type_name in zip(row, type_names))
+        for row in rows
+    )
+
+
+def type_name(type_code: int) -> str:
+    """Postgres type name for a column type OID
+
+    >>> type_name(23), type_name(1043)
+    ('integer', 'character varying')
+    """
+    name = TYPE_NAMES.get(type_code)
+    if name is None:
+        caster = extensions.string_types.get(type_code)
+        name = caster.name.lower() if caster is not None else str(type_code)
+    return name
+
+
+class ColumnInfo:
+    """Name and type of one result column"""
+
+    __slots__ = ("name", "type_code", "type_name")
+
+    def __init__(self, name: str, type_code: Optional[int] = None):
+        self.name = name
+        self.type_code = type_code
+        self.type_name = type_name(type_code) if type_code is not None else None
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "type": self.type_name}
+
+    def __repr__(self) -> str:
+        return f"ColumnInfo({self.name!r}, {self.type_name!r})"
+
+
+class ResultSet:
+    """Rows of one statement, read lazily in batches
+
+    Rows can be consumed once, by iterating, by batches or with
+    ``fetchall``/``fetchmany``. A result streamed from the database holds
+    its pooled connection until every row has been read or ``close`` is
+    called, so use it as a context manager when it may not be exhausted.
+    """
+
+    def __init__(self, columns: Optional[list], batches: Optional[Iterator[list]] = None,
+                 on_close: Optional[Callable] = None, status: Optional[str] = None):
+        """Initialize the result set
+
+        Args:
+            columns (list, optional): ColumnInfo for every column, or None for
+                statements that return no rows (INSERT, SET, ...)
+            batches (iterator, optional): Yields lists of row tuples
+            on_close (callable, optional): Called once when the result is
+                exhausted or closed
+            status (str, optional): Command status, e.g. "INSERT 0 1"
+        """
+        self.columns = columns
+        self.status = status
+        self.row_count = 0
+        self._batches = batches if batches is not None else iter(())
+        self._pending = []
+        self._on_close = on_close
+        self._closed = False
+
+    @classmethod
+    def from_rows(cls, column_names: Optional[list], rows: list, status: Optional[str] = None) -> "ResultSet":
+        """Result set over rows already in memory
+
+        >>> rs = ResultSet.from_rows(["id", "fruit"], [(1, "Apple"), (2, "Pear")])
+        >>> rs.column_names, rs.fetchall()
+        (['id', 'fruit'], [(1, 'Apple'), (2, 'Pear')])
+        """
+        columns = [ColumnInfo(name) for name in column_names] if column_names is not None else None
+        return cls(columns, iter([list(rows)] if rows else []), status=status)
+
+    @property
+    def column_names(self) -> Optional[list]:
+        return [column.name for column in self.columns] if self.columns is not None else None
+
+    def batches(self) -> Iterator[list]:
+        """Yield the remaining rows one batch (list of tuples) at a time"""
+        if self._closed:
+            return
+        try:
+            if self._pending:
+                pending, self._pending = self._pending, []
+                self.row_count += len(pending)
+                yield pending
+            for batch in self._batches:
+                self.row_count += len(batch)
+                yield batch
+        finally:
+            self.close()
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+
+    def fetchmany(self, size: int) -> list:
+        """Up to ``size`` of the remaining rows"""
+        rows = []
+        while len(rows) < size and not self._closed:
+            if not self._pending:
+                batch = next(self._batches, None)
+                if batch is None:
+                    self.close()
+                    break
+                self._pending = batch
+            take = size - len(rows)
+            rows.extend(self._pending[:take])
+            self._pending = self._pending[take:]
+        self.row_count += len(rows)
+        return rows
+
+    def fetchall(self, limit: Optional[int] = None) -> list:
+        """All remaining rows, or at most ``limit`` of them"""
+        if limit is not None:
+            rows = self.fetchmany(limit)
+            self.close()
+            return rows
+        return [row for batch in self.batches() for row in batch]
+
+    def to_columns(self, arrays: bool = True) -> dict:
+        """Materialize the remaining rows column by column
+
+        Args:
+            arrays (bool): Convert columns to numpy arrays; integer, float and
+                boolean columns without NULLs get a native dtype, everything
+                else an object array
+
+        Returns:
+            dict: column name -> list or numpy array of values
+
+        >>> rs = ResultSet.from_rows(["n", "s"], [(1, "a"), (2, None)])
+        >>> rs.to_columns(arrays=False)
+        {'n': [1, 2], 's': ['a', None]}
+        """
+        if self.columns is None:
+            return {}
+        values = [[] for _ in self.columns]
+        for batch in self.batches():
+            for j, column in enumerate(zip(*batch)):
+                values[j].extend(column)
+        if not arrays:
+            return {column.name: column_values for column, column_values in zip(self.columns, values)}
+        import numpy as np
+        result = {}
+        for column, column_values in zip(self.columns, values):
+            dtype = NUMPY_DTYPES.get(column.type_name)
+            if dtype is not None and None not in column_values:
+                result[column.name] = np.array(column_values, dtype=dtype)
+            else:
+                array = np.empty(len(column_values), dtype=object)
+                array[:] = column_values
+                result[column.name] = array
+        return result
+
+    def to_psql(self, empty: str = "No results found") -> str:
+        """Format the remaining rows like ``psql -t -A``
+
+        >>> print(ResultSet.from_rows(["n", "s"], [(1, "a"), (2, None)]).to_psql())
+        1|a
+        2|
+        """
+        if self.columns is None:
+            return self.status or ""
+        type_names = [column.type_name for column in self.columns]
+        text = "\n".join(format_psql_rows(batch, type_names) for batch in self.batches())
+        return text if self.row_count else empty
+
+    def close(self) -> None:
+        """Release the underlying cursor and connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._pending = []
+        if self._on_close is not None:
+            self._on_close()
+
+    def __enter__(self) -> "ResultSet":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
@@ -1,8 +1,16 @@
-import yaml
+import hashlib
+import threading
 from pathlib import Path
 from typing import Optional
 
 class SchemaLoader:
+    # Shared across instances: path -> ((mtime_ns, size), content, sha256)
+    _file_cache = {}
+    # (path, sha256) -> parsed YAML
+    _yaml_cache = {}
+    _cache_lock = threading.Lock()
+    cache_stats = {"hits": 0, "misses": 0}
+
     def __init__(self, schema_name: Optional[str] = None):
         """Initialize SchemaLoader without a default schema
         
@@ -27,6 +35,68 @@ class SchemaLoader:
         
         self.schema_name = schema_name
 
+    @classmethod
+    def _read_file(cls, path: Path) -> tuple[str, str]:
+        """Read a file through the shared cache
+
+        The file is only re-read when its mtime or size changes.
+
+        Returns:
+            tuple: (content, sha256 hex digest of the content)
+        """
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = path.resolve()
+
+        with cls._cache_lock:
+            entry = cls._file_cache.get(key)
+            if entry and entry[0] == signature:
+                cls.cache_stats["hits"] += 1
+                return entry[1], entry[2]
+            cls.cache_stats["misses"] += 1
+
+        with open(path, 'r') as f:
+            content = f.read()
+        digest = hashlib.sha256(content.encode()).hexdigest()
+
+        with cls._cache_lock:
+            cls._file_cache[key] = (signature, content, digest)
+        return content, digest
+
+    @classmethod
+    def _load_yaml(cls, path: Path):
+        """Parse a YAML file, reusing the parsed data while its content is unchanged"""
+        content, digest = cls._read_file(path)
+        key = (path.resolve(), digest)
+        with cls._cache_lock:
+            if key in cls._yaml_cache:
+                return cls._yaml_cache[key]
+        import yaml
+        data = yaml.safe_load(content)
+        with cls._cache_lock:
+            cls._yaml_cache = {k: v for k, v in cls._yaml_cache.items() if k[0] != key[0]}
+            cls._yaml_cache[key] = data
+        return data
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all cached file contents and reset the counters"""
+        with cls._cache_lock:
+            cls._file_cache.clear()
+            cls._yaml_cache.clear()
+            cls.cache_stats = {"hits": 0, "misses": 0}
+
+    def fingerprint(self) -> str:
+        """Content hash of the schema's SQL and YAML files
+
+        Cheap to call repeatedly: files are only re-hashed after they change.
+        """
+        if not self.sql_path.exists():
+            self.load_schema()  # raises FileNotFoundError listing available schemas
+        _, sql_digest = self._read_file(self.sql_path)
+        yaml_digest = self._read_file(self.yaml_path)[1] if self.yaml_path.exists() else ""
+        return hashlib.sha256(f"{sql_digest}:{yaml_digest}".encode()).hexdigest()
+
     def load_schema(self, schema_path: Optional[str] = None) -> str:
         """Load the raw SQL schema"""
         path_to_use = Path(schema_path) if schema_path else self.sql_path
@@ -37,22 +107,27 @@ class SchemaLoader:
                 f"Available schemas: {', '.join(available)}"
             )
 
-        with open(path_to_use, 'r') as f:
-            return f.read()
+        return self._read_file(path_to_use)[0]
 
-    def get_examples(self) -> str:
-        """Get example queries from the YAML file"""
+    def get_example_list(self) -> list:
+        """Get the example_queries entries from the YAML file"""
         if not self.yaml_path.exists():
-            return "No example queries available."
-            
-        with open(self.yaml_path, 'r') as f:
-            examples_data = yaml.safe_load(f)
-            
+            return []
+
+        examples_data = self._load_yaml(self.yaml_path)
+
         if not examples_data or 'example_queries' not in examples_data:
+            return []
+        return examples_data['example_queries']
+
+    def get_examples(self) -> str:
+        """Get example queries from the YAML file"""
+        example_list = self.get_example_list()
+        if not example_list:
             return "No example queries available."
         
         examples = []
-        for ex in examples_data['example_queries']:
+        for ex in example_list:
             examples.append(f"Question: {ex['question']}\nSQL: {ex['sql']}\n")
         
         return "\n".join(examples)
@@ -0,0 +1,232 @@
+import re
+import sys
+from typing import Optional
+from querycraft.utils.catalog import SchemaCatalog, Table
+from querycraft.utils.schema_retriever import count_tokens, estimate_tokens
+
+# Long Postgres type names and the short spellings Postgres also accepts
+TYPE_ALIASES = {
+    "integer": "int",
+    "boolean": "bool",
+    "character varying": "varchar",
+    "character": "char",
+    "double precision": "float8",
+    "timestamp with time zone": "timestamptz",
+    "timestamp without time zone": "timestamp",
+    "time with time zone": "timetz",
+    "time without time zone": "time",
+}
+_TYPE_PARTS = re.compile(r"^\s*(.*?)\s*(\([^)]*\))?\s*((?:\[\])*)\s*$")
+_PLAIN_IDENTIFIER = re.compile(r"[a-z_][a-z0-9_$]*")
+
+# Detail dropped, in order, until a rendering fits the token budget; after
+# the last level relations are dropped, least relevant first
+DETAIL_LEVELS = ("full", "no_comments", "no_types", "no_views")
+
+
+def short_type(type_name: Optional[str]) -> str:
+    """Compact spelling of a column type
+
+    >>> short_type("timestamp with time zone"), short_type("public.mpaa_rating")
+    ('timestamptz', 'mpaa_rating')
+    >>> short_type("character varying(100)"), short_type("INT"), short_type("text[]")
+    ('varchar(100)', 'int', 'text[]')
+    """
+    if not type_name:
+        return ""
+    base, modifier, array = _TYPE_PARTS.match(type_name.lower()).groups()
+    base = base.rsplit(".", 1)[-1]
+    return TYPE_ALIASES.get(base, base) + (modifier or "").replace(" ", "") + array
+
+
+def infer_keys(catalog: SchemaCatalog) -> tuple:
+    """Primary keys and single-column foreign keys of every table
+
+    Declared keys are used when the DDL has them. Otherwise a first column
+    named ``<table>_id`` is taken as the primary key and other ``..<table>_id``
+    columns as references to it, the same convention SchemaRetriever uses.
+
+    Returns:
+        tuple: ({table: primary key columns}, {table: {column: "table.column"}})
+    """
+    tables = [table for table in catalog.relations() if table.kind == "table"]
+    primary_keys = {}
+    for table in tables:
+        if table.primary_key:
+            primary_keys[table.name] = tuple(table.primary_key)
+        elif table.columns and table.columns[0].name == f"{table.name}_id":
+            primary_keys[table.name] = (table.columns[0].name,)
+
+    # Longest names first, so original_language_id maps to language, not to a table named id
+    owners = sorted((t for t in tables if primary_keys.get(t.name) == (f"{t.name}_id",)),
+                    key=lambda t: -len(t.name))
+    foreign_keys = {}
+    for table in tables:
+        links = {}
+        for fk in table.foreign_keys:
+            if len(fk.columns) != 1:
+                continue
+            target = catalog.resolve(fk.ref_table)
+            target_name = target.name if target is not None else fk.ref_table
+            ref_columns = fk.ref_columns or primary_keys.get(target_name, ())
+            links[fk.columns[0]] = f"{target_name}.{ref_columns[0]}" if ref_columns else target_name
+        for column in table.column_names:
+            if column in links or not column.endswith("_id"):
+                continue
+            for owner in owners:
+                if owner is not table and column.endswith(f"{owner.name}_id"):
+                    links[column] = f"{owner.name}.{owner.name}_id"
+                    break
+        foreign_keys[table.name] = links
+    return primary_keys, foreign_keys
+
+
+def render_relation(table: Table, primary_key: tuple = (), links: Optional[dict] = None,
+                    level: str = "full") -> str:
+    """One line describing a table or view
+
+    >>> from querycraft.utils.catalog import Column
+    >>> film = Table("film", "public")
+    >>> film.columns = [Column("film_id", "integer"), Column("title", "text"), Column("language_id", "integer")]
+    >>> render_relation(film, ("film_id",), {"language_id": "language.language_id"})
+    'film(film_id int pk, title text, language_id→language.language_id)'
+    >>> render_relation(film, ("film_id",), {"language_id": "language.language_id"}, "no_types")
+    'film(film_id pk, title, language_id→language.language_id)'
+    """
+    links = links or {}
+    detailed = DETAIL_LEVELS.index(level) < DETAIL_LEVELS.index("no_types")
+    comments = level == "full"
+    columns = []
+    for column in table.columns:
+        text = column.name if _PLAIN_IDENTIFIER.fullmatch(column.name) else f'"{column.name}"'
+        # A reference implies the type, so it replaces it
+        if detailed and column.type and column.name not in links:
+            text += f" {short_type(column.type)}"
+        if column.name in primary_key:
+            text += " pk"
+        if column.name in links:
+            text += f"→{links[column.name]}"
+        if comments and column.comment:
+            text += f" -- {' '.join(column.comment.split())}"
+        columns.append(text)
+    line = f"{'view ' if table.kind == 'view' else ''}{table.name}({', '.join(columns)})"
+    if comments and table.comment:
+        line += f"  -- {' '.join(table.comment.split())}"
+    return line
+
+
+def _user_types(catalog: SchemaCatalog, relations: list) -> list:
+    """Lines describing the enums and domains the given relations use"""
+    used = {short_type(column.type) for table in relations for column in table.columns}
+    lines = []
+    for user_type in catalog.types.values():
+        name = short_type(user_type.name)
+        if name not in used:
+            continue
+        if user_type.kind == "enum":
+            lines.append(f"enum {name}({', '.join(repr(label) for label in user_type.labels)})")
+        elif user_type.base_type:
+            lines.append(f"domain {name} {short_type(user_type.base_type)}")
+    return lines
+
+
+def render_at_level(catalog: SchemaCatalog, relations: list, level: str, keys: Optional[tuple] = None) -> str:
+    """Render relations (in catalog order) at one detail level"""
+    primary_keys, foreign_keys = keys or infer_keys(catalog)
+    if level == "no_views":
+        relations = [table for table in relations if table.kind != "view"]
+    lines = []
+    if DETAIL_LEVELS.index(level) < DETAIL_LEVELS.index("no_types"):
+        lines.extend(_user_types(catalog, relations))
+    for table in relations:
+        lines.append(render_relation(table, primary_keys.get(table.name, ()), foreign_keys.get(table.name), level))
+    return "\n".join(lines)
+
+
+def render_schema(catalog: SchemaCatalog, relations: Optional[list] = None,
+                  token_budget: Optional[int] = None) -> str:
+    """Dense, deterministic schema for prompts: one ``table(col type pk, col→table.col)`` line per relation
+
+    Defaults, constraint clauses, sequences, SQL comments and whitespace
+    are dropped (``COMMENT ON`` text is kept); partitions are folded into their parent. When a
+    rendering is over ``token_budget`` (see count_tokens), comments, then
+    column types, then views are dropped, and finally relations from the
+    end of ``relations``.
+
+    Args:
+        catalog (SchemaCatalog): Catalog to render
+        relations (list, optional): Relation names to include, most important
+            first; defaults to every relation in catalog order
+        token_budget (int, optional): Maximum tokens of the rendering
+
+    Returns:
+        str: The rendered schema, relations in catalog order
+    """
+    order = [catalog.resolve(name) for name in relations] if relations is not None else catalog.relations()
+    order = [table for table in dict.fromkeys(order) if table is not None]
+    keys = infer_keys(catalog)
+
+    def render(selected, level):
+        ranked = set(selected)
+        return render_at_level(catalog, [t for t in catalog.relations() if t in ranked], level, keys)
+
+    for level in DETAIL_LEVELS:
+        text = render(order, level)
+        if token_budget is None or count_tokens(text) <= token_budget:
+            return text
+    tables = [table for table in order if table.kind != "view"] or order
+    while len(tables) > 1 and count_tokens(text) > token_budget:
+        tables = tables[:-1]
+        text = render(tables, DETAIL_LEVELS[-1])
+    return text
+
+
+def token_report(schema_name: str, token_budget: Optional[int] = None) -> dict:
+    """Prompt tokens of a schema in DDL and compact format
+
+    Returns:
+        dict: Schema section and whole system prompt tokens for each format
+            (count_tokens, plus the 4-chars-per-token estimate of the prompt)
+            and the fraction of prompt tokens the compact format saves
+    """
+    from querycraft.config.groq_config import GroqConfig
+    from querycraft.utils.schema_loader import SchemaLoader
+
+    loader = SchemaLoader(GroqConfig.SCHEMA_MAPPING.get(schema_name, schema_name))
+    examples = loader.get_examples()
+    sections = {
+        "ddl": loader.load_schema(),
+        "compact": render_schema(SchemaCatalog.for_schema(loader), token_budget=token_budget),
+    }
+    report = {"schema": schema_name, "token_budget": token_budget}
+    for name, section in sections.items():
+        prompt = GroqConfig._render_system_prompt(section, examples)
+        report[name] = {
+            "schema_tokens": count_tokens(section),
+            "prompt_tokens": count_tokens(prompt),
+            "prompt_chars_estimate": estimate_tokens(prompt),
+        }
+    baseline = report["ddl"]["prompt_tokens"]
+    report["saved_tokens"] = baseline - report["compact"]["prompt_tokens"]
+    report["saved"] = report["saved_tokens"] / baseline if baseline else 0.0
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m querycraft.utils.schema_renderer <schema_name>... [--budget TOKENS]")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    budget = None
+    if "--budget" in args:
+        index = args.index("--budget")
+        budget = int(args[index + 1])
+        del args[index:index + 2]
+    print(f"{'schema':>12} {'ddl schema':>11} {'compact':>8} {'ddl prompt':>11} {'compact':>8} {'saved':>12}")
+    for name in args:
+        report = token_report(name, budget)
+        ddl, compact = report["ddl"], report["compact"]
+        print(f"{name:>12} {ddl['schema_tokens']:>11} {compact['schema_tokens']:>8} "
+              f"{ddl['prompt_tokens']:>11} {compact['prompt_tokens']:>8} "
+              f"{report['saved_tokens']:>5} ({report['saved']:.0%})")
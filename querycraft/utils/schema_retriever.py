@@ -0,0 +1,299 @@
+import re
+import sys
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+from querycraft.utils.catalog import SchemaCatalog
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)
+
+    >>> estimate_tokens("SELECT 1;")
+    3
+    """
+    return math.ceil(len(text) / 4)
+
+
+# Pieces a BPE tokenizer (cl100k / Llama 3 style) splits text into before merging
+_TOKEN_PIECE = re.compile(r"[A-Za-z]+|\d{1,3}|\s+|[^\sA-Za-z\d]")
+
+
+def count_tokens(text: str) -> int:
+    """Closer token estimate for dense, punctuation-heavy text such as DDL
+
+    Mimics the pre-tokenization of BPE tokenizers: a word is one token per
+    eight letters, digits go in groups of three, every punctuation mark is a
+    token and a single space is absorbed by the word after it. Unlike
+    ``estimate_tokens`` it does not undercount ``a(b int, c→d.e)``-style
+    text, which is what compact schemas are made of.
+
+    >>> count_tokens("SELECT 1;")
+    3
+    >>> count_tokens("film(film_id int pk, language_id→language.language_id)")
+    18
+    """
+    count = 0
+    for piece in _TOKEN_PIECE.findall(text):
+        if piece[0].isalpha():
+            count += 1 + (len(piece) - 1) // 8
+        elif piece != " ":
+            count += 1
+    return count
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search terms
+
+    Identifiers are split on underscores as well as kept whole, and a trailing
+    plural 's' is dropped so "films" matches "film".
+
+    >>> tokenize("Films per film_category")
+    ['film', 'per', 'film_category', 'film', 'category']
+    """
+    terms = []
+    for word in re.findall(r'[A-Za-z0-9_]+', text.lower()):
+        parts = [word] if '_' not in word else [word] + [p for p in word.split('_') if p]
+        for part in parts:
+            if len(part) > 3 and part.endswith('s') and not part.endswith('ss'):
+                part = part[:-1]
+            terms.append(part)
+    return terms
+
+
+class SchemaRelation:
+    """A table or view from the schema file with its searchable text"""
+
+    __slots__ = ("name", "kind", "statement", "columns", "comments", "references", "tokens")
+
+    def __init__(self, name: str, kind: str, statement: str):
+        self.name = name
+        self.kind = kind
+        self.statement = statement
+        self.columns = []
+        self.comments = []
+        self.references = set()
+        self.tokens = estimate_tokens(statement)
+
+
+class SchemaRetriever:
+    """BM25 index over the tables and views of a schema file
+
+    Retrieval picks the top-k relations for a question, then adds join
+    partners: tables that bridge two selected relations and tables the
+    selected relations reference by foreign key. Foreign keys come from the
+    schema catalog when the dump declares them, and otherwise are inferred
+    from ``<table>_id`` column naming.
+    """
+
+    # Shared across instances: resolved sql path -> (content digest, retriever)
+    _index_cache = {}
+    _index_cache_lock = threading.Lock()
+
+    def __init__(self, sql_path: Optional[Path] = None, k1: float = 1.5, b: float = 0.75,
+                 name_weight: int = 3, catalog: Optional[SchemaCatalog] = None):
+        """Build the index
+
+        Args:
+            sql_path (Path, optional): Schema file to index
+            k1 (float): BM25 term-frequency saturation
+            b (float): BM25 length normalization
+            name_weight (int): How many times relation names count relative to columns
+            catalog (SchemaCatalog, optional): Catalog to index instead of a
+                schema file (e.g. one introspected from the live database)
+        """
+        self.sql_path = Path(sql_path) if sql_path is not None else None
+        self.k1 = k1
+        self.b = b
+        self.name_weight = name_weight
+        self.relations = {}
+        self._load(catalog if catalog is not None else SchemaCatalog.load(self.sql_path))
+        self._build_index()
+
+    @classmethod
+    def for_schema(cls, schema_loader) -> "SchemaRetriever":
+        """Get the shared retriever for a SchemaLoader, rebuilding it if the file changed
+
+        Args:
+            schema_loader (SchemaLoader): Loader whose SQL file should be indexed
+
+        Returns:
+            SchemaRetriever: Cached index over the schema
+        """
+        _, digest = schema_loader._read_file(schema_loader.sql_path)
+        key = schema_loader.sql_path.resolve()
+        with cls._index_cache_lock:
+            entry = cls._index_cache.get(key)
+            if entry and entry[0] == digest:
+                return entry[1]
+        retriever = cls(schema_loader.sql_path)
+        with cls._index_cache_lock:
+            cls._index_cache[key] = (digest, retriever)
+        return retriever
+
+    @classmethod
+    def for_catalog(cls, catalog: SchemaCatalog, key: str, fingerprint: str) -> "SchemaRetriever":
+        """Get the shared retriever for a catalog, rebuilding it when the fingerprint changes
+
+        Args:
+            catalog (SchemaCatalog): Catalog to index
+            key (str): Identifies the catalog's source (e.g. a LiveCatalog cache key)
+            fingerprint (str): Changes whenever the catalog does
+
+        Returns:
+            SchemaRetriever: Cached index over the catalog
+        """
+        with cls._index_cache_lock:
+            entry = cls._index_cache.get(key)
+            if entry and entry[0] == fingerprint:
+                return entry[1]
+        retriever = cls(catalog=catalog)
+        with cls._index_cache_lock:
+            cls._index_cache[key] = (fingerprint, retriever)
+        return retriever
+
+    def _load(self, catalog: SchemaCatalog) -> None:
+        """Turn catalog tables and views into relations with columns and references"""
+        for table in catalog.relations():
+            relation = SchemaRelation(table.name, table.kind, table.ddl)
+            relation.columns = table.column_names
+            for target in table.references:
+                resolved = catalog.resolve(target)
+                relation.references.add(resolved.name if resolved is not None else target)
+            if table.comment:
+                relation.comments.append(table.comment)
+            relation.comments.extend(column.comment for column in table.columns if column.comment)
+            self.relations[table.name] = relation
+
+        self._infer_foreign_keys()
+
+    def _infer_foreign_keys(self) -> None:
+        """Link ``<table>_id`` columns to the table that owns that id"""
+        for relation in self.relations.values():
+            if relation.kind != "table":
+                continue
+            for column in relation.columns:
+                if not column.endswith('_id'):
+                    continue
+                for target in self.relations.values():
+                    if (target is not relation and target.kind == "table"
+                            and column.endswith(f"{target.name}_id")
+                            and f"{target.name}_id" in target.columns
+                            and target.columns[0] == f"{target.name}_id"):
+                        relation.references.add(target.name)
+            relation.references.discard(relation.name)
+
+    def _build_index(self) -> None:
+        """Compute BM25 term statistics for every relation"""
+        self._doc_terms = {}
+        document_frequency = Counter()
+        for relation in self.relations.values():
+            terms = tokenize(relation.name) * self.name_weight
+            terms += tokenize(" ".join(relation.columns))
+            terms += tokenize(" ".join(relation.comments))
+            counts = Counter(terms)
+            self._doc_terms[relation.name] = (counts, len(terms))
+            document_frequency.update(counts.keys())
+
+        count = max(len(self.relations), 1)
+        self._avg_length = sum(length for _, length in self._doc_terms.values()) / count
+        self._idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def score(self, question: str) -> dict[str, float]:
+        """BM25 score of every relation for a question"""
+        query_terms = set(tokenize(question))
+        scores = {}
+        for name, (counts, length) in self._doc_terms.items():
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length)
+            for term in query_terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores[name] = score
+        return scores
+
+    def retrieve(self, question: str, top_k: int = 4, token_budget: Optional[int] = None) -> list[str]:
+        """Select the relations to include in the prompt for a question
+
+        Args:
+            question (str): Natural language question
+            top_k (int): Number of directly matching relations to seed with
+            token_budget (int, optional): Maximum estimated tokens of DDL to select
+
+        Returns:
+            list: Relation names, most relevant first
+        """
+        scores = self.score(question)
+        ranked = sorted(scores, key=lambda name: (-scores[name], name))
+        seeds = [name for name in ranked if scores[name] > 0][:top_k]
+
+        bridges = [
+            name for name in ranked
+            if name not in seeds
+            and self.relations[name].kind == "table"
+            and len(self.relations[name].references & set(seeds)) >= 2
+        ]
+        targets = []
+        for name in seeds + bridges:
+            for target in sorted(self.relations[name].references, key=lambda t: (-scores.get(t, 0), t)):
+                if target in self.relations and target not in seeds + bridges + targets:
+                    targets.append(target)
+
+        selected = []
+        used = 0
+        for name in seeds + bridges + targets:
+            cost = self.relations[name].tokens
+            if token_budget is not None and used + cost > token_budget and selected:
+                continue
+            selected.append(name)
+            used += cost
+        return selected
+
+    def retrieve_context(self, question: str, top_k: int = 4, token_budget: Optional[int] = None) -> str:
+        """DDL of the relations selected for a question, in schema file order"""
+        selected = set(self.retrieve(question, top_k=top_k, token_budget=token_budget))
+        if not selected:
+            return self.full_context()
+        return "\n".join(r.statement for r in self.relations.values() if r.name in selected)
+
+    def full_context(self) -> str:
+        """DDL of every indexed relation (the no-retrieval baseline)"""
+        return "\n".join(r.statement for r in self.relations.values())
+
+    def prompt_reduction(self, question: str, top_k: int = 4, token_budget: Optional[int] = None) -> dict:
+        """Compare retrieved schema context against the full schema file
+
+        Returns:
+            dict: baseline_tokens, retrieved_tokens, reduction (fraction saved)
+                and the selected tables
+        """
+        baseline = estimate_tokens(self.sql_path.read_text() if self.sql_path else self.full_context())
+        tables = self.retrieve(question, top_k=top_k, token_budget=token_budget)
+        retrieved = estimate_tokens(self.retrieve_context(question, top_k=top_k, token_budget=token_budget))
+        return {
+            "baseline_tokens": baseline,
+            "retrieved_tokens": retrieved,
+            "reduction": 1 - retrieved / baseline if baseline else 0.0,
+            "tables": tables,
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m querycraft.utils.schema_retriever <schema_name> <question> [top_k]")
+        sys.exit(1)
+
+    from querycraft.utils.schema_loader import SchemaLoader
+
+    loader = SchemaLoader(schema_name=sys.argv[1])
+    top_k = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    report = SchemaRetriever.for_schema(loader).prompt_reduction(sys.argv[2], top_k=top_k)
+    print(f"Tables: {', '.join(report['tables'])}")
+    print(f"Schema tokens: {report['baseline_tokens']} -> {report['retrieved_tokens']} "
+          f"({report['reduction']:.0%} saved)")
@@ -0,0 +1,329 @@
+import json
+import time
+import asyncio
+import argparse
+import logging
+import threading
+from collections import deque
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from querycraft.config.groq_config import GroqConfig
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.schema_loader import SchemaLoader
+from querycraft.utils.query_cache import QueryCache
+from querycraft.utils.latency_stats import summarize
+from querycraft.utils.llm_scheduler import scheduler
+from querycraft.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted (bytes)
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+           504: "Gateway Timeout"}
+
+
+class QueryService:
+    """Long-running HTTP service answering natural-language queries
+
+    One DatabaseConnector per schema is created on first use and shared by
+    every client, so connection pools, prompt caches, the query cache and
+    LLM clients are built once per process. Queries run on a fixed set of
+    worker threads; requests beyond ``workers + queue_size`` are refused
+    with 503 instead of piling up, and a request that takes longer than its
+    timeout gets 504. What is left of the timeout when a worker picks the
+    request up becomes its query's statement_timeout, so abandoned queries
+    are cancelled rather than holding a pooled connection.
+
+    Endpoints:
+        POST /query: ``{"schema", "question", "bypass_cache", "row_limit",
+            "timeout", "trace"}`` -> the result of execute_natural_query
+        GET /health: Status, load, latency and cache/scheduler counters (JSON)
+        GET /metrics: Service counters and stage histograms (Prometheus text)
+    """
+
+    def __init__(self, connector_for: Optional[Callable] = None, schemas: Optional[list] = None,
+                 workers: int = 8, queue_size: int = 32, timeout: float = 30.0):
+        """Initialize the service
+
+        Args:
+            connector_for (callable, optional): Schema name -> DatabaseConnector
+                (or any object with ``execute_natural_query``); called once per
+                schema. Defaults to connectors sharing one QueryCache
+            schemas (list, optional): Schemas clients may query; defaults to
+                the schemas under querycraft/schemas and their aliases
+            workers (int): Queries executed at the same time
+            queue_size (int): Queries allowed to wait for a worker
+            timeout (float): Maximum seconds per request
+        """
+        self.schemas = set(schemas or SchemaLoader.list_available_schemas() + list(GroqConfig.SCHEMA_MAPPING))
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.query_cache = None
+        self._connector_for = connector_for or self._default_connector
+        self._connectors = {}
+        self._building = {}
+        self._connectors_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="querycraft-worker")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.started = time.time()
+        self.stats = {"requests": 0, "completed": 0, "errors": 0, "rejected": 0, "timeouts": 0}
+
+    def _default_connector(self, schema_name: str) -> DatabaseConnector:
+        with self._connectors_lock:
+            if self.query_cache is None:
+                self.query_cache = QueryCache()
+        return DatabaseConnector(schema_name=schema_name, query_cache=self.query_cache)
+
+    def connector(self, schema_name: str):
+        """Shared connector for a schema, created on first use"""
+        connector = self._connectors.get(schema_name)
+        if connector is not None:
+            return connector
+        # Building a connector loads the schema; concurrent first requests
+        # for the same schema wait for one build instead of repeating it
+        with self._connectors_lock:
+            building = self._building.setdefault(schema_name, threading.Lock())
+        with building:
+            connector = self._connectors.get(schema_name)
+            if connector is None:
+                connector = self._connector_for(schema_name)
+                with self._connectors_lock:
+                    self._connectors[schema_name] = connector
+            return connector
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self.stats["rejected"] += 1
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self, future) -> None:
+        # Called when the worker finishes, even if the client already timed out
+        with self._lock:
+            self._pending -= 1
+
+    def _answer(self, schema_name: str, question: str, bypass_cache: bool, row_limit: Optional[int],
+                deadline: float) -> dict:
+        # The query gets whatever is left of the request's timeout as its
+        # statement_timeout, so a request the client gave up on frees its connection
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise Exception("Request timed out before it started")
+        connector = self.connector(schema_name)
+        return connector.execute_natural_query(question, bypass_cache=bypass_cache, row_limit=row_limit,
+                                               statement_timeout_ms=int(remaining * 1000))
+
+    async def query(self, payload: dict) -> tuple:
+        """Answer a /query request
+
+        Returns:
+            tuple: (HTTP status, JSON-serializable body)
+        """
+        self._count("requests")
+        schema_name, question = payload.get("schema"), payload.get("question")
+        if not isinstance(question, str) or not question.strip() or not isinstance(schema_name, str):
+            return 400, {"error": "schema and question must be non-empty strings"}
+        if schema_name not in self.schemas:
+            return 404, {"error": f"Unknown schema: {schema_name}. Available: {', '.join(sorted(self.schemas))}"}
+        try:
+            timeout = min(float(payload.get("timeout") or self.timeout), self.timeout)
+            row_limit = payload.get("row_limit")
+            row_limit = int(row_limit) if row_limit is not None else None
+        except (TypeError, ValueError):
+            return 400, {"error": "timeout and row_limit must be numbers"}
+        if not self._admit():
+            return 503, {"error": "Too many queued queries, retry later"}
+
+        start = time.perf_counter()
+        future = self._executor.submit(self._answer, schema_name, question.strip(),
+                                       bool(payload.get("bypass_cache")), row_limit, time.monotonic() + timeout)
+        future.add_done_callback(self._release)
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # Drops the request if it is still queued; a running query stops at its statement_timeout
+            future.cancel()
+            self._count("timeouts")
+            return 504, {"error": f"Query did not finish within {timeout:g}s"}
+        except Exception as e:
+            self._count("errors")
+            return 500, {"error": str(e)}
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats["completed"] += 1
+            self._latencies.append(elapsed)
+        if not payload.get("trace"):
+            response = {key: value for key, value in response.items() if key != "trace"}
+        return 200, dict(response, elapsed=elapsed)
+
+    def health(self) -> dict:
+        """Status, load and counters of the service"""
+        with self._lock:
+            stats = dict(self.stats)
+            pending = self._pending
+            latencies = list(self._latencies)
+        with self._connectors_lock:
+            loaded = sorted(self._connectors)
+        return {
+            "status": "ok",
+            "uptime": time.time() - self.started,
+            "schemas": {"available": sorted(self.schemas), "loaded": loaded},
+            "load": {
+                "running": min(pending, self.workers),
+                "queued": max(0, pending - self.workers),
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+            },
+            "requests": stats,
+            "latency": summarize(latencies),
+            "query_cache": dict(self.query_cache.stats) if self.query_cache is not None else None,
+            "llm": scheduler.snapshot(),
+        }
+
+    def metrics(self) -> str:
+        """Service counters and tracer histograms in the Prometheus text format"""
+        with self._lock:
+            stats = dict(self.stats)
+            pending = self._pending
+        lines = ["# TYPE querycraft_service_requests_total counter"]
+        for outcome in ("completed", "errors", "rejected", "timeouts"):
+            lines.append(f'querycraft_service_requests_total{{outcome="{outcome}"}} {stats[outcome]}')
+        lines.append("# TYPE querycraft_service_pending gauge")
+        lines.append(f"querycraft_service_pending {pending}")
+        return "\n".join(lines) + "\n" + tracer.metrics.to_prometheus()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        """Route a request
+
+        Returns:
+            tuple: (HTTP status, body as a dict for JSON or a str for text)
+        """
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/query":
+            if method != "POST":
+                return 405, {"error": "Use POST /query"}
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "Request body must be JSON"}
+            if not isinstance(payload, dict):
+                return 400, {"error": "Request body must be a JSON object"}
+            return await self.query(payload)
+        if path in ("/health", "/metrics"):
+            if method != "GET":
+                return 405, {"error": f"Use GET {path}"}
+            return (200, self.health()) if path == "/health" else (200, self.metrics())
+        return 404, {"error": f"Unknown path {path}"}
+
+    async def _respond(self, writer, status: int, body, keep_alive: bool) -> None:
+        if isinstance(body, str):
+            data, content_type = body.encode(), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(body, default=str).encode(), "application/json"
+        headers = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(data)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+    async def _handle_client(self, reader, writer) -> None:
+        """Serve HTTP/1.1 requests on one connection until it closes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+                method, path, version = parts
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": f"Body larger than {MAX_BODY} bytes"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, response = await self.dispatch(method, path, body)
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080):
+        """Start listening
+
+        Returns:
+            asyncio.Server: The listening server (port 0 picks a free port)
+        """
+        server = await asyncio.start_server(self._handle_client, host, port)
+        address = server.sockets[0].getsockname()
+        logger.info(f"Serving queries for {len(self.schemas)} schemas at http://{address[0]}:{address[1]}")
+        return server
+
+    def close(self) -> None:
+        """Stop the worker threads once running queries finish"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(service: QueryService, host: str = "127.0.0.1", port: int = 8080) -> None:
+    """Run a service until cancelled"""
+    server = await service.start(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m querycraft serve",
+                                     description="Serve natural-language queries over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="queries executed at the same time")
+    parser.add_argument("--queue-size", type=int, default=32, help="queries allowed to wait for a worker")
+    parser.add_argument("--timeout", type=float, default=30.0, help="maximum seconds per request")
+    parser.add_argument("--schemas", nargs="+", help="schemas clients may query (default: all)")
+    args = parser.parse_args(argv)
+
+    # Stage histograms for /metrics are only recorded while tracing
+    tracer.enable()
+    service = QueryService(schemas=args.schemas, workers=args.workers,
+                           queue_size=args.queue_size, timeout=args.timeout)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
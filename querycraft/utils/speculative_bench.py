@@ -0,0 +1,47 @@
+import sys
+import time
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.latency_stats import summarize
+
+def time_questions(db, questions, repeats: int = 1, speculative: int = 0) -> list:
+    """Latency of execute_natural_query for each question, bypassing the query cache"""
+    latencies = []
+    for _ in range(repeats):
+        for question in questions:
+            start = time.perf_counter()
+            try:
+                db.execute_natural_query(question, bypass_cache=True, speculative=speculative)
+            except Exception as e:
+                print(f"Failed: {question}: {e}")
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+def compare(db, questions, candidates: int = 3, repeats: int = 1) -> dict:
+    """Compare the sequential retry path against speculative generation
+
+    Returns:
+        dict: Latency summaries keyed by "sequential" and "speculative"
+    """
+    return {
+        "sequential": summarize(time_questions(db, questions, repeats)),
+        "speculative": summarize(time_questions(db, questions, repeats, speculative=candidates)),
+    }
+
+def main(schema_name, candidates: int = 3, repeats: int = 1):
+    db = DatabaseConnector(schema_name=schema_name, use_query_cache=False)
+    questions = [ex['question'] for ex in db.groq_config.schema_loader.get_example_list()]
+
+    report = compare(db, questions, candidates=candidates, repeats=repeats)
+    for mode, stats in report.items():
+        print(f"{mode:>12}: n={stats['count']} p50={stats['p50']:.3f}s "
+              f"p99={stats['p99']:.3f}s mean={stats['mean']:.3f}s")
+    return report
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m querycraft.utils.speculative_bench <schema_name> [candidates] [repeats]")
+        sys.exit(1)
+
+    main(sys.argv[1],
+         candidates=int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+         repeats=int(sys.argv[3]) if len(sys.argv) > 3 else 1)
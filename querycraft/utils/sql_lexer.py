@@ -0,0 +1,262 @@
+import re
+from collections import namedtuple
+
+Token = namedtuple("Token", ["kind", "value"])
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<whitespace>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<dollar>\$\$.*?\$\$|\$(?P<tag>[A-Za-z_]\w*)\$.*?\$(?P=tag)\$)
+  | (?P<string>[Ee]'(?:[^'\\]|\\.|'')*'|[BbXxNn]?'(?:[^']|'')*')
+  | (?P<ident>"(?:[^"]|"")*")
+  | (?P<param>\$\d+|%\(\w+\)s|%s)
+  | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<op>::|<=|>=|<>|!=|\|\||[^\s\w])
+""", re.VERBOSE | re.DOTALL)
+
+# Words that may precede "(" without making it a function call
+NON_CALL_KEYWORDS = {
+    'select', 'from', 'where', 'in', 'exists', 'as', 'join', 'on', 'and', 'or',
+    'not', 'any', 'all', 'some', 'values', 'using', 'lateral', 'union', 'intersect',
+    'except', 'with', 'recursive', 'having', 'into', 'then', 'else', 'when', 'case',
+    'by', 'returning', 'set', 'is',
+}
+WRITE_KEYWORDS = {
+    'insert', 'update', 'delete', 'merge', 'truncate', 'create', 'alter', 'drop',
+    'grant', 'revoke', 'copy', 'vacuum', 'reindex', 'cluster', 'comment',
+}
+VOLATILE_FUNCTIONS = {
+    'now', 'random', 'nextval', 'currval', 'setval', 'clock_timestamp', 'current_timestamp',
+    'current_date', 'current_time', 'localtime', 'localtimestamp', 'timeofday',
+    'statement_timestamp', 'transaction_timestamp', 'gen_random_uuid', 'txid_current',
+    'pg_sleep', 'setseed',
+}
+JOIN_WORDS = {'from', 'join'}
+RELATION_MODIFIERS = {'only', 'lateral'}
+CLAUSE_KEYWORDS = {
+    'where', 'group', 'order', 'having', 'limit', 'offset', 'join', 'inner', 'left',
+    'right', 'full', 'cross', 'natural', 'on', 'using', 'union', 'intersect', 'except',
+    'window', 'fetch', 'for', 'returning', 'set', 'values', 'select', 'into', 'default',
+}
+
+
+def tokenize(sql: str) -> list:
+    """Split SQL into tokens, keeping string literals, quoted identifiers,
+    dollar-quoted bodies and comments intact
+
+    >>> [t.value for t in tokenize("SELECT 'a;b' FROM t;") if t.kind != 'whitespace']
+    ['SELECT', "'a;b'", 'FROM', 't', ';']
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(sql):
+        tokens.append(Token(match.lastgroup if match.lastgroup != 'tag' else 'dollar', match.group()))
+    return tokens
+
+
+def significant_tokens(sql: str) -> list:
+    """Tokens without whitespace and comments"""
+    return [t for t in tokenize(sql) if t.kind not in ('whitespace', 'comment')]
+
+
+def canonicalize(sql: str) -> str:
+    """Canonical form of a statement for use as a cache key
+
+    Whitespace and comments are dropped, unquoted words are lowercased and a
+    trailing semicolon is removed; literals and quoted identifiers are kept.
+
+    >>> canonicalize("SELECT  count(*)\\n FROM Basket_A -- all rows\\n;")
+    'select count ( * ) from basket_a'
+    >>> canonicalize("select * from t where name = 'Apple'")
+    "select * from t where name = 'Apple'"
+    """
+    parts = [t.value.lower() if t.kind == 'word' else t.value for t in significant_tokens(sql)]
+    while parts and parts[-1] == ';':
+        parts.pop()
+    return " ".join(parts)
+
+
+def find_statement_end(sql: str) -> int:
+    """Index just past the semicolon ending the first complete statement
+
+    Semicolons inside literals, quoted identifiers and comments are ignored.
+
+    Returns:
+        int: Offset after the terminating semicolon, or -1 if there is none yet
+
+    >>> find_statement_end("SELECT ';' FROM t; extra text")
+    18
+    >>> find_statement_end("SELECT 'unterminated;")
+    -1
+    """
+    offset = 0
+    for token in tokenize(sql):
+        offset += len(token.value)
+        if token.kind == 'op' and token.value == ';':
+            return offset
+        if token.kind == 'op' and token.value in ("'", '"'):
+            return -1
+    return -1
+
+
+def _relation_name(tokens: list, i: int) -> tuple:
+    """Read a possibly schema-qualified relation name starting at tokens[i]
+
+    Returns:
+        tuple: (bare lowercase name, index after the name)
+    """
+    name = tokens[i].value
+    i += 1
+    while i + 1 < len(tokens) and tokens[i].value == '.' and tokens[i + 1].kind in ('word', 'ident'):
+        name = tokens[i + 1].value
+        i += 2
+    if name.startswith('"'):
+        return name[1:-1].replace('""', '"'), i
+    return name.lower(), i
+
+
+def _read_relation(tokens: list, j: int, column_list: bool = False) -> tuple:
+    """Read one FROM-list entry (relation plus optional alias) at tokens[j]
+
+    Args:
+        tokens (list): Significant tokens of the statement
+        j (int): Index of the relation
+        column_list (bool): Whether "(" after the name starts a column list
+            (INSERT INTO t (...)) rather than a function call
+
+    Returns:
+        tuple: (bare relation name or None for subqueries/functions, next index)
+    """
+    while j < len(tokens) and tokens[j].value.lower() in RELATION_MODIFIERS:
+        j += 1
+    if j >= len(tokens) or tokens[j].kind not in ('word', 'ident'):
+        return None, j
+    name, j = _relation_name(tokens, j)
+    if j < len(tokens) and tokens[j].value == '(' and not column_list:
+        return None, j  # set-returning function such as generate_series(...)
+    if j < len(tokens) and tokens[j].value.lower() == 'as':
+        j += 1
+    if j < len(tokens) and tokens[j].kind in ('word', 'ident') and \
+            tokens[j].value.lower() not in CLAUSE_KEYWORDS:
+        j += 1
+    return name, j
+
+
+def statement_tables(sql: str) -> tuple:
+    """Tables a statement reads and writes
+
+    CTE names, subqueries and ``FROM`` inside function calls such as
+    ``EXTRACT(year FROM ...)`` are not reported as tables.
+
+    Returns:
+        tuple: (set of tables read, set of tables written)
+
+    >>> reads, writes = statement_tables("SELECT * FROM film f JOIN film_actor fa USING (film_id), actor a")
+    >>> sorted(reads), sorted(writes)
+    (['actor', 'film', 'film_actor'], [])
+    >>> statement_tables("WITH x AS (SELECT EXTRACT(year FROM rental_date) FROM rental) SELECT * FROM x")
+    ({'rental'}, set())
+    >>> statement_tables("DELETE FROM basket_a WHERE id IN (SELECT id FROM basket_b)")
+    ({'basket_b'}, {'basket_a'})
+    >>> sorted(statement_tables("SELECT * FROM ((customer cu JOIN address a ON (cu.address_id = a.address_id)))")[0])
+    ['address', 'customer']
+    """
+    tokens = significant_tokens(sql)
+    reads, writes, ctes = set(), set(), set()
+    paren_kinds = []
+    # Paren depths at which a FROM list is open (a comma there adds a relation)
+    from_depths = []
+    in_with = False
+    # Whether the open parenthesis directly follows FROM/JOIN (a parenthesized join)
+    join_paren = False
+    previous = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        word = token.value.lower() if token.kind == 'word' else None
+        depth = len(paren_kinds)
+        in_call = bool(paren_kinds) and paren_kinds[-1] == 'call'
+        prev_word = previous.value.lower() if previous is not None else None
+
+        if token.value == '(':
+            is_call = previous is not None and (
+                (previous.kind == 'word' and prev_word not in NON_CALL_KEYWORDS)
+                or previous.kind == 'ident'
+            )
+            paren_kinds.append('call' if is_call else 'group')
+            join_paren = (prev_word in JOIN_WORDS and not in_call) or \
+                (previous is not None and previous.value == '(' and join_paren)
+        elif token.value == ')':
+            if paren_kinds:
+                paren_kinds.pop()
+            from_depths = [d for d in from_depths if d <= len(paren_kinds)]
+        elif token.value == ';':
+            from_depths = []
+        elif word == 'with' and not in_call:
+            in_with = True
+        elif in_with and depth == 0 and word in ('select', 'insert', 'update', 'delete', 'values'):
+            in_with = False
+
+        if in_with and depth == 0 and (word in ('with', 'recursive') or token.value == ','):
+            j = i + 1
+            if j + 1 < len(tokens) and tokens[j].kind in ('word', 'ident') and \
+                    tokens[j + 1].value.lower() in ('as', '('):
+                ctes.add(_relation_name(tokens, j)[0])
+
+        if word in ('into', 'update') or (word == 'from' and prev_word == 'delete'):
+            if not in_call and not (word == 'update' and prev_word in ('for', 'no', 'key')):
+                name, j = _read_relation(tokens, i + 1, column_list=True)
+                if name is not None:
+                    writes.add(name)
+                    if word == 'update':
+                        from_depths.append(depth)
+                    previous = tokens[j - 1]
+                    i = j
+                    continue
+        elif join_paren and previous is not None and previous.value == '(' and \
+                token.kind in ('word', 'ident') and word not in ('select', 'with', 'values'):
+            name, j = _read_relation(tokens, i)
+            if name is not None:
+                reads.add(name)
+                previous = tokens[j - 1]
+                i = j
+                continue
+        elif (word in JOIN_WORDS and not in_call) or \
+                (token.value == ',' and from_depths and from_depths[-1] == depth):
+            if word == 'from':
+                from_depths = [d for d in from_depths if d < depth] + [depth]
+            name, j = _read_relation(tokens, i + 1)
+            if name is not None:
+                reads.add(name)
+                previous = tokens[j - 1]
+                i = j
+                continue
+        elif word in CLAUSE_KEYWORDS and word not in ('join', 'inner', 'left', 'right', 'full',
+                                                      'cross', 'natural', 'on', 'using') \
+                and from_depths and from_depths[-1] == depth:
+            from_depths.pop()
+
+        previous = token
+        i += 1
+
+    return reads - ctes, writes - ctes
+
+
+def is_write_statement(sql: str) -> bool:
+    """Whether a statement may modify data or schema
+
+    >>> is_write_statement("WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d")
+    True
+    >>> is_write_statement("SELECT last_update FROM film")
+    False
+    """
+    return any(t.kind == 'word' and t.value.lower() in WRITE_KEYWORDS for t in significant_tokens(sql))
+
+
+def has_volatile_functions(sql: str) -> bool:
+    """Whether a statement calls functions whose result changes between runs
+
+    >>> has_volatile_functions("SELECT * FROM rental WHERE rental_date > now() - interval '1 day'")
+    True
+    """
+    return any(t.kind == 'word' and t.value.lower() in VOLATILE_FUNCTIONS for t in significant_tokens(sql))
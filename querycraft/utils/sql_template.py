@@ -0,0 +1,215 @@
+import re
+import hashlib
+from typing import Optional
+from querycraft.utils.sql_lexer import tokenize
+from querycraft.utils.execution_policy import statement_kind
+
+# Statements PREPARE accepts
+PREPARABLE_STATEMENTS = {"select", "with", "values", "insert", "update", "delete"}
+
+# Words that turn a following string into a typed constant (DATE '2020-01-01'),
+# which cannot be replaced by a parameter
+TYPED_LITERAL_PREFIXES = {
+    "date", "time", "timestamp", "timestamptz", "interval", "numeric", "decimal", "int",
+    "integer", "bigint", "smallint", "boolean", "bool", "real", "float", "precision",
+    "text", "varchar", "char", "character", "varying", "json", "jsonb", "uuid", "inet",
+    "cidr", "bytea", "money", "zone",
+}
+# Type names whose parenthesized numbers are modifiers, e.g. numeric(10, 2)
+TYPE_MODIFIER_NAMES = {
+    "numeric", "decimal", "varchar", "char", "character", "varying", "bit", "time",
+    "timestamp", "timestamptz", "interval", "float",
+}
+CLAUSE_RESETS = {
+    "select", "from", "where", "having", "limit", "offset", "fetch", "window", "union",
+    "intersect", "except", "for", "returning", "on", "using", "join",
+}
+INT4_RANGE = range(-2 ** 31, 2 ** 31)
+INT8_RANGE = range(-2 ** 63, 2 ** 63)
+QUESTION_LITERAL_PATTERN = re.compile(r"""'([^']*)'|"([^"]*)"|(?<![\w.-])(\d+(?:\.\d+)?)(?![\w.])""")
+
+
+def literal_type(literal: str) -> str:
+    """Postgres type a literal would get on its own
+
+    >>> [literal_type(v) for v in ("5", "4000000000", "4.99", "'G'")]
+    ['integer', 'bigint', 'numeric', 'unknown']
+    """
+    if literal.startswith("'"):
+        return "unknown"
+    if re.fullmatch(r"\d+", literal):
+        value = int(literal)
+        if value in INT4_RANGE:
+            return "integer"
+        if value in INT8_RANGE:
+            return "bigint"
+    return "numeric"
+
+
+class SqlTemplate:
+    """A statement with its string and numeric literals lifted into parameters
+
+    ``text`` uses ``$1 .. $n`` placeholders and ``params`` holds the lifted
+    literals verbatim, so ``EXECUTE name(params)`` needs no quoting and the
+    statement means exactly what it meant before.
+    """
+
+    __slots__ = ("text", "params", "types")
+
+    def __init__(self, text: str, params: list):
+        self.text = text
+        self.params = params
+        self.types = tuple(literal_type(param) for param in params)
+
+    @property
+    def key(self) -> tuple:
+        """Identity of the prepared statement: template text and parameter types"""
+        return self.text, self.types
+
+    @property
+    def statement_name(self) -> str:
+        digest = hashlib.sha1(f"{self.text}\0{','.join(self.types)}".encode()).hexdigest()
+        return f"qc_{digest[:20]}"
+
+    def prepare_statement(self, name: str) -> str:
+        """PREPARE statement declaring the literal's types; strings stay ``unknown``
+        so Postgres infers them from context, as it would for the literal"""
+        return f"PREPARE {name} ({', '.join(self.types)}) AS {self.text}"
+
+    def execute_statement(self, name: str) -> str:
+        return f"EXECUTE {name} ({', '.join(self.params)})"
+
+    def render(self, params: Optional[list] = None) -> str:
+        """Substitute literals back into the template
+
+        >>> t = parameterize("SELECT title FROM film WHERE rating = 'G' LIMIT 5")
+        >>> t.render(["'PG'", "10"])
+        "SELECT title FROM film WHERE rating = 'PG' LIMIT 10"
+        """
+        params = self.params if params is None else params
+        return "".join(
+            params[int(token.value[1:]) - 1] if token.kind == 'param' else token.value
+            for token in tokenize(self.text)
+        )
+
+
+def parameterize(sql_query: str) -> SqlTemplate:
+    """Lift the string and numeric literals of a statement into parameters
+
+    Literals that cannot be parameters are kept: positional ``ORDER BY`` and
+    ``GROUP BY`` references, typed constants such as ``DATE '2020-01-01'``,
+    type modifiers, and prefixed strings (E'', B'', X''). Statements that
+    already use parameters, or that PREPARE does not accept, are returned
+    without parameters.
+
+    >>> t = parameterize("SELECT f.title FROM film f WHERE f.length > 120 AND f.rating = 'PG-13' ORDER BY 1")
+    >>> t.text, t.params
+    ('SELECT f.title FROM film f WHERE f.length > $1 AND f.rating = $2 ORDER BY 1', ['120', "'PG-13'"])
+    >>> parameterize("SELECT * FROM rental WHERE rental_date > DATE '2005-06-01'").params
+    []
+    """
+    tokens = tokenize(sql_query)
+    if statement_kind(sql_query) not in PREPARABLE_STATEMENTS or any(t.kind == 'param' for t in tokens):
+        return SqlTemplate(sql_query, [])
+
+    parts = []
+    params = []
+    # Per parenthesis depth: whether we are inside ORDER BY / GROUP BY, and
+    # the word before the opening parenthesis
+    clause = [None]
+    opener = [None]
+    previous = None
+    for token in tokens:
+        value = token.value
+        if token.kind in ('whitespace', 'comment'):
+            parts.append(value)
+            continue
+        word = value.lower() if token.kind == 'word' else None
+        prev_word = previous.value.lower() if previous is not None and previous.kind == 'word' else None
+
+        if value == '(':
+            clause.append(None)
+            opener.append(prev_word)
+        elif value == ')' and len(clause) > 1:
+            clause.pop()
+            opener.pop()
+        elif word == 'by' and prev_word in ('order', 'group'):
+            clause[-1] = 'by'
+        elif word in CLAUSE_RESETS:
+            clause[-1] = None
+
+        liftable = False
+        if token.kind == 'string' and value.startswith("'"):
+            liftable = prev_word not in TYPED_LITERAL_PREFIXES
+        elif token.kind == 'number':
+            positional = clause[-1] == 'by' and previous is not None and previous.value.lower() in ('by', ',')
+            modifier = opener[-1] in TYPE_MODIFIER_NAMES
+            liftable = not positional and not modifier
+
+        if liftable:
+            params.append(value)
+            parts.append(f"${len(params)}")
+        else:
+            parts.append(value)
+        previous = token
+    return SqlTemplate("".join(parts), params)
+
+
+def question_template(question: str) -> tuple:
+    """Lift quoted strings and numbers out of a question
+
+    >>> question_template("Revenue of film 'ACADEMY DINOSAUR' in 2005?")
+    ('Revenue of film {0} in {1}?', [('str', 'ACADEMY DINOSAUR'), ('num', '2005')])
+    """
+    values = []
+
+    def replace(match):
+        text, quoted, number = match.groups()
+        values.append(('num', number) if number is not None else ('str', text if text is not None else quoted))
+        return f"{{{len(values) - 1}}}"
+
+    return QUESTION_LITERAL_PATTERN.sub(replace, question), values
+
+
+def _literal_value(literal: str) -> tuple:
+    if literal.startswith("'"):
+        return 'str', literal[1:-1].replace("''", "'")
+    return 'num', literal
+
+
+def bind_question(template: SqlTemplate, question_values: list) -> Optional[list]:
+    """Link the parameters of generated SQL to the literals of its question
+
+    Returns:
+        list: For each SQL parameter, the index of the question literal it
+            came from, or None if it does not come from the question; None
+            if some question literal does not appear in the SQL, since the
+            SQL then depends on it in a way a template cannot express
+
+    >>> bind_question(parameterize("SELECT * FROM film WHERE title = 'ALI' LIMIT 5"), [('str', 'ALI')])
+    [0, None]
+    """
+    bindings = []
+    for param in template.params:
+        value = _literal_value(param)
+        bindings.append(question_values.index(value) if value in question_values else None)
+    if not question_values or set(range(len(question_values))) - set(bindings):
+        return None
+    return bindings
+
+
+def render_bound(template: SqlTemplate, bindings: list, question_values: list) -> str:
+    """SQL for a new question with the same template, using its literals
+
+    >>> t = parameterize("SELECT * FROM film WHERE title = 'ALI' LIMIT 5")
+    >>> render_bound(t, [0, None], [('str', "JOE'S")])
+    "SELECT * FROM film WHERE title = 'JOE''S' LIMIT 5"
+    """
+    params = []
+    for param, binding in zip(template.params, bindings):
+        if binding is None:
+            params.append(param)
+            continue
+        kind, value = question_values[binding]
+        params.append("'" + value.replace("'", "''") + "'" if kind == 'str' else value)
+    return template.render(params)
@@ -1,38 +1,210 @@
 import os
-import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import tempfile
 from pathlib import Path
+from typing import Optional
 from querycraft.config.groq_config import GroqConfig
+from querycraft.utils.tracing import tracer
+
+# Separates the question from the generated SQL in output files (and in
+# question files written by older versions, which appended in place)
+LLM_OUTPUT_MARKER = "\n-- LLM Generated SQL\n"
+MANIFEST_NAME = "manifest.json"
 
 def read_sql_files(sql_folder):
-    sql_files = Path(sql_folder).glob("*.sql")
+    """Question text of every ``*.sql`` file, without output appended by older runs"""
+    sql_files = sorted(Path(sql_folder).glob("*.sql"))
     sql_contents = {}
     for sql_file in sql_files:
         with open(sql_file, 'r') as file:
-            sql_contents[sql_file.name] = file.read()
+            sql_contents[sql_file.name] = file.read().split(LLM_OUTPUT_MARKER)[0]
     return sql_contents
 
-def append_llm_output(sql_folder, file_name, content):
-    output_path = Path(sql_folder) / file_name
-    with open(output_path, 'a') as file:
-        file.write("\n-- LLM Generated SQL\n")
-        file.write(content)
+def write_atomic(path: Path, content: str) -> None:
+    """Write a file so readers see either the old or the new content, never a partial one"""
+    path = Path(path)
+    # A unique temporary file, so concurrent runs cannot move each other's file away
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def generation_key(question: str, schema_fingerprint: str, model_params: dict) -> str:
+    """Hash of everything that determines the SQL generated for a question
+
+    >>> key = generation_key("How many fruits?", "abc", {"model": "m"})
+    >>> key == generation_key("How many fruits?", "abc", {"model": "m"})
+    True
+    >>> key == generation_key("How many fruits?", "abc", {"model": "other"})
+    False
+    """
+    payload = json.dumps([question, schema_fingerprint, model_params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def load_manifest(output_dir: Path) -> dict:
+    """File name -> generation key of every output in ``output_dir``
+
+    A missing or unreadable manifest is treated as empty, so everything is
+    regenerated.
+    """
+    try:
+        with open(Path(output_dir) / MANIFEST_NAME, 'r') as file:
+            return json.load(file)["files"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def save_manifest(output_dir: Path, manifest: dict) -> None:
+    write_atomic(Path(output_dir) / MANIFEST_NAME,
+                 json.dumps({"files": dict(sorted(manifest.items()))}, indent=2) + "\n")
+
+def stale_files(sql_contents: dict, keys: dict, manifest: dict, output_dir: Path) -> list:
+    """Question files whose output is missing or was generated from different inputs"""
+    return [
+        file_name for file_name in sorted(sql_contents)
+        if manifest.get(file_name) != keys[file_name] or not (Path(output_dir) / file_name).exists()
+    ]
+
+async def generate_batch(groq_config: GroqConfig, output_dir, sql_contents: dict,
+                         concurrency: int = 4, keys: Optional[dict] = None, manifest: Optional[dict] = None) -> dict:
+    """Generate SQL for every file concurrently and write each output as it completes
+
+    At most ``concurrency`` requests are in flight. Each output file holds the
+    question, LLM_OUTPUT_MARKER and the generated SQL, and is written
+    atomically as soon as its request finishes. Outputs do not depend on each
+    other, so the result is the same as a sequential run whatever the
+    completion order. Requests wait for the requests/tokens-per-minute
+    budget of ``groq_config.scheduler``, the one every LLM call shares.
+
+    Args:
+        groq_config (GroqConfig): Config used for generation
+        output_dir (Path): Folder the outputs are written to
+        sql_contents (dict): File name -> question text
+        concurrency (int): Maximum number of concurrent requests
+        keys (dict, optional): File name -> generation key; with ``manifest``,
+            recorded for each written output
+        manifest (dict, optional): Manifest updated and saved after every
+            output, so an interrupted run keeps its finished files
 
-def main(schema_name):
-    sql_folder = Path("test_databases") / schema_name / "sql"
+    Returns:
+        dict: files, failures, elapsed seconds, throughput (files/second)
+            and seconds the scheduler held requests back for the budget
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    file_names = sorted(sql_contents)
 
-    groq_config = GroqConfig(schema_name=schema_name)
+    async def generate(file_name):
+        """(file name, generated SQL or None, error or None)"""
+        async with semaphore:
+            print(f"Processing {file_name}...")
+            try:
+                with tracer.span("generate", file=file_name, retries=0):
+                    llm_output = await groq_config.agenerate_sql(sql_contents[file_name])
+            except Exception as e:
+                return file_name, None, e
+            return file_name, llm_output, None
+
+    budget_wait = groq_config.scheduler.snapshot()["budget_wait_seconds"]
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(generate(file_name)) for file_name in file_names]
+    failures = {}
+    for task in asyncio.as_completed(tasks):
+        file_name, llm_output, error = await task
+        if error is not None:
+            failures[file_name] = str(error)
+            print(f"Failed {file_name}: {error}")
+            continue
+        output_path = Path(output_dir) / file_name
+        write_atomic(output_path, sql_contents[file_name] + LLM_OUTPUT_MARKER + llm_output)
+        if manifest is not None:
+            manifest[file_name] = keys[file_name]
+            save_manifest(output_dir, manifest)
+        print(f"Output written to {output_path}")
+    elapsed = time.perf_counter() - start
+
+    return {
+        "files": len(file_names),
+        "failures": failures,
+        "elapsed": elapsed,
+        "throughput": len(file_names) / elapsed if elapsed else 0.0,
+        "rate_limit_wait": groq_config.scheduler.snapshot()["budget_wait_seconds"] - budget_wait,
+    }
+
+def main(schema_name, concurrency: int = 4, requests_per_minute: Optional[float] = 30,
+         tokens_per_minute: Optional[float] = None, output_dir: Optional[Path] = None,
+         force: bool = False, groq_config: Optional[GroqConfig] = None):
+    """Generate SQL for the questions of a suite whose inputs changed since the last run
+
+    A manifest in the output folder records, per question file, a hash of the
+    question text, the schema and the model parameters. Files whose hash and
+    output are unchanged are skipped, and outputs of deleted questions are
+    removed. Given budgets replace the process-wide ones of the LLM
+    scheduler (see ``RequestScheduler.configure``); without any, the
+    ``QUERYCRAFT_LLM_RPM``/``QUERYCRAFT_LLM_TPM`` budgets apply.
+
+    Args:
+        schema_name (str): Suite under ``test_databases`` (its ``sql`` folder holds the questions)
+        concurrency (int): Maximum number of concurrent requests
+        requests_per_minute (float, optional): Request budget of the scheduler
+        tokens_per_minute (float, optional): Token budget of the scheduler
+        output_dir (Path, optional): Where outputs and the manifest are kept;
+            defaults to ``test_databases/<schema_name>/llm_sql``
+        force (bool): Regenerate every file
+        groq_config (GroqConfig, optional): Config used for generation
+
+    Returns:
+        dict: generate_batch statistics plus the skipped and removed file counts
+    """
+    suite_dir = Path("test_databases") / schema_name
+    sql_folder = suite_dir / "sql"
+    output_dir = Path(output_dir) if output_dir is not None else suite_dir / "llm_sql"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    groq_config = groq_config or GroqConfig(schema_name=schema_name)
     sql_contents = read_sql_files(sql_folder)
+    schema_fingerprint = groq_config.schema_fingerprint()
+    model_params = groq_config.cache_params()
+    keys = {name: generation_key(question, schema_fingerprint, model_params)
+            for name, question in sql_contents.items()}
+
+    manifest = {} if force else load_manifest(output_dir)
+    removed = [name for name in manifest if name not in sql_contents]
+    for file_name in removed:
+        del manifest[file_name]
+        (output_dir / file_name).unlink(missing_ok=True)
+    stale = stale_files(sql_contents, keys, manifest, output_dir)
+    if removed:
+        save_manifest(output_dir, manifest)
 
-    for file_name, sql_content in sql_contents.items():
-        print(f"Processing {file_name}...")
-        llm_output = groq_config.generate_sql(sql_content)
-        append_llm_output(sql_folder, file_name, llm_output)
-        print(f"Output appended to {sql_folder / file_name}")
+    if requests_per_minute or tokens_per_minute:
+        groq_config.scheduler.configure(requests_per_minute, tokens_per_minute)
+    stats = asyncio.run(generate_batch(groq_config, output_dir, {name: sql_contents[name] for name in stale},
+                                       concurrency=concurrency, keys=keys, manifest=manifest))
+    stats.update(skipped=len(sql_contents) - len(stale), removed=len(removed))
+
+    print(f"Generated {stats['files'] - len(stats['failures'])}/{stats['files']} files "
+          f"in {stats['elapsed']:.2f}s ({stats['throughput']:.2f} files/s, "
+          f"{stats['rate_limit_wait']:.2f}s waiting on rate limits); "
+          f"{stats['skipped']} unchanged, {stats['removed']} removed")
+    return stats
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python sql_to_llm.py <schema_name>")
-        sys.exit(1)
-    
-    schema_name = sys.argv[1]
-    main(schema_name)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate SQL for the question files that changed since the last run")
+    parser.add_argument("schema_name")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum requests in flight")
+    parser.add_argument("--rpm", type=float, default=30, help="requests per minute (0 keeps QUERYCRAFT_LLM_RPM)")
+    parser.add_argument("--tpm", type=float, default=0, help="tokens per minute (0 keeps QUERYCRAFT_LLM_TPM)")
+    parser.add_argument("--output-dir", type=Path, help="outputs and manifest (default test_databases/<schema>/llm_sql)")
+    parser.add_argument("--force", action="store_true", help="regenerate every file")
+    args = parser.parse_args()
+
+    main(args.schema_name, concurrency=args.concurrency,
+         requests_per_minute=args.rpm or None, tokens_per_minute=args.tpm or None,
+         output_dir=args.output_dir, force=args.force)
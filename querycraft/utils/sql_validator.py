@@ -0,0 +1,502 @@
+import time
+import difflib
+import threading
+from typing import Optional
+from querycraft.utils.catalog import SchemaCatalog
+from querycraft.utils.sql_lexer import significant_tokens, NON_CALL_KEYWORDS, CLAUSE_KEYWORDS, VOLATILE_FUNCTIONS
+
+# Words that are never column references. Deliberately broad: an unknown
+# keyword that slips through as a "column" would cause a false rejection.
+SQL_KEYWORDS = frozenset({
+    'select', 'from', 'where', 'and', 'or', 'not', 'in', 'is', 'null', 'true', 'false', 'as',
+    'on', 'join', 'inner', 'left', 'right', 'full', 'outer', 'cross', 'natural', 'using',
+    'group', 'by', 'order', 'asc', 'desc', 'nulls', 'first', 'last', 'limit', 'offset',
+    'having', 'distinct', 'case', 'when', 'then', 'else', 'end', 'between', 'like', 'ilike',
+    'similar', 'escape', 'exists', 'any', 'all', 'some', 'union', 'intersect', 'except',
+    'with', 'recursive', 'materialized', 'values', 'interval', 'cast', 'filter', 'over',
+    'partition', 'window', 'rows', 'range', 'groups', 'preceding', 'following', 'unbounded',
+    'current', 'row', 'lateral', 'fetch', 'next', 'only', 'ties', 'collate', 'at', 'zone',
+    'for', 'insert', 'into', 'update', 'set', 'delete', 'returning', 'default', 'conflict',
+    'do', 'nothing', 'array', 'within', 'ordinality', 'both', 'leading', 'trailing',
+    'unknown', 'isnull', 'notnull', 'symmetric', 'asymmetric', 'no', 'others', 'exclude',
+    'share', 'nowait', 'skip', 'locked', 'key', 'of', 'to', 'year', 'month', 'day', 'hour',
+    'minute', 'second', 'epoch', 'dow', 'doy', 'isodow', 'week', 'quarter', 'decade',
+    'century', 'millennium', 'milliseconds', 'microseconds', 'timezone', 'date', 'time',
+    'timestamp', 'timestamptz', 'boolean', 'integer', 'int', 'bigint', 'smallint', 'numeric',
+    'decimal', 'real', 'double', 'precision', 'float', 'text', 'varchar', 'char',
+    'character', 'varying', 'without', 'user', 'session_user', 'current_user',
+    'current_role', 'current_schema', 'current_catalog',
+}) | NON_CALL_KEYWORDS | CLAUSE_KEYWORDS | VOLATILE_FUNCTIONS
+
+SYSTEM_SCHEMAS = {"pg_catalog", "information_schema"}
+VALIDATED_STATEMENTS = {"select", "with", "insert", "update", "delete", "values", "table"}
+
+
+class ValidationIssue:
+    """One reference the catalog cannot resolve"""
+
+    __slots__ = ("kind", "name", "message", "suggestion")
+
+    def __init__(self, kind: str, name: str, message: str, suggestion: Optional[str] = None):
+        self.kind = kind
+        self.name = name
+        self.message = message
+        self.suggestion = suggestion
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "name": self.name, "message": self.message, "suggestion": self.suggestion}
+
+
+class ValidationResult:
+    """Outcome of validating one statement"""
+
+    __slots__ = ("sql", "issues", "elapsed")
+
+    def __init__(self, sql: str, issues: list, elapsed: float):
+        self.sql = sql
+        self.issues = issues
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def feedback(self) -> str:
+        """Issues as a bullet list, suitable for asking the LLM to fix the query"""
+        return "\n".join(f"- {issue.message}" for issue in self.issues)
+
+    def to_dict(self) -> dict:
+        return {"ok": self.ok, "issues": [issue.to_dict() for issue in self.issues], "elapsed": self.elapsed}
+
+
+class _Block:
+    """A parenthesized region (or the whole statement) and the FROM items it declares"""
+
+    __slots__ = ("parent", "kind", "start", "relations", "aliased_tables", "opaque", "has_select",
+                 "in_from", "from_item", "cte_name", "column_list")
+
+    def __init__(self, parent, kind: str, start: int):
+        self.parent = parent
+        self.kind = kind
+        self.start = start
+        # alias -> set of column names, or None when the columns are unknown
+        self.relations = {}
+        # table name -> alias, for tables only reachable through their alias
+        self.aliased_tables = {}
+        self.opaque = False
+        self.has_select = False
+        self.in_from = False
+        self.from_item = None  # "subquery" or "function" for FROM-list parentheses
+        self.cte_name = None
+        self.column_list = False
+
+    def chain(self):
+        block = self
+        while block is not None:
+            yield block
+            block = block.parent
+
+
+def _unquote(token) -> str:
+    if token.kind == 'ident':
+        return token.value[1:-1].replace('""', '"')
+    return token.value.lower()
+
+
+def _suggest(name: str, candidates) -> Optional[str]:
+    matches = difflib.get_close_matches(name, sorted(candidates), n=1, cutoff=0.6)
+    return matches[0] if matches else None
+
+
+class SqlValidator:
+    """Resolves the tables, aliases and columns of a statement against a catalog
+
+    Validation is conservative: only references that are certainly wrong
+    are reported. Columns are only checked against relations whose columns
+    are all known, so queries over set-returning functions, system catalogs
+    or ``SELECT *`` subqueries are checked less strictly rather than being
+    rejected.
+    """
+
+    # Shared counters; callers record the round trips a rejection saved
+    _stats = {"validated": 0, "rejected": 0, "round_trips_saved": 0}
+    _stats_lock = threading.Lock()
+
+    def __init__(self, catalog: SchemaCatalog):
+        """Initialize the validator
+
+        Args:
+            catalog (SchemaCatalog): Tables and views statements may reference
+        """
+        self.catalog = catalog
+        self._columns = {name: frozenset(table.column_names) for name, table in catalog.tables.items()}
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Statements validated and rejected, and round trips saved, by all validators"""
+        with cls._stats_lock:
+            return dict(cls._stats)
+
+    @classmethod
+    def record_round_trip_saved(cls) -> None:
+        """Count a rejected statement that was not sent to the database"""
+        with cls._stats_lock:
+            cls._stats["round_trips_saved"] += 1
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._stats_lock:
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    def validate(self, sql: str) -> ValidationResult:
+        """Check every table, alias and column reference of a statement
+
+        >>> from querycraft.utils.catalog import SchemaCatalog
+        >>> catalog = SchemaCatalog.parse(["CREATE TABLE actor (actor_id int, first_name text);"])
+        >>> SqlValidator(catalog).validate("SELECT a.first_name FROM actor a").ok
+        True
+        >>> print(SqlValidator(catalog).validate("SELECT a.firstname FROM actor a").feedback())
+        - column a.firstname does not exist (did you mean first_name?)
+        """
+        start = time.perf_counter()
+        issues = self._check(sql)
+        result = ValidationResult(sql, issues, time.perf_counter() - start)
+        with self._stats_lock:
+            self._stats["validated"] += 1
+            if issues:
+                self._stats["rejected"] += 1
+        return result
+
+    def _resolve_relation(self, parts: list, ctes: dict, issues: list) -> Optional[frozenset]:
+        """Columns of a FROM item, or None when they cannot be known"""
+        name = parts[-1]
+        schema = parts[-2] if len(parts) > 1 else None
+        if schema in SYSTEM_SCHEMAS or name.startswith("pg_"):
+            return None
+        if schema is None and name in ctes:
+            return ctes[name]
+        table = self.catalog.resolve(name)
+        if table is not None:
+            return self._columns[table.name]
+        suggestion = _suggest(name, self._columns)
+        hint = f" (did you mean {suggestion}?)" if suggestion else ""
+        issues.append(ValidationIssue("unknown_table", name, f"relation {name} does not exist{hint}", suggestion))
+        return None
+
+    @staticmethod
+    def _output_columns(tokens: list) -> Optional[frozenset]:
+        """Output column names of a subquery, or None if it selects *"""
+        depth = 0
+        for j, token in enumerate(tokens):
+            if token.value == '(':
+                depth += 1
+            elif token.value == ')':
+                depth -= 1
+            elif depth == 0 and token.value == '*' and j > 0 and \
+                    (tokens[j - 1].value in (',', '.') or tokens[j - 1].value.lower() in ('select', 'distinct')):
+                return None
+            elif depth == 0 and token.kind == 'word' and token.value.lower() == 'from':
+                break
+        return frozenset(SchemaCatalog._select_list_names(tokens))
+
+    def _check(self, sql: str) -> list:
+        tokens = significant_tokens(sql)
+        while tokens and tokens[-1].value == ';':
+            tokens.pop()
+        if not tokens or tokens[0].kind != 'word' or tokens[0].value.lower() not in VALIDATED_STATEMENTS:
+            return []
+
+        issues = []
+        ctes = {}
+        aliases = set()  # select-list output names, usable in ORDER BY / GROUP BY
+        refs = []  # (block, qualifier or None, column or "*")
+        root = _Block(None, 'group', -1)
+        block = root
+        with_block = None
+        pending_cte = None
+        pending_item = None
+        target_columns = None  # columns of the INSERT/UPDATE/DELETE target
+        n = len(tokens)
+        i = 0
+
+        def read_from_item(j: int, target: bool = False) -> int:
+            """Register the FROM item starting at tokens[j]; returns the next index"""
+            nonlocal pending_item, target_columns
+            while j < n and tokens[j].kind == 'word' and tokens[j].value.lower() in ('lateral', 'only'):
+                j += 1
+            if j >= n:
+                return j
+            if tokens[j].value == '(':
+                pending_item = "subquery"
+                return j
+            if tokens[j].kind not in ('word', 'ident'):
+                return j
+            parts = [_unquote(tokens[j])]
+            j += 1
+            while j + 1 < n and tokens[j].value == '.' and tokens[j + 1].kind in ('word', 'ident'):
+                parts.append(_unquote(tokens[j + 1]))
+                j += 2
+            if j < n and tokens[j].value == '(' and not target:
+                pending_item = "function"
+                return j
+            columns = self._resolve_relation(parts, ctes, issues)
+            if target:
+                target_columns = columns
+            if j < n and tokens[j].kind == 'word' and tokens[j].value.lower() == 'as':
+                j += 1
+            alias = None
+            if j < n and (tokens[j].kind == 'ident' or
+                          (tokens[j].kind == 'word' and tokens[j].value.lower() not in SQL_KEYWORDS)):
+                alias = _unquote(tokens[j])
+                j += 1
+                if j < n and tokens[j].value == '(' and not target:
+                    end = self._matching(tokens, j)
+                    columns = frozenset(_unquote(t) for t in tokens[j + 1:end] if t.kind in ('word', 'ident'))
+                    j = end + 1
+            if alias is not None:
+                block.relations[alias] = columns
+                block.aliased_tables[parts[-1]] = alias
+            else:
+                block.relations[parts[-1]] = columns
+            if target and j < n and tokens[j].value == '(':
+                pending_item = "columns"
+            return j
+
+        while i < n:
+            token = tokens[i]
+            value = token.value
+            word = value.lower() if token.kind == 'word' else None
+            previous = tokens[i - 1] if i > 0 else None
+            prev_word = previous.value.lower() if previous is not None and previous.kind == 'word' else None
+
+            if value == '(':
+                is_call = previous is not None and pending_item is None and (
+                    (previous.kind == 'word' and prev_word not in NON_CALL_KEYWORDS and prev_word not in SQL_KEYWORDS)
+                    or previous.kind == 'ident'
+                )
+                child = _Block(block, 'call' if is_call and pending_item != "function" else 'group', i)
+                if pending_item in ("subquery", "function"):
+                    child.from_item = pending_item
+                elif pending_item == "columns":
+                    child.column_list = True
+                pending_item = None
+                if pending_cte is not None and prev_word in ('as', 'materialized'):
+                    child.cte_name = pending_cte
+                    pending_cte = None
+                block = child
+                i += 1
+                continue
+
+            if value == ')':
+                closing = block
+                block = closing.parent if closing.parent is not None else root
+                i = self._close(closing, block, tokens, i, ctes)
+                continue
+
+            if word == 'with' and (previous is None or previous.value == '('):
+                with_block = block
+            elif with_block is block and word in ('select', 'insert', 'update', 'delete', 'values'):
+                with_block = None
+
+            starts_cte = (value == ',' or (token.kind in ('word', 'ident') and prev_word in ('with', 'recursive')))
+            if with_block is block and starts_cte:
+                j = i + 1 if value == ',' else i
+                if j + 1 < n and tokens[j].kind in ('word', 'ident') and \
+                        (tokens[j + 1].value == '(' or tokens[j + 1].value.lower() == 'as'):
+                    name = _unquote(tokens[j])
+                    # Columns are unknown until the body closes, so recursive
+                    # self-references are checked leniently
+                    ctes[name] = None
+                    pending_cte = name
+                    j += 1
+                    if tokens[j].value == '(':
+                        end = self._matching(tokens, j)
+                        ctes[name] = frozenset(_unquote(t) for t in tokens[j + 1:end] if t.kind in ('word', 'ident'))
+                        j = end + 1
+                    i = j
+                    continue
+
+            if word == 'select':
+                block.has_select = True
+                block.in_from = False
+            elif word in ('from', 'join') and block.kind == 'group' and not (word == 'from' and prev_word == 'delete'):
+                block.in_from = True
+                i = read_from_item(i + 1)
+                continue
+            elif value == ',' and block.in_from:
+                i = read_from_item(i + 1)
+                continue
+            elif word == 'using' and block.kind == 'group' and i + 1 < n and tokens[i + 1].value != '(':
+                # DELETE ... USING takes a FROM list; JOIN ... USING takes a column list
+                block.in_from = True
+                i = read_from_item(i + 1)
+                continue
+            elif word == 'conflict' and prev_word == 'on':
+                # The row proposed for insertion, visible in DO UPDATE
+                block.relations['excluded'] = target_columns
+            elif (word == 'into' and block.kind == 'group') or (word == 'update' and prev_word not in ('for', 'no', 'key', 'do')) or \
+                    (word == 'from' and prev_word == 'delete'):
+                i = read_from_item(i + 1, target=True)
+                continue
+            elif word in CLAUSE_KEYWORDS and word not in ('join', 'inner', 'left', 'right', 'full', 'cross',
+                                                          'natural', 'on', 'using', 'select'):
+                block.in_from = False
+
+            if token.kind in ('word', 'ident'):
+                i = self._reference(tokens, i, block, refs, aliases)
+                continue
+            i += 1
+
+        for ref_block, qualifier, column in refs:
+            self._resolve_reference(ref_block, qualifier, column, aliases, issues)
+        return issues
+
+    @staticmethod
+    def _matching(tokens: list, i: int) -> int:
+        depth = 0
+        for j in range(i, len(tokens)):
+            if tokens[j].value == '(':
+                depth += 1
+            elif tokens[j].value == ')':
+                depth -= 1
+                if depth == 0:
+                    return j
+        return len(tokens) - 1
+
+    def _close(self, closing: _Block, parent: _Block, tokens: list, i: int, ctes: dict) -> int:
+        """Finish a parenthesized block; returns the index after it (and any alias)"""
+        n = len(tokens)
+        j = i + 1
+        if closing.cte_name is not None:
+            if ctes.get(closing.cte_name) is None:
+                ctes[closing.cte_name] = self._output_columns(tokens[closing.start + 1:i]) \
+                    if closing.has_select else None
+            return j
+
+        if closing.from_item is not None and (closing.has_select or closing.from_item == "function"):
+            columns = self._output_columns(tokens[closing.start + 1:i]) if closing.has_select else None
+            if closing.from_item == "function":
+                parent.opaque = True
+                if j + 1 < n and tokens[j].value.lower() == 'with' and tokens[j + 1].value.lower() == 'ordinality':
+                    j += 2
+            if j < n and tokens[j].kind == 'word' and tokens[j].value.lower() == 'as':
+                j += 1
+            if j < n and (tokens[j].kind == 'ident' or
+                          (tokens[j].kind == 'word' and tokens[j].value.lower() not in SQL_KEYWORDS)):
+                alias = _unquote(tokens[j])
+                j += 1
+                if j < n and tokens[j].value == '(':
+                    end = self._matching(tokens, j)
+                    columns = frozenset(_unquote(t) for t in tokens[j + 1:end] if t.kind in ('word', 'ident'))
+                    j = end + 1
+                parent.relations[alias] = columns
+            return j
+
+        if not closing.has_select:
+            # Parenthesized joins and expressions: their FROM items belong to the enclosing query
+            parent.relations.update(closing.relations)
+            parent.aliased_tables.update(closing.aliased_tables)
+            parent.opaque = parent.opaque or closing.opaque
+        return j
+
+    @staticmethod
+    def _reference(tokens: list, i: int, block: _Block, refs: list, aliases: set) -> int:
+        """Record the column reference (if any) at tokens[i]; returns the next index"""
+        n = len(tokens)
+        token = tokens[i]
+        previous = tokens[i - 1] if i > 0 else None
+        prev_value = previous.value.lower() if previous is not None else None
+
+        if prev_value in ('::', 'over', 'window'):
+            # Type names (possibly qualified) and window names
+            j = i + 1
+            while j + 1 < n and tokens[j].value == '.' and tokens[j + 1].kind in ('word', 'ident'):
+                j += 2
+            return j
+
+        if i + 1 < n and tokens[i + 1].value == '.':
+            parts = [token]
+            j = i
+            while j + 2 < n and tokens[j + 1].value == '.' and \
+                    (tokens[j + 2].kind in ('word', 'ident') or tokens[j + 2].value == '*'):
+                parts.append(tokens[j + 2])
+                j += 2
+            if j + 1 < n and tokens[j + 1].value == '(':
+                return j + 1  # schema-qualified function call
+            if len(parts) >= 2:
+                column = '*' if parts[-1].value == '*' else _unquote(parts[-1])
+                refs.append((block, _unquote(parts[-2]), column))
+            return j + 1
+
+        if token.kind == 'word' and token.value.lower() in SQL_KEYWORDS:
+            return i + 1
+        if i + 1 < n and tokens[i + 1].value == '(':
+            return i + 1  # function call
+        if block.column_list:
+            refs.append((block, None, _unquote(token)))
+            return i + 1
+        if prev_value == 'as':
+            aliases.add(_unquote(token))
+            return i + 1
+        if previous is not None and (
+                previous.kind in ('ident', 'number', 'string') or previous.value in (')', ']')
+                or (previous.kind == 'word' and (prev_value not in SQL_KEYWORDS or prev_value == 'end'))):
+            # Implicit alias: "SELECT count(*) total", "CASE ... END notes"
+            aliases.add(_unquote(token))
+            return i + 1
+        refs.append((block, None, _unquote(token)))
+        return i + 1
+
+    def _resolve_reference(self, block: _Block, qualifier: Optional[str], column: str,
+                           aliases: set, issues: list) -> None:
+        if qualifier is not None:
+            for scope in block.chain():
+                if qualifier in scope.relations:
+                    columns = scope.relations[qualifier]
+                    if columns is None or column == '*' or column in columns:
+                        return
+                    suggestion = _suggest(column, columns)
+                    hint = f" (did you mean {suggestion}?)" if suggestion else ""
+                    issues.append(ValidationIssue(
+                        "unknown_column", f"{qualifier}.{column}",
+                        f"column {qualifier}.{column} does not exist{hint}", suggestion
+                    ))
+                    return
+            for scope in block.chain():
+                if qualifier in scope.aliased_tables:
+                    alias = scope.aliased_tables[qualifier]
+                    issues.append(ValidationIssue(
+                        "unknown_alias", qualifier,
+                        f"table {qualifier} is aliased as {alias}; refer to it as {alias}", alias
+                    ))
+                    return
+            visible = {name for scope in block.chain() for name in scope.relations}
+            if not visible:
+                return
+            suggestion = _suggest(qualifier, visible)
+            hint = f" (did you mean {suggestion}?)" if suggestion else ""
+            issues.append(ValidationIssue(
+                "unknown_alias", qualifier, f"missing FROM-clause entry for {qualifier}{hint}", suggestion
+            ))
+            return
+
+        candidates = set()
+        any_relation = False
+        for scope in block.chain():
+            if column in scope.relations:
+                return  # a whole-row reference such as json_agg(f)
+            if scope.opaque:
+                return
+            for columns in scope.relations.values():
+                if columns is None:
+                    return
+                any_relation = True
+                if column in columns:
+                    return
+                candidates |= columns
+        if not any_relation or column in aliases:
+            return
+        suggestion = _suggest(column, candidates)
+        hint = f" (did you mean {suggestion}?)" if suggestion else ""
+        issues.append(ValidationIssue("unknown_column", column, f"column {column} does not exist{hint}", suggestion))
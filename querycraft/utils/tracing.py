@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import bisect
+import tempfile
+import threading
+import contextvars
+from typing import Optional
+
+# Upper bounds of histogram buckets (Prometheus "le" labels)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+
+# Span attributes that are aggregated into per-stage histograms
+HISTOGRAM_ATTRIBUTES = ("prompt_tokens", "completion_tokens", "retries", "rows")
+
+_current_span = contextvars.ContextVar("querycraft_current_span", default=None)
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds"""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list:
+        """(upper bound, cumulative count) pairs ending with +Inf
+
+        >>> h = Histogram((1, 5))
+        >>> for v in (0.5, 3, 3, 9): h.observe(v)
+        >>> h.cumulative()
+        [('1', 1), ('5', 3), ('+Inf', 4)]
+        """
+        pairs = []
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return pairs
+
+
+class MetricsRegistry:
+    """Thread-safe set of histograms keyed by metric name and labels"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, bounds: tuple = DURATION_BUCKETS, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(bounds)
+            histogram.observe(value)
+
+    def snapshot(self) -> list:
+        """List of dicts describing every histogram"""
+        with self._lock:
+            return [
+                {"name": name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                 "buckets": h.cumulative()}
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+
+    def to_prometheus(self) -> str:
+        """Render all histograms in the Prometheus text exposition format"""
+        lines = []
+        seen = set()
+        for metric in self.snapshot():
+            name = metric["name"]
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            labels = ",".join(f'{k}="{v}"' for k, v in sorted(metric["labels"].items()))
+            sep = "," if labels else ""
+            for bound, count in metric["buckets"]:
+                lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {metric['sum']:g}")
+            lines.append(f"{name}_count{{{labels}}} {metric['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_prometheus(self, path) -> None:
+        """Write the Prometheus text format to a file (e.g. for node_exporter's textfile collector)"""
+        directory, name = os.path.split(os.path.abspath(path))
+        # A unique temporary file, so concurrent exports cannot move each other's file away
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def write_jsonl(self, path) -> None:
+        """Append one JSON line per histogram, stamped with the current time"""
+        timestamp = time.time()
+        with open(path, 'a') as f:
+            for metric in self.snapshot():
+                f.write(json.dumps(dict(metric, timestamp=timestamp)) + "\n")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+class Span:
+    """A timed pipeline stage with attributes and child stages"""
+
+    __slots__ = ("name", "attributes", "start", "duration", "children")
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+        self.start = 0.0
+        self.duration = None
+        self.children = []
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> dict:
+        span = {"name": self.name, "duration": self.duration}
+        span.update(self.attributes)
+        if self.children:
+            span["children"] = [child.to_dict() for child in self.children]
+        return span
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled; every operation does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    """Context manager that times a span and links it to its parent"""
+
+    __slots__ = ("tracer", "span", "parent", "token")
+
+    def __init__(self, tracer, name: str, attributes: dict):
+        self.tracer = tracer
+        self.span = Span(name, attributes)
+
+    def __enter__(self) -> Span:
+        self.parent = _current_span.get()
+        if self.parent is not None:
+            self.parent.children.append(self.span)
+        self.token = _current_span.set(self.span)
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.duration = time.perf_counter() - span.start
+        _current_span.reset(self.token)
+        if exc_type is not None:
+            span.attributes["error"] = exc_type.__name__
+        self.tracer._finish(span, self.parent is None)
+        return False
+
+
+class Tracer:
+    """Creates spans for the query pipeline and aggregates them into metrics
+
+    While disabled, ``span()`` returns a shared no-op object, so instrumented
+    code pays one attribute check per stage.
+    """
+
+    def __init__(self, enabled: bool = False, trace_path: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """Initialize the tracer
+
+        Args:
+            enabled (bool): Record spans and metrics
+            trace_path (str, optional): Append every finished top-level trace
+                to this file as a JSON line
+            metrics (MetricsRegistry, optional): Registry for stage histograms
+        """
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.metrics = metrics or MetricsRegistry()
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Tracer configured by QUERYCRAFT_TRACING and QUERYCRAFT_TRACE_FILE"""
+        enabled = os.getenv("QUERYCRAFT_TRACING", "").lower() in ("1", "true", "yes")
+        return cls(enabled=enabled, trace_path=os.getenv("QUERYCRAFT_TRACE_FILE") or None)
+
+    def enable(self, trace_path: Optional[str] = None) -> None:
+        self.enabled = True
+        if trace_path is not None:
+            self.trace_path = trace_path
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, **attributes):
+        """Context manager timing one stage, nested under the current span
+
+        >>> t = Tracer(enabled=True)
+        >>> with t.span("query") as root:
+        ...     with t.span("generate") as span:
+        ...         span.set(prompt_tokens=120)
+        >>> [child.name for child in root.children], root.children[0].attributes
+        (['generate'], {'prompt_tokens': 120})
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return _ActiveSpan(self, name, attributes)
+
+    @staticmethod
+    def current_span():
+        """The innermost open span, or a no-op span outside any trace"""
+        span = _current_span.get()
+        return span if span is not None else NOOP_SPAN
+
+    def _finish(self, span: Span, is_root: bool) -> None:
+        self.metrics.observe("querycraft_stage_duration_seconds", span.duration, stage=span.name)
+        for attribute in HISTOGRAM_ATTRIBUTES:
+            value = span.attributes.get(attribute)
+            if isinstance(value, (int, float)):
+                self.metrics.observe(f"querycraft_stage_{attribute}", value, COUNT_BUCKETS, stage=span.name)
+        if is_root and self.trace_path:
+            line = json.dumps(dict(span.to_dict(), timestamp=time.time()))
+            with self._write_lock:
+                with open(self.trace_path, 'a') as f:
+                    f.write(line + "\n")
+
+
+# Process-wide tracer used by the pipeline
+tracer = Tracer.from_env()
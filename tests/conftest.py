@@ -0,0 +1,9 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep every on-disk cache (query cache, catalogs, examples, replay
+    fixtures) out of the user cache directory and fresh for each test"""
+    cache_dir = tmp_path / "querycraft_cache"
+    monkeypatch.setenv("QUERYCRAFT_CACHE_DIR", str(cache_dir))
+    return cache_dir
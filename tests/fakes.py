@@ -0,0 +1,41 @@
+"""Test doubles shared between test modules"""
+import itertools
+import threading
+from collections import OrderedDict, namedtuple
+from querycraft.backends.base import LLMBackend, Completion
+from querycraft.utils.pg_engine import PostgresPool
+
+# What psycopg2 cursors report per column in ``description``
+Column = namedtuple("Column", ["name", "type_code"])
+
+class ScriptedBackend(LLMBackend):
+    """Answers each request with the next scripted response and records the requests"""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def complete(self, messages, model, temperature, max_tokens, seed=None):
+        self.requests.append(messages)
+        return Completion(self.responses.pop(0), 900, 12)
+
+    def stream(self, messages, model, temperature, max_tokens):
+        yield self.complete(messages, model, temperature, max_tokens).content
+
+def fake_pool(conn, max_prepared=2):
+    """A PostgresPool handing out one fake connection, without connecting
+
+    Returns:
+        tuple: (pool, list the pool appends returned connections to)
+    """
+    pool = object.__new__(PostgresPool)
+    returned = []
+    pool.max_prepared = max_prepared
+    pool.getconn = lambda: conn
+    pool.putconn = lambda c, close=False: returned.append(c)
+    pool._set_statement_timeout = lambda c, timeout_ms: None
+    pool._cursor_ids = itertools.count()
+    pool._lock = threading.Lock()
+    pool._prepared = {}
+    pool._unpreparable = OrderedDict()
+    pool.prepared_stats = {"prepared": 0, "reused": 0, "evicted": 0, "fallbacks": 0, "reprepared": 0}
+    return pool, returned
@@ -0,0 +1,113 @@
+import json
+import threading
+import pytest
+from querycraft.utils import batch
+from querycraft.utils.batch import run_batch, completed_ids
+from querycraft.utils.query_cache import QueryCache
+
+class EchoConnector:
+    """Answers every question with SQL naming it; fails on "fail" """
+
+    def __init__(self, schema_name):
+        self.schema_name = schema_name
+        self.questions = []
+
+    def execute_natural_query(self, question, bypass_cache=False, row_limit=None):
+        self.questions.append(question)
+        if question == "fail":
+            raise Exception("Error generating SQL: boom")
+        return {"sql_query": f"SELECT '{question}';", "result": question, "cache_hit": False}
+
+LINES = [
+    '{"question": "one", "schema": "fruitmart"}\n',
+    '"two"\n',
+    '\n',
+    '{"id": "q3", "question": "fail", "schema": "pagila"}\n',
+    'not json\n',
+]
+
+def test_results_are_streamed_with_errors_recorded():
+    connectors = {}
+    results = []
+
+    def connector_for(schema_name):
+        connectors[schema_name] = EchoConnector(schema_name)
+        return connectors[schema_name]
+
+    stats = run_batch(LINES, connector_for, results.append, workers=2, default_schema="fruitmart")
+
+    by_id = {result["id"]: result for result in results}
+    assert by_id["1"]["sql_query"] == "SELECT 'one';" and by_id["1"]["error"] is None
+    assert by_id["2"]["schema"] == "fruitmart" and by_id["2"]["result"] == "two"
+    assert by_id["q3"]["error"] == "Error generating SQL: boom"
+    assert by_id["5"]["error"].startswith("Invalid record")
+    assert sorted(connectors) == ["fruitmart", "pagila"]
+    assert stats["answered"] == 2 and stats["errors"] == 2 and stats["skipped"] == 0
+
+def test_many_questions_with_bounded_parallelism():
+    results = []
+    lines = [json.dumps(f"q{i}") + "\n" for i in range(50)]
+    stats = run_batch(iter(lines), EchoConnector, results.append, workers=3, default_schema="fruitmart")
+    assert stats["answered"] == 50
+    assert sorted(int(result["id"]) for result in results) == list(range(1, 51))
+
+def test_results_are_written_while_input_is_still_being_read():
+    fast_written = threading.Event()
+    released = []
+
+    def lines():
+        yield '"slow"\n'
+        yield '"fast"\n'
+        # Input stalls (e.g. a pipe) until the finished question is written
+        released.append(fast_written.wait(timeout=5))
+
+    class SlowConnector(EchoConnector):
+        def execute_natural_query(self, question, bypass_cache=False, row_limit=None):
+            if question == "slow":
+                fast_written.wait(timeout=5)
+            return super().execute_natural_query(question, bypass_cache, row_limit)
+
+    results = []
+
+    def write(result):
+        results.append(result["question"])
+        if result["question"] == "fast":
+            fast_written.set()
+
+    run_batch(lines(), SlowConnector, write, workers=2, default_schema="fruitmart")
+    assert released == [True] and results == ["fast", "slow"]
+
+def test_write_failures_are_raised():
+    def write(result):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        run_batch(['"one"\n'], EchoConnector, write, workers=1, default_schema="fruitmart")
+
+def test_resume_skips_answered_questions(tmp_path, monkeypatch):
+    questions = tmp_path / "questions.jsonl"
+    questions.write_text("".join(LINES))
+    output = tmp_path / "results.jsonl"
+    # An interrupted run: question 1 answered, q3 failed, a half-written line
+    output.write_text(
+        json.dumps({"id": "1", "error": None}) + "\n"
+        + json.dumps({"id": "q3", "error": "boom"}) + "\n"
+        + '{"id": "2", "sql'
+    )
+    assert completed_ids(output) == {"1"}
+
+    asked = []
+    monkeypatch.setattr(batch, "DatabaseConnector", lambda schema_name, query_cache: asked.append(schema_name) or EchoConnector(schema_name))
+    monkeypatch.setattr(batch, "QueryCache", lambda: QueryCache(tmp_path / "cache.sqlite3"))
+    code = batch.main([str(questions), "--output", str(output), "--resume", "--schema", "fruitmart"])
+
+    assert code == 1
+    lines = output.read_text().splitlines()
+    assert lines[2] == '{"id": "2", "sql'
+    new = [json.loads(line) for line in lines[3:]]
+    assert sorted(record["id"] for record in new) == ["2", "5", "q3"]
+    assert completed_ids(output) == {"1", "2"}
+
+def test_resume_needs_output():
+    with pytest.raises(SystemExit):
+        batch.main(["--resume"])
@@ -0,0 +1,51 @@
+import httpx
+import pytest
+from benchmarks.mock_llm_server import MockLLMServer
+from benchmarks.load_generator import GenerationOnlyConnector, generate_load
+from benchmarks.report import summarize_run, compare
+from querycraft.backends.base import TransientLLMError
+from querycraft.backends.openai_backend import OpenAICompatibleBackend
+
+QUESTION = "Count the total number of G rated films."
+MESSAGES = [{"role": "system", "content": "schema"}, {"role": "user", "content": QUESTION}]
+
+@pytest.fixture
+def server():
+    with MockLLMServer.for_schema("pagila") as server:
+        yield server
+
+def test_mock_server_answers_example_questions(server):
+    backend = OpenAICompatibleBackend(base_url=server.base_url)
+
+    completion = backend.complete(MESSAGES, "mock", 0.0, 100)
+    streamed = "".join(backend.stream(MESSAGES, "mock", 0.0, 100))
+
+    assert completion.content == "SELECT COUNT(*) FROM film WHERE rating = 'G';"
+    assert completion.prompt_tokens > 0 and completion.completion_tokens == 12
+    assert streamed.strip() == completion.content
+    assert server.stats == {"requests": 2, "errors": 0, "streams": 1}
+
+def test_mock_server_injects_errors():
+    with MockLLMServer(errors="500:1") as failing:
+        with pytest.raises(TransientLLMError, match="Server error 500"):
+            OpenAICompatibleBackend(base_url=failing.base_url).complete(MESSAGES, "mock", 0.0, 100)
+    with MockLLMServer(errors="429:1", retry_after=2.5) as limited:
+        response = httpx.post(f"{limited.base_url}/chat/completions", json={"messages": MESSAGES})
+        assert response.status_code == 429 and response.headers["Retry-After"] == "2.5"
+
+def test_load_run_is_summarized_and_compared(server, monkeypatch):
+    monkeypatch.setenv("QUERYCRAFT_LLM_BACKEND", "openai")
+    monkeypatch.setenv("QUERYCRAFT_OPENAI_BASE_URL", server.base_url)
+
+    samples, elapsed = generate_load(
+        lambda session: GenerationOnlyConnector(schema_name="pagila", use_query_cache=False),
+        list(server.answers), sessions=3, queries=2,
+    )
+    report = summarize_run(samples, elapsed)
+
+    assert report["queries"] == 6 and report["errors"] == 0
+    assert server.stats["requests"] == 6
+    assert compare(report, report) == []
+    slower = dict(report, latency=dict(report["latency"], p95=report["latency"]["p95"] * 2))
+    assert compare(slower, report) == [
+        f"latency.p95 {slower['latency']['p95']:.4g} is 100% worse than baseline {report['latency']['p95']:.4g}"]
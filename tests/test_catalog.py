@@ -0,0 +1,148 @@
+import pytest
+import threading
+from querycraft.utils.catalog import SchemaCatalog, iter_statements
+
+PG_DUMP = r"""
+--
+-- PostgreSQL database dump
+--
+SET statement_timeout = 0;
+
+CREATE TYPE public.mpaa_rating AS ENUM (
+    'G',
+    'PG-13',
+    'NC-17'
+);
+
+CREATE DOMAIN public.year AS integer
+	CONSTRAINT year_check CHECK (((VALUE >= 1901) AND (VALUE <= 2155)));
+
+CREATE FUNCTION public.last_day(timestamp with time zone) RETURNS date
+    LANGUAGE sql IMMUTABLE STRICT
+    AS $_$
+  SELECT CASE WHEN EXTRACT(MONTH FROM $1) = 12 THEN 1; END;
+$_$;
+
+CREATE TABLE public.language (
+    language_id integer NOT NULL,
+    name character(20) NOT NULL
+);
+
+CREATE TABLE public.film (
+    film_id integer NOT NULL,
+    "Title" text NOT NULL,
+    release_year public.year,
+    language_id integer NOT NULL,
+    rating public.mpaa_rating DEFAULT 'G'::public.mpaa_rating,
+    note text DEFAULT 'a;b' NOT NULL
+);
+
+CREATE TABLE public.payment (
+    payment_id integer NOT NULL,
+    payment_date timestamp with time zone NOT NULL
+)
+PARTITION BY RANGE (payment_date);
+
+CREATE TABLE public.payment_2022_01 (
+    payment_id integer NOT NULL,
+    payment_date timestamp with time zone NOT NULL
+);
+
+ALTER TABLE ONLY public.payment ATTACH PARTITION public.payment_2022_01 FOR VALUES FROM ('2022-01-01') TO ('2022-02-01');
+
+COPY public.language (language_id, name) FROM stdin;
+1	English;
+2	CREATE TABLE nope (x int);
+\.
+
+ALTER TABLE ONLY public.film
+    ADD CONSTRAINT film_pkey PRIMARY KEY (film_id);
+
+ALTER TABLE ONLY public.film
+    ADD CONSTRAINT film_language_id_fkey FOREIGN KEY (language_id) REFERENCES public.language(language_id) ON UPDATE CASCADE;
+
+COMMENT ON COLUMN public.film.release_year IS 'Year the film came out';
+
+CREATE VIEW public.film_list AS
+ SELECT film.film_id AS fid,
+    film."Title",
+    count(*) AS copies
+   FROM (public.film
+     JOIN public.language ON ((film.language_id = language.language_id)))
+  GROUP BY film.film_id;
+"""
+
+def test_parses_pg_dump_features():
+    catalog = SchemaCatalog.parse(PG_DUMP.splitlines(keepends=True))
+
+    assert [t.name for t in catalog.relations()] == ["language", "film", "payment", "film_list"]
+    assert "nope" not in catalog.tables
+
+    film = catalog.get("film")
+    assert film.column_names == ["film_id", "Title", "release_year", "language_id", "rating", "note"]
+    assert film.primary_key == ("film_id",)
+    assert [(fk.columns, fk.ref_table, fk.ref_columns) for fk in film.foreign_keys] == \
+        [(("language_id",), "language", ("language_id",))]
+    assert film.column("release_year").type == "public.year"
+    assert film.column("release_year").comment == "Year the film came out"
+    assert film.column("note").default == "'a;b'" and not film.column("note").nullable
+
+    assert catalog.get("payment_2022_01").partition_of == "payment"
+    assert catalog.resolve("payment_2022_01").name == "payment"
+    assert catalog.get("payment").partition_key == "RANGE(payment_date)"
+
+    view = catalog.get("film_list")
+    assert view.kind == "view"
+    assert view.column_names == ["fid", "Title", "copies"]
+    assert view.references == {"film", "language"}
+
+    assert catalog.types["mpaa_rating"].labels == ("G", "PG-13", "NC-17")
+    assert catalog.types["year"].base_type == "integer"
+
+def test_statements_are_streamed():
+    lines = iter(PG_DUMP.splitlines(keepends=True))
+    statements = iter_statements(lines)
+    assert next(statements).endswith("SET statement_timeout = 0;")
+    # Only the first statement's lines have been consumed
+    assert next(lines) == "\n"
+    assert next(lines).startswith("CREATE TYPE")
+
+def test_artifact_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    sql_path = tmp_path / "schema.sql"
+    sql_path.write_text(PG_DUMP)
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+
+    first = SchemaCatalog.load(sql_path, artifacts)
+    assert len(list(artifacts.glob("*.json"))) == 1
+
+    def fail(path):
+        raise AssertionError("catalog should come from the artifact")
+    monkeypatch.setattr(SchemaCatalog, "from_file", classmethod(lambda cls, path: fail(path)))
+    cached = SchemaCatalog.load(sql_path, artifacts)
+    assert cached.get("film").to_dict() == first.get("film").to_dict()
+
+    monkeypatch.undo()
+    sql_path.write_text(PG_DUMP + "\nCREATE TABLE public.extra (id int);\n")
+    assert "extra" in SchemaCatalog.load(sql_path, artifacts).tables
+
+def test_concurrent_saves_do_not_collide(tmp_path):
+    catalog = SchemaCatalog.parse(PG_DUMP.splitlines(keepends=True))
+    path = tmp_path / "catalog.json"
+    errors = []
+
+    def save():
+        try:
+            for _ in range(20):
+                catalog.save(path, source_sha256="x")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert SchemaCatalog._read_artifact(path)["source_sha256"] == "x"
+    assert [p.name for p in tmp_path.iterdir()] == ["catalog.json"]
@@ -0,0 +1,73 @@
+import json
+from querycraft.utils.evaluate import evaluate, load_suite, parse_psql_output
+from querycraft.utils.tracing import tracer
+
+EXPECTED = """ title            | rental_rate
+------------------+-------------
+ ACADEMY DINOSAUR | 0.99
+ ACE GOLDFINGER   | 4.99
+(2 rows)
+
+"""
+
+class AnsweringConnector:
+    """Answers questions from a dict and records a trace like the real pipeline"""
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    def execute_natural_query(self, question, bypass_cache=False):
+        with tracer.span("natural_query") as trace:
+            with tracer.span("generate") as span:
+                span.set(prompt_tokens=900, completion_tokens=12)
+            with tracer.span("execute"):
+                result = self.answers[question]
+        if isinstance(result, Exception):
+            raise result
+        return {"question": question, "sql_query": "SELECT ...", "result": result, "trace": trace.to_dict()}
+
+def write_suite(root, name, questions):
+    (root / name / "sql").mkdir(parents=True)
+    (root / name / "expected").mkdir()
+    for stem, (question, expected) in questions.items():
+        (root / name / "sql" / f"{stem}.sql").write_text(
+            f"/* {question} */\n\n-- LLM Generated SQL\nSELECT 1;")
+        (root / name / "expected" / f"{stem}.out").write_text(expected)
+
+def test_load_suite_strips_generated_sql(tmp_path):
+    write_suite(tmp_path, "pagila-hw", {"01": ("List two films", EXPECTED)})
+    (tmp_path / "pagila-hw" / "sql" / "02.sql").write_text("/* no expected output */")
+
+    [case] = load_suite(tmp_path / "pagila-hw")
+
+    assert (case.suite, case.name, case.question) == ("pagila-hw", "01", "/* List two films */")
+    assert case.expected_rows == [("ACADEMY DINOSAUR", "0.99"), ("ACE GOLDFINGER", "4.99")]
+
+def test_rows_are_compared_as_multisets(tmp_path):
+    write_suite(tmp_path, "pagila-hw", {
+        "01": ("reordered", EXPECTED),
+        "02": ("duplicated", EXPECTED),
+        "03": ("failing", " n\n---\n 1\n(1 row)\n"),
+    })
+    write_suite(tmp_path, "pagila-hw2", {"01": ("empty", " n\n---\n(0 rows)\n")})
+    cases = load_suite(tmp_path / "pagila-hw") + load_suite(tmp_path / "pagila-hw2")
+    answers = {
+        "/* reordered */": "ACE GOLDFINGER|4.99\nACADEMY DINOSAUR|0.99",
+        "/* duplicated */": "ACE GOLDFINGER|4.99\nACADEMY DINOSAUR|0.99\nACE GOLDFINGER|4.99",
+        "/* failing */": Exception("SQL execution failed: syntax error"),
+        "/* empty */": "No results found",
+    }
+
+    report = evaluate(cases, lambda suite: AnsweringConnector(answers), workers=3)
+
+    assert [(r["suite"], r["name"], r["passed"]) for r in report["cases"]] == [
+        ("pagila-hw", "01", True), ("pagila-hw", "02", False),
+        ("pagila-hw", "03", False), ("pagila-hw2", "01", True)]
+    assert report["cases"][2]["error"] == "SQL execution failed: syntax error"
+    assert report["suites"]["pagila-hw"] == {"passed": 1, "total": 3, "accuracy": 1 / 3}
+    assert report["latency"]["generate"]["count"] == 3
+    assert report["tokens"] == {"prompt": 2700, "completion": 36}
+    json.dumps(report)
+
+def test_no_results_is_an_empty_result():
+    assert parse_psql_output("No results found") == []
@@ -0,0 +1,68 @@
+import threading
+from querycraft.utils.example_selector import ExampleSelector
+
+EXAMPLES = [
+    {"question": "How many total items are in basket A?", "sql": "SELECT count(*) FROM basket_a;"},
+    {"question": "Show fruits that appear more than once in basket A", "sql": "SELECT fruit_a FROM basket_a GROUP BY fruit_a HAVING count(*) > 1;"},
+    {"question": "Compute the total revenue for each film.", "sql": "SELECT f.title, SUM(p.amount) FROM film f JOIN payment p USING (film_id) GROUP BY f.title;"},
+    {"question": "Count the total number of G rated films.", "sql": "SELECT COUNT(*) FROM film WHERE rating = 'G';"},
+]
+
+def test_selects_most_similar_examples():
+    selector = ExampleSelector(EXAMPLES)
+    selected = selector.select("What is the revenue of every film?", k=1)
+    assert selected == [EXAMPLES[2]]
+
+    assert len(selector.select("fruits in basket A", k=2)) == 2
+    assert selector.select("anything", k=0) == []
+
+def test_token_budget_is_enforced():
+    selector = ExampleSelector(EXAMPLES)
+    assert selector.select("How many films are rated G?", k=4, token_budget=1) == []
+    assert len(selector.select("How many films are rated G?", k=4, token_budget=40)) >= 1
+
+def test_index_is_persisted_and_updated_incrementally(tmp_path):
+    index_path = tmp_path / "examples.npz"
+    first = ExampleSelector(EXAMPLES[:3], index_path=index_path)
+    assert first.vectorized == 3
+    assert index_path.exists()
+
+    second = ExampleSelector(EXAMPLES, index_path=index_path)
+    assert second.vectorized == 1
+    assert second.select("Count the G rated films", k=1) == [EXAMPLES[3]]
+
+def test_selection_only_featurizes_the_question(monkeypatch):
+    library = [{"question": f"Question number {i} about table_{i % 37} and column_{i % 11}",
+                "sql": f"SELECT * FROM table_{i % 37};"} for i in range(500)]
+    selector = ExampleSelector(library)
+    assert selector.vectorized == 500
+
+    featurized = []
+    features = selector._features
+    monkeypatch.setattr(selector, "_features", lambda text: featurized.append(text) or features(text))
+    monkeypatch.setattr(selector, "_build", lambda counts: (_ for _ in ()).throw(AssertionError("rebuilt")))
+    for _ in range(100):
+        selected = selector.select("Which rows of table_3 have column_7 set?", k=5)
+    assert len(featurized) == 100
+    assert [example["question"] for example in selected[:2]] == [
+        "Question number 40 about table_3 and column_7", "Question number 447 about table_3 and column_7"]
+
+def test_concurrent_index_saves_do_not_collide(tmp_path):
+    index_path = tmp_path / "examples.npz"
+    errors = []
+
+    def build():
+        try:
+            for _ in range(10):
+                ExampleSelector(EXAMPLES, index_path=index_path)._save_counts()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=build) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [p.name for p in tmp_path.iterdir()] == ["examples.npz"]
+    assert ExampleSelector(EXAMPLES, index_path=index_path).vectorized == 0
@@ -0,0 +1,124 @@
+import psycopg2
+import pytest
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.execution_policy import ExecutionPolicy, apply_row_limit
+from querycraft.utils.result_set import ResultSet
+from querycraft.utils.schema_loader import SchemaLoader
+
+def plan(cost, rows):
+    return [{"Plan": {"Node Type": "Nested Loop", "Total Cost": cost, "Plan Rows": rows}}]
+
+class PolicyPool:
+    """Answers EXPLAIN with a fixed plan and queries with numbered rows"""
+
+    def __init__(self, cost=10.0, estimated_rows=5, rows=5, timeout=False):
+        self.cost = cost
+        self.estimated_rows = estimated_rows
+        self.rows = rows
+        self.timeout = timeout
+        self.calls = []
+
+    def execute(self, sql_query, params=None, statement_timeout_ms=None):
+        self.calls.append((sql_query, statement_timeout_ms))
+        return ["QUERY PLAN"], [(plan(self.cost, self.estimated_rows),)]
+
+    def stream(self, sql_query, params=None, batch_size=1000, statement_timeout_ms=None, prepare=False):
+        self.calls.append((sql_query, statement_timeout_ms))
+        if self.timeout:
+            raise psycopg2.extensions.QueryCanceledError("canceling statement due to statement timeout")
+        return ResultSet.from_rows(["n"], [(i,) for i in range(self.rows)])
+
+@pytest.fixture
+def connect(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+
+    def connect(pool, **policy):
+        db = DatabaseConnector(schema_name="fruitmart", use_query_cache=False,
+                               execution_policy=ExecutionPolicy(**policy))
+        monkeypatch.setattr(db, "_get_pool", lambda: pool)
+        return db
+    return connect
+
+def test_expensive_query_is_rejected_before_execution(connect):
+    pool = PolicyPool(cost=3.2e6, estimated_rows=257_000_000)
+    db = connect(pool, max_cost=1e6, max_estimated_rows=1_000_000, statement_timeout_ms=5000)
+
+    with pytest.raises(Exception, match="estimated cost 3200000 exceeds max_cost 1e"):
+        db.execute_sql("SELECT * FROM basket_a, basket_b")
+
+    assert [call[0] for call in pool.calls] == ["EXPLAIN (FORMAT JSON) SELECT * FROM basket_a, basket_b"]
+    stats = db.execution_policy.snapshot()
+    assert stats["rejected"] == 1
+    assert stats["gates"] == {"max_cost": 1, "max_estimated_rows": 1, "statement_timeout": 0, "row_limit": 0}
+
+def test_warn_mode_executes_over_budget_queries(connect):
+    pool = PolicyPool(cost=3.2e6)
+    db = connect(pool, max_cost=1e6, on_exceed="warn", statement_timeout_ms=5000)
+
+    assert db.execute_sql("SELECT id FROM basket_a") == "0\n1\n2\n3\n4"
+    assert pool.calls[-1] == ("SELECT id FROM basket_a", 5000)
+    assert db.execution_policy.snapshot()["gates"]["max_cost"] == 1
+
+def test_no_explain_without_cost_gates(connect):
+    pool = PolicyPool()
+    db = connect(pool)
+    db.execute_sql("SELECT id FROM basket_a")
+    assert [call[0] for call in pool.calls] == ["SELECT id FROM basket_a"]
+
+def test_statement_timeout_is_counted(connect):
+    db = connect(PolicyPool(timeout=True), statement_timeout_ms=50)
+    with pytest.raises(Exception, match="statement_timeout of 50 ms exceeded"):
+        db.execute_sql("SELECT pg_sleep(1)")
+    assert db.execution_policy.snapshot()["gates"]["statement_timeout"] == 1
+
+def test_row_limit_injects_limit_and_truncates(connect):
+    pool = PolicyPool(rows=1000)
+    db = connect(pool, interactive_row_limit=3)
+
+    result = db.execute_sql("SELECT id FROM basket_a;", row_limit=3)
+
+    assert result == "0\n1\n2"
+    assert pool.calls[-1] == ("SELECT id FROM basket_a\nLIMIT 4", 30000)
+    assert db.execution_policy.snapshot()["gates"]["row_limit"] == 1
+
+@pytest.mark.parametrize("rows, expected", [
+    (3, "Result: 0\n1\n2"),
+    (4, "Result (first 3 rows): 0\n1\n2"),
+])
+def test_interactive_mode_reports_only_real_truncation(connect, monkeypatch, capsys, rows, expected):
+    db = connect(PolicyPool(rows=rows), interactive_row_limit=3)
+    monkeypatch.setattr(db.groq_config, "generate_sql", lambda question: "SELECT id FROM basket_a")
+    answers = iter(["all ids", "exit"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+
+    db.interactive_mode()
+
+    assert expected in capsys.readouterr().out
+
+def test_apply_row_limit_respects_smaller_limits_and_writes():
+    assert apply_row_limit("SELECT 1 LIMIT 2", 100) == ("SELECT 1 LIMIT 2", False)
+    assert apply_row_limit("SELECT 1 FETCH FIRST 5000 ROWS ONLY", 100)[1] is False
+    assert apply_row_limit("WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d", 100)[0].endswith("LIMIT 101")
+    assert apply_row_limit("WITH t AS (SELECT 1) DELETE FROM x", 100)[1] is False
+    assert apply_row_limit("SELECT * FROM t LIMIT ALL -- all rows", 10) == ("SELECT * FROM t LIMIT 11 -- all rows", True)
+    assert apply_row_limit("SELECT 1; -- hi", 10) == ("SELECT 1\nLIMIT 11", True)
+    assert apply_row_limit("SELECT 1 /* a */ ;\n-- b\n", 10) == ("SELECT 1\nLIMIT 11", True)
+    assert apply_row_limit("SELECT ';' -- x", 10) == ("SELECT ';'\nLIMIT 11", True)
+
+def test_policy_is_read_from_schema_yaml():
+    policy = ExecutionPolicy.for_schema(SchemaLoader("pagila"))
+    assert policy.max_estimated_rows == 1_000_000 and policy.on_exceed == "reject"
+    assert ExecutionPolicy.for_schema(SchemaLoader("fruitmart")).explains is False
+    with pytest.raises(ValueError, match="Unknown execution_policy settings: max_time"):
+        ExecutionPolicy.from_dict({"max_time": 5})
+
+def test_per_call_statement_timeout_lowers_the_policys(connect):
+    pool = PolicyPool(timeout=True)
+    db = connect(pool, max_cost=1e6, statement_timeout_ms=5000)
+    with pytest.raises(Exception, match="statement_timeout of 40 ms exceeded"):
+        db.execute_sql("SELECT pg_sleep(1)", statement_timeout_ms=40)
+    assert [call[1] for call in pool.calls] == [40, 40]
+
+    pool.timeout = False
+    db.execute_sql("SELECT 1", statement_timeout_ms=60000)
+    assert pool.calls[-1] == ("SELECT 1", 5000)
@@ -0,0 +1,101 @@
+import pytest
+from querycraft.config.groq_config import GroqConfig
+from querycraft.utils.live_catalog import (
+    LiveCatalog, FINGERPRINT_QUERY, RELATIONS_QUERY, COLUMNS_QUERY, CONSTRAINTS_QUERY, TYPES_QUERY
+)
+
+class CatalogPool:
+    """Answers the introspection queries from canned system catalog rows"""
+
+    def __init__(self):
+        self.fingerprint = "v1"
+        self.queries = []
+        self.rows = {
+            RELATIONS_QUERY: [
+                ("public", "store", "r", None, None, "Physical stores", None),
+                ("public", "sale", "p", None, "RANGE (sold_at)", None, None),
+                ("public", "sale_2024", "r", "sale", None, None, None),
+                ("public", "store_sales", "v", None, None, None,
+                 " SELECT s.name, count(*) AS sales\n   FROM (store s JOIN sale USING (store_id))\n  GROUP BY s.name;"),
+            ],
+            COLUMNS_QUERY: [
+                ("public", "store", "store_id", "integer", False, "nextval('store_store_id_seq'::regclass)", None),
+                ("public", "store", "name", "text", False, None, "Display name"),
+                ("public", "sale", "store_id", "integer", False, None, None),
+                ("public", "sale", "sold_at", "timestamp with time zone", False, None, None),
+                ("public", "store_sales", "name", "text", True, None, None),
+                ("public", "store_sales", "sales", "bigint", True, None, None),
+            ],
+            CONSTRAINTS_QUERY: [
+                ("public", "sale", "sale_store_id_fkey", "f", ["store_id"], "store", ["store_id"]),
+                ("public", "store", "store_pkey", "p", ["store_id"], None, []),
+            ],
+            TYPES_QUERY: [("size", "e", ["small", "large"], None)],
+        }
+
+    def execute(self, sql_query, params=None):
+        assert params == {"schemas": ["public"]}
+        self.queries.append(sql_query)
+        if sql_query == FINGERPRINT_QUERY:
+            return ["md5"], [(self.fingerprint,)]
+        return [], self.rows[sql_query]
+
+@pytest.fixture
+def pool():
+    LiveCatalog.clear_cache()
+    yield CatalogPool()
+    LiveCatalog.clear_cache()
+
+def test_introspected_catalog(pool, tmp_path):
+    catalog = LiveCatalog(pool, "shop", artifact_dir=tmp_path).catalog()
+
+    assert [t.name for t in catalog.relations()] == ["store", "sale", "store_sales"]
+    store = catalog.get("store")
+    assert store.primary_key == ("store_id",) and store.comment == "Physical stores"
+    assert store.column("name").comment == "Display name"
+    assert catalog.get("sale").references == {"store"}
+    assert catalog.resolve("sale_2024").name == "sale"
+    assert catalog.get("store_sales").references == {"sale", "store"}
+    assert catalog.types["size"].labels == ("small", "large")
+    assert "FOREIGN KEY (store_id) REFERENCES store(store_id)" in catalog.get("sale").ddl
+    assert "PARTITION BY RANGE (sold_at)" in catalog.get("sale").ddl
+
+def test_reintrospects_only_when_fingerprint_changes(pool, tmp_path):
+    live = LiveCatalog(pool, "shop", artifact_dir=tmp_path, check_interval=0)
+    first = live.catalog()
+    assert live.catalog() is first
+    assert live.stats == {"checks": 2, "introspections": 1, "disk_hits": 0}
+
+    pool.rows[COLUMNS_QUERY].append(("public", "store", "city", "text", True, None, None))
+    pool.fingerprint = "v2"
+    assert "city" in live.catalog().get("store").column_names
+    assert live.stats["introspections"] == 2
+
+    # A new process starts from the disk artifact and only runs the fingerprint query
+    LiveCatalog.clear_cache()
+    restarted = LiveCatalog(pool, "shop", artifact_dir=tmp_path)
+    pool.queries.clear()
+    assert "city" in restarted.catalog().get("store").column_names
+    assert pool.queries == [FINGERPRINT_QUERY]
+    assert restarted.stats["disk_hits"] == 1
+
+def test_prompt_built_from_live_catalog(pool, tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    live = LiveCatalog(pool, "shop", artifact_dir=tmp_path, check_interval=0)
+    config = GroqConfig(schema_name="shop", live_catalog=live)
+
+    prompt = config.build_system_prompt()
+    assert "CREATE TABLE public.store (" in prompt
+    assert "No example queries available." in prompt
+    fingerprint = config.schema_fingerprint()
+
+    pool.fingerprint = "v2"
+    assert config.schema_fingerprint() != fingerprint
+
+def test_retrieval_over_live_catalog(pool, tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    live = LiveCatalog(pool, "shop", artifact_dir=tmp_path)
+    config = GroqConfig(schema_name="shop", live_catalog=live, retrieval_top_k=1)
+
+    prompt = config.build_system_prompt("How many sales per store?")
+    assert "CREATE TABLE public.sale (" in prompt and "CREATE TABLE public.store (" in prompt
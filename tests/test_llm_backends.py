@@ -0,0 +1,141 @@
+import json
+import asyncio
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from querycraft.backends.base import LLMBackend, Completion, TransientLLMError, create_backend
+from querycraft.backends.openai_backend import OpenAICompatibleBackend
+from querycraft.backends.replay_backend import RecordReplayBackend
+from querycraft.config.groq_config import GroqConfig
+
+class CountingBackend(LLMBackend):
+    """Answers with a fixed SQL statement and counts calls"""
+    name = "counting"
+
+    def __init__(self, content="SELECT 1;"):
+        self.content = content
+        self.calls = 0
+
+    def complete(self, messages, model, temperature, max_tokens, seed=None):
+        self.calls += 1
+        return Completion(self.content, 10, 3)
+
+    def stream(self, messages, model, temperature, max_tokens):
+        yield self.complete(messages, model, temperature, max_tokens).content
+
+def test_incomplete_backends_fail_at_instantiation():
+    class CompleteOnly(LLMBackend):
+        def complete(self, messages, model, temperature, max_tokens, seed=None):
+            return Completion("SELECT 1;")
+
+    with pytest.raises(TypeError, match="stream"):
+        CompleteOnly()
+
+class OpenAIHandler(BaseHTTPRequestHandler):
+    statuses = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = type(self).statuses.pop(0) if type(self).statuses else 200
+        if status != 200:
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for word in ["SELECT", " 2", ";"]:
+                chunk = {"choices": [{"index": 0, "delta": {"content": word}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        payload = json.dumps({
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "SELECT 2;"}}],
+            "usage": {"prompt_tokens": 7, "completion_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def openai_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    OpenAIHandler.statuses = []
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+def test_record_then_replay_offline(tmp_path):
+    inner = CountingBackend("SELECT count(*) FROM basket_a;")
+    recorder = GroqConfig(schema_name="fruitmart",
+                          backend=RecordReplayBackend(tmp_path, mode="record", inner=inner))
+    assert recorder.generate_sql("How many?") == "SELECT count(*) FROM basket_a;"
+    assert inner.calls == 1
+
+    replayer = RecordReplayBackend(tmp_path, mode="replay")
+    config = GroqConfig(schema_name="fruitmart", backend=replayer)
+    assert config.generate_sql("How many?") == "SELECT count(*) FROM basket_a;"
+    assert asyncio.run(config.agenerate_sql("How many?")) == "SELECT count(*) FROM basket_a;"
+    assert replayer.stats == {"replayed": 2, "recorded": 0}
+
+    with pytest.raises(Exception, match="No recorded response"):
+        config.generate_sql("Something else?")
+
+def test_concurrent_recordings_do_not_collide(tmp_path):
+    recorder = RecordReplayBackend(tmp_path, mode="record", inner=CountingBackend())
+    messages = [{"role": "user", "content": "q"}]
+    errors = []
+
+    def record():
+        try:
+            for _ in range(20):
+                recorder.complete(messages, "m", 0.05, 100)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [p.suffix for p in tmp_path.iterdir()] == [".json"]
+    assert RecordReplayBackend(tmp_path, mode="replay").complete(messages, "m", 0.05, 100).content == "SELECT 1;"
+
+def test_prompt_hash_covers_sampling_parameters():
+    messages = [{"role": "user", "content": "q"}]
+    base = RecordReplayBackend.prompt_hash(messages, "m", 0.05, 100)
+    assert base == RecordReplayBackend.prompt_hash(messages, "m", 0.05, 100)
+    assert base != RecordReplayBackend.prompt_hash(messages, "m", 0.3, 100)
+    assert base != RecordReplayBackend.prompt_hash(messages, "m", 0.05, 100, seed=1)
+
+def test_openai_compatible_backend(openai_url):
+    backend = create_backend("openai", base_url=openai_url)
+    assert isinstance(backend, OpenAICompatibleBackend)
+    messages = [{"role": "user", "content": "q"}]
+
+    completion = backend.complete(messages, "m", 0.0, 10)
+    assert (completion.content, completion.prompt_tokens, completion.completion_tokens) == ("SELECT 2;", 7, 2)
+    assert "".join(backend.stream(messages, "m", 0.0, 10)) == "SELECT 2;"
+    assert asyncio.run(backend.acomplete(messages, "m", 0.0, 10)).content == "SELECT 2;"
+
+    OpenAIHandler.statuses = [503]
+    with pytest.raises(TransientLLMError):
+        backend.complete(messages, "m", 0.0, 10)
+
+def test_config_retries_transient_backend_errors(openai_url):
+    config = GroqConfig(schema_name="fruitmart", backend="openai", base_url=openai_url, retry_delay=0)
+    OpenAIHandler.statuses = [500]
+    assert config.generate_sql("q") == "SELECT 2;"
+    assert config.cache_params()["backend"] == "openai"
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown LLM backend"):
+        create_backend("nope")
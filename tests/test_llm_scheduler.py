@@ -0,0 +1,187 @@
+import time
+import asyncio
+import pytest
+from benchmarks.mock_llm_server import MockLLMServer
+from querycraft.backends.base import LLMBackend, Completion, TransientLLMError, RateLimitError
+from querycraft.backends.openai_backend import OpenAICompatibleBackend
+from querycraft.config.groq_config import GroqConfig
+from querycraft.utils.llm_scheduler import RequestScheduler, CircuitOpenError, TokenBucket
+
+class FlakyBackend(LLMBackend):
+    """Fails with the given errors, then answers"""
+    name = "flaky"
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def complete(self, messages, model, temperature, max_tokens, seed=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return Completion("SELECT 1;", 10, 3)
+
+    def stream(self, messages, model, temperature, max_tokens):
+        yield self.complete(messages, model, temperature, max_tokens).content
+
+class ProseBackend(FlakyBackend):
+    """Answers with prose ``prose`` times, then with SQL"""
+
+    def __init__(self, prose):
+        super().__init__([])
+        self.prose = prose
+
+    def complete(self, messages, model, temperature, max_tokens, seed=None):
+        self.calls += 1
+        return Completion("Here is the query" if self.calls <= self.prose else "SELECT 1;", 10, 3)
+
+def failing(times, error=None):
+    """Request failing ``times`` times before returning "ok", with its call log"""
+    calls = []
+
+    def request():
+        calls.append(time.monotonic())
+        if len(calls) <= times:
+            raise error or TransientLLMError("Server error 503")
+        return "ok"
+    return request, calls
+
+def test_backoff_grows_with_full_jitter():
+    scheduler = RequestScheduler(max_attempts=4, base_delay=0.01, seed=1)
+    request, calls = failing(3)
+
+    assert scheduler.call(request) == "ok"
+    assert len(calls) == 4
+    stats = scheduler.snapshot()
+    assert stats["retries"] == 3 and stats["failures"] == 0
+    # Full jitter: each backoff is somewhere below 0.01 * 2**retry
+    assert 0 < stats["backoff_seconds"] < 0.01 + 0.02 + 0.04
+
+def test_gives_up_after_max_attempts():
+    scheduler = RequestScheduler(max_attempts=2, base_delay=0)
+    request, calls = failing(5)
+
+    with pytest.raises(TransientLLMError):
+        scheduler.call(request)
+    assert len(calls) == 2 and scheduler.stats["failures"] == 1
+
+def test_non_transient_errors_are_not_retried():
+    scheduler = RequestScheduler(base_delay=0)
+    request, calls = failing(1, ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        scheduler.call(request)
+    assert len(calls) == 1 and scheduler.breaker("default").state == "closed"
+
+def test_retry_after_is_honored_by_every_caller():
+    scheduler = RequestScheduler(base_delay=0)
+    request, calls = failing(1, RateLimitError("Rate limited", retry_after=0.2))
+
+    assert scheduler.call(request, key="groq") == "ok"
+    assert calls[1] - calls[0] >= 0.2
+    assert scheduler.stats["rate_limited"] == 1
+
+    # The pause applies to the backend, not just the call that was limited
+    scheduler._paused_until["groq"] = time.monotonic() + 0.1
+    start = time.monotonic()
+    scheduler.call(lambda: "ok", key="groq")
+    assert time.monotonic() - start >= 0.1
+    scheduler.call(lambda: "ok", key="other")
+
+def test_circuit_opens_and_fails_fast():
+    scheduler = RequestScheduler(max_attempts=1, failure_threshold=2, reset_timeout=0.1)
+    request, calls = failing(2)
+
+    for _ in range(2):
+        with pytest.raises(TransientLLMError):
+            scheduler.call(request, key="groq")
+    with pytest.raises(CircuitOpenError):
+        scheduler.call(request, key="groq")
+    assert len(calls) == 2
+    assert scheduler.snapshot()["circuits"] == {"groq": "open"}
+    assert scheduler.call(lambda: "ok", key="openai") == "ok"
+
+    # After the timeout one trial call goes through and closes the circuit
+    time.sleep(0.1)
+    assert scheduler.call(request, key="groq") == "ok"
+    assert scheduler.snapshot()["circuit_opened"] == 1
+    assert scheduler.snapshot()["circuits"]["groq"] == "closed"
+
+def test_cancelled_trial_call_frees_the_half_open_slot():
+    scheduler = RequestScheduler(max_attempts=1, failure_threshold=1, reset_timeout=0)
+    with pytest.raises(TransientLLMError):
+        scheduler.call(failing(1)[0], key="groq")
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def cancelled_trial():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.acall(hang, key="groq"), timeout=0.01)
+
+    asyncio.run(cancelled_trial())
+    assert scheduler.snapshot()["circuits"]["groq"] == "half_open"
+    assert scheduler.call(lambda: "ok", key="groq") == "ok"
+    assert scheduler.snapshot()["circuits"]["groq"] == "closed"
+
+def test_non_sql_responses_share_the_retry_budget_and_backoff():
+    scheduler = RequestScheduler(seed=1, failure_threshold=1)
+    backend = ProseBackend(2)
+    config = GroqConfig(schema_name="fruitmart", backend=backend, scheduler=scheduler, retry_delay=0.01)
+
+    assert config.generate_sql("q") == "SELECT 1;"
+    stats = scheduler.snapshot()
+    assert backend.calls == 3 and stats["retries"] == 2 and stats["backoff_seconds"] > 0
+    # A model answering in prose does not open the backend's circuit
+    assert stats["circuits"] == {"flaky": "closed"}
+
+    backend.calls, backend.prose = 0, 10
+    with pytest.raises(Exception, match="not a valid SQL query"):
+        config.generate_sql("q")
+    assert backend.calls == config.max_retries
+
+def test_budget_spaces_out_requests():
+    bucket = TokenBucket(600, capacity=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+    scheduler = RequestScheduler(requests_per_minute=600)
+    scheduler.requests = TokenBucket(600, capacity=1)
+    start = time.monotonic()
+    for _ in range(3):
+        scheduler.call(lambda: "ok")
+    assert time.monotonic() - start >= 0.18
+    assert scheduler.stats["budget_wait_seconds"] > 0
+
+def test_async_calls_are_retried():
+    scheduler = RequestScheduler(base_delay=0)
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TransientLLMError("Server error 502")
+        return "ok"
+
+    assert asyncio.run(scheduler.acall(request)) == "ok"
+    assert len(attempts) == 2
+
+def test_openai_backend_maps_429_to_rate_limit_error():
+    with MockLLMServer(errors="429:1", retry_after=2.5) as server:
+        backend = OpenAICompatibleBackend(base_url=server.base_url)
+        with pytest.raises(RateLimitError) as error:
+            backend.complete([{"role": "user", "content": "q"}], "mock", 0.0, 10)
+    assert error.value.retry_after == 2.5
+
+def test_config_retries_through_scheduler():
+    scheduler = RequestScheduler(base_delay=0)
+    backend = FlakyBackend([RateLimitError("Rate limited", retry_after=0), TransientLLMError("Server error 500")])
+    config = GroqConfig(schema_name="fruitmart", backend=backend, scheduler=scheduler, retry_delay=0)
+
+    assert config.generate_sql("q") == "SELECT 1;"
+    assert backend.calls == 3
+    assert scheduler.snapshot()["retries"] == 2
+
+    backend.errors = [TransientLLMError("Server error 500")] * 3
+    with pytest.raises(Exception, match="Error after 3 retries"):
+        config.generate_sql("q")
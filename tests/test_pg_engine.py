@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from querycraft.utils.pg_engine import format_psql_rows, format_psql_value, resolve_dsn, dsn_env_var
+from querycraft.utils.result_set import ResultSet
+
+
+def test_psql_value_formatting():
+    assert format_psql_value(None) == ''
+    assert format_psql_value(False) == 'f'
+    assert format_psql_value(Decimal("4.99")) == '4.99'
+    assert format_psql_value(['Trailers', 'Behind the Scenes']) == '{Trailers,"Behind the Scenes"}'
+    assert format_psql_value(datetime(2022, 1, 24, 21, 40, 19, tzinfo=timezone.utc)) == '2022-01-24 21:40:19+00'
+    assert format_psql_value(datetime(2022, 1, 24, 21, 40, 19, tzinfo=timezone(timedelta(hours=5, minutes=30)))) == '2022-01-24 21:40:19+05:30'
+    assert format_psql_value(b'\x01\xff') == '\\x01ff'
+
+
+def test_psql_parity_for_intervals_json_and_special_floats():
+    # Expected strings are what psql -t -A prints for the same values
+    cases = [
+        ("interval '1 day 2 hours'", timedelta(days=1, hours=2), None, '1 day 02:00:00'),
+        ("interval '3 days'", timedelta(days=3), None, '3 days'),
+        ("interval '90 minutes 0.25 seconds'", timedelta(minutes=90, seconds=0.25), None, '01:30:00.25'),
+        ("interval '-2 hours'", timedelta(hours=-2), None, '-02:00:00'),
+        ("interval '0'", timedelta(0), None, '00:00:00'),
+        ("'{\"b\": [1, 2.5], \"a\": null}'::jsonb", {"b": [1, 2.5], "a": None}, "jsonb", '{"b": [1, 2.5], "a": null}'),
+        ("'[1, \"é\"]'::jsonb", [1, "é"], "jsonb", '[1, "é"]'),
+        ("'\"text\"'::jsonb", "text", "jsonb", 'text'),
+        ("'Infinity'::float8", float("inf"), None, 'Infinity'),
+        ("'-Infinity'::float8", float("-inf"), None, '-Infinity'),
+        ("'NaN'::float8", float("nan"), None, 'NaN'),
+        ("'2022-02-15 10:02:19.5'::timestamp", datetime(2022, 2, 15, 10, 2, 19, 500000), None,
+         '2022-02-15 10:02:19.5'),
+        ("'2022-02-15 10:02:19.25+00'::timestamptz", datetime(2022, 2, 15, 10, 2, 19, 250000, tzinfo=timezone.utc),
+         None, '2022-02-15 10:02:19.25+00'),
+    ]
+    for literal, value, type_name, expected in cases:
+        assert format_psql_value(value, type_name) == expected, literal
+
+    result = ResultSet.from_rows(["tags", "doc"], [(["a b"], [1, 2])])
+    result.columns[1].type_name = "jsonb"
+    assert result.to_psql() == '{"a b"}|[1, 2]'
+
+
+def test_psql_rows_keep_quotes_intact():
+    rows = [('Say "hi"', 1), (None, 2)]
+    assert format_psql_rows(rows) == 'Say "hi"|1\n|2'
+
+
+def test_resolve_dsn_from_compose_file(tmp_path, monkeypatch):
+    for var in ("PGHOST", "PGPORT", "PGUSER", "PGPASSWORD", "PGDATABASE"):
+        monkeypatch.delenv(var, raising=False)
+    (tmp_path / "docker-compose.yml").write_text(
+        "services:\n"
+        "  pg:\n"
+        "    ports:\n"
+        "      - \"15432:5432\"\n"
+        "    environment:\n"
+        "      - POSTGRES_PASSWORD=pass\n"
+    )
+    settings = resolve_dsn(tmp_path)
+    assert settings["port"] == 15432
+    assert settings["password"] == "pass"
+    assert settings["user"] == "postgres"
+
+    monkeypatch.setenv("PGPORT", "5999")
+    assert resolve_dsn(tmp_path)["port"] == 5999
+
+    monkeypatch.setenv(dsn_env_var(tmp_path), "postgresql://u@db/x")
+    assert resolve_dsn(tmp_path) == {"dsn": "postgresql://u@db/x"}
+    assert resolve_dsn(tmp_path.parent)["port"] == 5999
+
+def test_resolve_dsn_warns_without_a_published_port(tmp_path, monkeypatch, caplog):
+    for var in ("PGHOST", "PGPORT", "PGUSER", "PGPASSWORD", "PGDATABASE"):
+        monkeypatch.delenv(var, raising=False)
+    (tmp_path / "docker-compose.yml").write_text("services:\n  pg:\n    image: postgres\n")
+
+    assert resolve_dsn(tmp_path)["port"] == 5432
+    assert "No Postgres port" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setenv("PGPORT", "5999")
+    resolve_dsn(tmp_path)
+    assert "No Postgres port" not in caplog.text
@@ -0,0 +1,40 @@
+import os
+import pytest
+from querycraft.config.groq_config import GroqConfig
+from querycraft.utils.schema_loader import SchemaLoader
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", os.getenv("GROQ_API_KEY", "test-key"))
+    GroqConfig.clear_prompt_cache()
+    SchemaLoader.clear_cache()
+    yield
+    GroqConfig.clear_prompt_cache()
+    SchemaLoader.clear_cache()
+
+def test_pagila_variants_share_one_prompt():
+    prompts = [GroqConfig(schema_name=name).build_system_prompt()
+               for name in ("pagila-hw", "pagila-hw2", "pagila-hw3", "pagila")]
+
+    assert len(set(prompts)) == 1
+    stats = GroqConfig.prompt_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 3
+    assert stats["entries"] == 1
+
+def test_prompt_rebuilt_when_schema_file_changes(tmp_path):
+    config = GroqConfig(schema_name="fruitmart")
+    sql_path = tmp_path / "fruitmart.sql"
+    sql_path.write_text("CREATE TABLE basket_a (id INT);\n")
+    config.schema_loader.sql_path = sql_path
+    config.schema_loader.yaml_path = tmp_path / "missing.yaml"
+
+    first = config.build_system_prompt()
+    assert config.build_system_prompt() is first
+
+    sql_path.write_text("CREATE TABLE basket_a (id INT, fruit_a TEXT);\n")
+    os.utime(sql_path, ns=(0, 1))
+    second = config.build_system_prompt()
+
+    assert "fruit_a TEXT" in second
+    assert GroqConfig.prompt_cache_stats()["misses"] == 2
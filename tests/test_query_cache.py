@@ -0,0 +1,81 @@
+import time
+import pytest
+from querycraft.utils.query_cache import QueryCache
+from querycraft.utils.db_connector import DatabaseConnector
+
+PARAMS = {"model": "llama-3.1-8b-instant", "temperature": 0.05}
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = QueryCache(tmp_path / "cache.sqlite3", max_entries=2, ttl=60)
+    yield cache
+    cache.close()
+
+def test_key_ignores_case_whitespace_and_punctuation():
+    key = QueryCache.make_key("How many fruits are in basket B?", "fruitmart", "abc", PARAMS)
+    assert key == QueryCache.make_key("  how many fruits are in  basket b ", "fruitmart", "abc", PARAMS)
+    assert key != QueryCache.make_key("How many fruits are in basket B?", "fruitmart", "def", PARAMS)
+    assert key != QueryCache.make_key("How many fruits are in basket B?", "pagila", "abc", PARAMS)
+    assert key != QueryCache.make_key("How many fruits are in basket B?", "fruitmart", "abc",
+                                      dict(PARAMS, temperature=0.5))
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.put("a", "SELECT 1;")
+    time.sleep(0.01)
+    cache.put("b", "SELECT 2;")
+    time.sleep(0.01)
+    assert cache.get("a") == "SELECT 1;"
+    time.sleep(0.01)
+    cache.put("c", "SELECT 3;")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "SELECT 1;"
+    assert cache.get("c") == "SELECT 3;"
+    assert cache.stats["evictions"] == 1
+
+def test_expired_entries_are_misses(cache):
+    cache.ttl = 0.01
+    cache.put("a", "SELECT 1;")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.hit_rate() == 0.0
+
+def test_natural_query_reports_cache_hits(cache, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    db = DatabaseConnector(schema_name="fruitmart", query_cache=cache)
+    calls = []
+    monkeypatch.setattr(db.groq_config, "generate_sql", lambda q: calls.append(q) or "SELECT count(*) FROM basket_b;")
+    monkeypatch.setattr(db, "execute_sql", lambda sql, row_limit=None, statement_timeout_ms=None: "8")
+
+    first = db.execute_natural_query("How many fruits are in basket B?")
+    second = db.execute_natural_query("how many fruits are in basket b")
+    third = db.execute_natural_query("How many fruits are in basket B?", bypass_cache=True)
+
+    assert [first["cache_hit"], second["cache_hit"], third["cache_hit"]] == [False, True, False]
+    assert second["sql_query"] == "SELECT count(*) FROM basket_b;"
+    assert len(calls) == 2
+
+def test_default_cache_lives_in_the_user_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.delenv("QUERYCRAFT_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.chdir(tmp_path)
+
+    db = DatabaseConnector(schema_name="fruitmart")
+    assert db.query_cache.path == tmp_path / "xdg" / "querycraft" / "query_cache.sqlite3"
+    assert not (tmp_path / ".querycraft_cache").exists()
+
+    db.close()
+    assert db.query_cache is None
+    db.close()
+
+    monkeypatch.setenv("QUERYCRAFT_CACHE_DIR", str(tmp_path / "custom"))
+    db = DatabaseConnector(schema_name="fruitmart")
+    assert db.query_cache.path == tmp_path / "custom" / "query_cache.sqlite3"
+    db.close()
+
+def test_close_leaves_a_shared_cache_open(cache, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    DatabaseConnector(schema_name="fruitmart", query_cache=cache).close()
+    cache.put("a", "SELECT 1;")
+    assert cache.get("a") == "SELECT 1;"
@@ -0,0 +1,71 @@
+from querycraft.utils.result_cache import ResultCache
+
+class FakePool:
+    """Stands in for PostgresPool when probing pg_stat_user_tables"""
+
+    def __init__(self, versions):
+        self.versions = versions
+
+    def execute(self, sql_query, params=None):
+        rows = [(name, self.versions[name], 10) for name in params[0] if name in self.versions]
+        return ["relname", "modifications", "live"], rows
+
+def make_runner(results):
+    calls = []
+    def run(sql_query):
+        calls.append(sql_query)
+        return results.get(sql_query, "INSERT 0 1")
+    return run, calls
+
+def test_repeat_reads_are_served_until_a_table_changes():
+    pool = FakePool({"basket_a": 1, "basket_b": 1})
+    cache = ResultCache()
+    run, calls = make_runner({"SELECT count(*) FROM basket_a;": "7"})
+
+    assert cache.execute(pool, "SELECT count(*) FROM basket_a;", run) == "7"
+    assert cache.execute(pool, "select count(*)\n  from basket_a", run) == "7"
+    assert len(calls) == 1
+
+    pool.versions["basket_b"] = 2
+    cache.execute(pool, "SELECT count(*) FROM basket_a;", run)
+    assert len(calls) == 1
+
+    pool.versions["basket_a"] = 2
+    cache.execute(pool, "SELECT count(*) FROM basket_a;", run)
+    assert len(calls) == 2
+    assert cache.stats["hits"] == 2
+
+def test_writes_bypass_and_invalidate():
+    pool = FakePool({"basket_a": 1})
+    cache = ResultCache()
+    run, calls = make_runner({"SELECT * FROM basket_a;": "1|Apple"})
+
+    cache.execute(pool, "SELECT * FROM basket_a;", run)
+    cache.execute(pool, "INSERT INTO basket_a VALUES (9, 'Kiwi');", run)
+    cache.execute(pool, "INSERT INTO basket_a VALUES (9, 'Kiwi');", run)
+    cache.execute(pool, "SELECT * FROM basket_a;", run)
+
+    assert len(calls) == 4
+    assert cache.stats["bypasses"] == 2
+
+def test_untracked_relations_and_volatile_queries_are_not_cached():
+    pool = FakePool({"rental": 1})
+    cache = ResultCache()
+    run, calls = make_runner({})
+
+    for _ in range(2):
+        cache.execute(pool, "SELECT * FROM customer_list;", run)
+        cache.execute(pool, "SELECT count(*) FROM rental WHERE rental_date > now();", run)
+    assert len(calls) == 4
+
+def test_entry_and_memory_limits():
+    pool = FakePool({"film": 1})
+    cache = ResultCache(max_entries=2, max_bytes=100)
+    run, _ = make_runner({f"SELECT {i} FROM film": "x" * 30 for i in range(4)})
+
+    for i in range(3):
+        cache.execute(pool, f"SELECT {i} FROM film", run)
+    assert len(cache._entries) == 2
+
+    cache.execute(pool, "SELECT 3 FROM film", run)
+    assert cache._bytes <= 100
@@ -0,0 +1,115 @@
+import numpy as np
+from querycraft.utils.result_set import ResultSet, ColumnInfo
+from fakes import Column, fake_pool
+
+class FakeCursor:
+    def __init__(self, conn, name=None):
+        self.conn = conn
+        self.name = name
+        self.description = None
+        self.statusmessage = None
+        self.closed = False
+        self.fetches = 0
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql_query, params=None):
+        self.conn.executed.append(sql_query)
+        if sql_query.startswith("SELECT"):
+            self._rows = [(i, f"film {i}", i % 2 == 0) for i in range(self.conn.rows)]
+            self.statusmessage = f"SELECT {len(self._rows)}"
+            if self.name is None:
+                self.description = self.conn.columns
+        else:
+            self.statusmessage = "UPDATE 3"
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        self.description = self.conn.columns
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.columns = [Column("film_id", 23), Column("title", 25), Column("even", 16)]
+        self.autocommit = True
+        self.closed = False
+        self.executed = []
+        self.commits = 0
+        self.cursors = []
+
+    def cursor(self, name=None):
+        cursor = FakeCursor(self, name)
+        self.cursors.append(cursor)
+        return cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+def streaming_pool(rows):
+    conn = FakeConnection(rows)
+    pool, returned = fake_pool(conn)
+    return pool, conn, returned
+
+def test_stream_reads_batches_from_a_named_cursor():
+    pool, conn, returned = streaming_pool(rows=25)
+
+    result = pool.stream("SELECT film_id, title, even FROM film", batch_size=10)
+
+    assert [(c.name, c.type_name) for c in result.columns] == [
+        ("film_id", "integer"), ("title", "text"), ("even", "boolean")]
+    cursor = conn.cursors[0]
+    assert cursor.name == "querycraft_0" and cursor.fetches == 1
+    assert conn.autocommit is False and returned == []
+
+    assert [len(batch) for batch in result.batches()] == [10, 10, 5]
+    assert result.row_count == 25
+    assert returned == [conn] and conn.autocommit is True and conn.commits == 1 and cursor.closed
+
+def test_closing_early_releases_the_connection():
+    pool, conn, returned = streaming_pool(rows=10_000)
+
+    with pool.stream("SELECT film_id, title, even FROM film", batch_size=100) as result:
+        assert len(result.fetchmany(150)) == 150
+
+    assert conn.cursors[0].fetches == 2
+    assert returned == [conn] and conn.autocommit is True
+
+def test_writes_use_a_regular_cursor():
+    pool, conn, returned = streaming_pool(rows=0)
+
+    result = pool.stream("UPDATE film SET rental_rate = 1")
+
+    assert conn.cursors[0].name is None
+    assert result.columns is None and result.to_psql() == "UPDATE 3"
+    assert returned == [conn]
+
+def test_columnar_materialization():
+    pool, conn, _ = streaming_pool(rows=4)
+
+    columns = pool.stream("SELECT film_id, title, even FROM film", batch_size=3).to_columns()
+
+    assert columns["film_id"].dtype == np.int32 and columns["film_id"].sum() == 6
+    assert columns["even"].dtype == np.bool_ and columns["even"].tolist() == [True, False, True, False]
+    assert columns["title"].dtype == object
+
+def test_values_with_separators_survive():
+    rows = [(1, "a|b", "line\nbreak")]
+    assert ResultSet.from_rows(["id", "x", "y"], rows).fetchall() == rows
+    assert ResultSet.from_rows(["id"], []).to_psql() == "No results found"
+
+def test_nullable_numeric_columns_stay_objects():
+    result = ResultSet([ColumnInfo("n", 20)], iter([[(1,), (None,)]]))
+    assert result.to_columns()["n"].dtype == object
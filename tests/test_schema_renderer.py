@@ -0,0 +1,77 @@
+import pytest
+from querycraft.config.groq_config import GroqConfig
+from querycraft.utils.catalog import SchemaCatalog
+from querycraft.utils.schema_loader import SchemaLoader
+from querycraft.utils.schema_renderer import render_schema, token_report
+from querycraft.utils.schema_retriever import count_tokens
+
+DDL = """
+CREATE TYPE public.mood AS ENUM ('sad', 'happy');
+CREATE TABLE public.author (
+    author_id integer DEFAULT nextval('public.author_author_id_seq'::regclass) NOT NULL,
+    name character varying(80) NOT NULL
+);
+CREATE TABLE public.book (
+    book_id integer NOT NULL,
+    author_id integer NOT NULL,
+    published timestamp with time zone DEFAULT now(),
+    mood public.mood,
+    CONSTRAINT book_pkey PRIMARY KEY (book_id)
+);
+COMMENT ON TABLE public.book IS 'Every book in the shop';
+CREATE VIEW public.titles AS SELECT book_id AS id FROM public.book;
+"""
+
+def test_compact_rendering_is_dense_and_deterministic():
+    catalog = SchemaCatalog.parse(DDL.splitlines(keepends=True))
+    text = render_schema(catalog)
+
+    assert text == "\n".join([
+        "enum mood('sad', 'happy')",
+        "author(author_id int pk, name varchar(80))",
+        "book(book_id int pk, author_id→author.author_id, published timestamptz, mood mood)"
+        "  -- Every book in the shop",
+        "view titles(id)",
+    ])
+    assert render_schema(SchemaCatalog.parse(DDL.splitlines(keepends=True))) == text
+
+def test_budget_drops_low_priority_detail_first():
+    catalog = SchemaCatalog.parse(DDL.splitlines(keepends=True))
+    full = render_schema(catalog)
+
+    no_comments = render_schema(catalog, token_budget=count_tokens(full) - 1)
+    assert "--" not in no_comments and "int pk" in no_comments
+
+    names_only = render_schema(catalog, token_budget=count_tokens(no_comments) - 1)
+    assert "int" not in names_only and "view titles" in names_only
+    assert "author_id→author.author_id" in names_only
+
+    tiny = render_schema(catalog, ["book", "author"], token_budget=5)
+    assert tiny == "book(book_id pk, author_id→author.author_id, published, mood)"
+
+def test_pagila_uses_inferred_keys_and_saves_tokens():
+    catalog = SchemaCatalog.for_schema(SchemaLoader("pagila"))
+    text = render_schema(catalog)
+    assert "film_actor(actor_id→actor.actor_id, film_id→film.film_id, last_update timestamptz)" in text
+    assert "original_language_id→language.language_id" in text
+    assert "payment_p2022" not in text and "nextval" not in text
+
+    report = token_report("pagila-hw")
+    assert report["compact"]["schema_tokens"] < report["ddl"]["schema_tokens"] / 2
+    assert report["saved"] > 0.3
+    assert token_report("pagila", token_budget=300)["compact"]["schema_tokens"] <= 300
+
+def test_config_uses_compact_format(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    GroqConfig.clear_prompt_cache()
+    ddl = GroqConfig(schema_name="pagila").build_system_prompt()
+    compact = GroqConfig(schema_name="pagila", schema_format="compact").build_system_prompt()
+    retrieved = GroqConfig(schema_name="pagila", schema_format="compact", retrieval_top_k=2)
+
+    assert "CREATE TABLE" in ddl and "CREATE TABLE" not in compact
+    assert "film(film_id int pk" in compact and not compact.startswith(" ")
+    assert count_tokens(compact) < count_tokens(ddl)
+    assert "actor(" in retrieved.build_system_prompt("Which actor appears in the most films?")
+    assert retrieved.cache_params()["schema_format"] == "compact"
+    with pytest.raises(ValueError, match="schema_format"):
+        GroqConfig(schema_name="pagila", schema_format="yaml")
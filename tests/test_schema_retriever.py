@@ -0,0 +1,25 @@
+from querycraft.utils.schema_retriever import SchemaRetriever
+
+PAGILA_SQL = "querycraft/schemas/pagila/pagila.sql"
+
+def test_join_partners_are_included():
+    retriever = SchemaRetriever(PAGILA_SQL)
+    tables = retriever.retrieve("Which actor appears in the most films?", top_k=2)
+
+    assert "actor" in tables[:2]
+    assert {"actor", "film", "film_actor"} <= set(tables)
+
+def test_partitions_are_folded_into_parent():
+    retriever = SchemaRetriever(PAGILA_SQL)
+    assert "payment" in retriever.relations
+    assert not any(name.startswith("payment_p") for name in retriever.relations)
+
+def test_token_budget_limits_context():
+    retriever = SchemaRetriever(PAGILA_SQL)
+    question = "List customers with their address, city and country"
+    unbounded = retriever.prompt_reduction(question, top_k=4)
+    bounded = retriever.prompt_reduction(question, top_k=4, token_budget=200)
+
+    assert unbounded["retrieved_tokens"] < unbounded["baseline_tokens"]
+    assert bounded["retrieved_tokens"] <= 200
+    assert bounded["tables"]
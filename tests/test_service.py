@@ -0,0 +1,129 @@
+import time
+import asyncio
+import threading
+import httpx
+from querycraft.utils.service import QueryService
+
+class SlowConnector:
+    """Answers every question after a delay, counting concurrent calls"""
+
+    def __init__(self, schema_name, delay=0.0):
+        self.schema_name = schema_name
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def execute_natural_query(self, question, bypass_cache=False, row_limit=None, statement_timeout_ms=None):
+        with self._lock:
+            self.timeouts.append(statement_timeout_ms)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        if question == "fail":
+            raise Exception("Error generating SQL: boom")
+        return {"question": question, "sql_query": "SELECT 1;", "result": "1",
+                "cache_hit": False, "trace": {"name": "natural_query"}}
+
+def serve(service, client_code):
+    """Run ``client_code(client)`` against the service on a free port"""
+    async def main():
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+                return await client_code(client)
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+    return asyncio.run(main())
+
+def test_concurrent_clients_share_one_connector():
+    built = []
+
+    def connector_for(schema_name):
+        built.append(schema_name)
+        return SlowConnector(schema_name, delay=0.05)
+
+    service = QueryService(connector_for, schemas=["fruitmart", "pagila"], workers=4)
+
+    async def client_code(client):
+        return await asyncio.gather(*[
+            client.post("/query", json={"schema": "fruitmart", "question": f"q{i}"}) for i in range(8)
+        ])
+
+    responses = serve(service, client_code)
+    assert [response.status_code for response in responses] == [200] * 8
+    body = responses[0].json()
+    assert body["sql_query"] == "SELECT 1;" and "trace" not in body and body["elapsed"] > 0
+    assert built == ["fruitmart"]
+    assert service.connector("fruitmart").peak == 4
+    assert service.stats["completed"] == 8
+
+def test_backpressure_timeouts_and_errors():
+    service = QueryService(lambda schema: SlowConnector(schema, delay=0.3), schemas=["fruitmart"],
+                           workers=1, queue_size=1, timeout=5)
+
+    async def client_code(client):
+        queued = [asyncio.ensure_future(client.post("/query", json={"schema": "fruitmart", "question": "q"}))
+                  for _ in range(2)]
+        await asyncio.sleep(0.1)
+        rejected = await client.post("/query", json={"schema": "fruitmart", "question": "q"})
+        await asyncio.gather(*queued)
+        timed_out = await client.post("/query", json={"schema": "fruitmart", "question": "q", "timeout": 0.05})
+        failed = await client.post("/query", json={"schema": "fruitmart", "question": "fail"})
+        unknown = await client.post("/query", json={"schema": "nope", "question": "q"})
+        invalid = await client.post("/query", content=b"not json")
+        health = await client.get("/health")
+        metrics = await client.get("/metrics")
+        return rejected, timed_out, failed, unknown, invalid, health, metrics
+
+    rejected, timed_out, failed, unknown, invalid, health, metrics = serve(service, client_code)
+    assert rejected.status_code == 503 and rejected.headers["Retry-After"] == "1"
+    assert timed_out.status_code == 504
+    assert failed.status_code == 500 and "boom" in failed.json()["error"]
+    assert unknown.status_code == 404 and invalid.status_code == 400
+
+    status = health.json()
+    assert status["status"] == "ok" and status["schemas"]["loaded"] == ["fruitmart"]
+    assert status["requests"]["rejected"] == 1 and status["requests"]["timeouts"] == 1
+    assert status["requests"]["completed"] == 2 and status["latency"]["count"] == 2
+    assert 'querycraft_service_requests_total{outcome="rejected"} 1' in metrics.text
+
+def test_queries_run_under_the_remaining_timeout():
+    service = QueryService(lambda schema: SlowConnector(schema, delay=0.3), schemas=["fruitmart"],
+                           workers=1, queue_size=1, timeout=5)
+
+    async def client_code(client):
+        first = asyncio.ensure_future(client.post("/query", json={"schema": "fruitmart", "question": "q"}))
+        await asyncio.sleep(0.05)
+        queued = await client.post("/query", json={"schema": "fruitmart", "question": "q", "timeout": 0.1})
+        await first
+        await asyncio.sleep(0.05)
+        return first.result(), queued
+
+    first, queued = serve(service, client_code)
+    assert first.status_code == 200 and queued.status_code == 504
+    # The queued request was dropped instead of running after its client gave up
+    timeouts = service.connector("fruitmart").timeouts
+    assert len(timeouts) == 1 and 4900 < timeouts[0] <= 5000
+    assert service._pending == 0
+
+def test_invalid_content_length_gets_400():
+    service = QueryService(lambda schema: SlowConnector(schema), schemas=["fruitmart"])
+
+    async def client_code(client):
+        port = client.base_url.port
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /query HTTP/1.1\r\nHost: x\r\nContent-Length: abc\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    response = serve(service, client_code)
+    assert response.startswith(b"HTTP/1.1 400 ") and b"Invalid Content-Length" in response
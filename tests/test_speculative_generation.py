@@ -0,0 +1,87 @@
+import time
+import pytest
+from querycraft.utils.db_connector import DatabaseConnector
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql_query):
+        time.sleep(0.01)
+        if "missing_column" in sql_query:
+            raise Exception('column "missing_column" does not exist')
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor(self)
+
+    def cancel(self):
+        pass
+
+class FakePool:
+    def __init__(self):
+        self.timeouts = []
+
+    def _set_statement_timeout(self, conn, timeout_ms):
+        self.timeouts.append(timeout_ms)
+
+    def getconn(self):
+        return FakeConnection()
+
+    def putconn(self, conn, close=False):
+        pass
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    db = DatabaseConnector(schema_name="fruitmart", use_query_cache=False)
+    pool = FakePool()
+    monkeypatch.setattr(db, "_get_pool", lambda: pool)
+    monkeypatch.setattr(db, "execute_sql", lambda sql, row_limit=None, statement_timeout_ms=None: "8")
+    return db
+
+def test_first_candidate_that_plans_wins(db, monkeypatch):
+    candidates = {
+        0: (0.05, None),
+        1: (0.01, "SELECT missing_column FROM basket_b;"),
+        2: (0.10, "SELECT count(*) FROM basket_b;"),
+        3: (0.50, "SELECT count(id) FROM basket_b;"),
+    }
+    def generate_candidate(question, temperature=None, seed=None):
+        delay, sql_query = candidates[seed]
+        time.sleep(delay)
+        return sql_query
+    monkeypatch.setattr(db.groq_config, "generate_candidate", generate_candidate)
+
+    start = time.perf_counter()
+    result = db.execute_natural_query("How many fruits are in basket B?", speculative=4)
+
+    assert result["sql_query"] == "SELECT count(*) FROM basket_b;"
+    assert result["speculative"]["winner"] == 2
+    assert result["speculative"]["valid"] == 2
+    assert time.perf_counter() - start < 0.45
+
+def test_duplicates_and_warnings_are_reported(db, monkeypatch):
+    answers = {0: "SELECT missing_column FROM basket_b;", 1: "select missing_column\nfrom basket_b",
+               2: "SELECT count(*) FROM basket_b;"}
+    monkeypatch.setattr(db.groq_config, "generate_candidate",
+                        lambda question, temperature=None, seed=None: time.sleep(0.05 * seed) or answers[seed])
+    db.validation = "warn"
+
+    info = db.execute_natural_query("How many fruits are in basket B?", speculative=3)["speculative"]
+
+    assert (info["valid"], info["duplicates"]) == (2, 1)
+    assert [issue["candidate"] for issue in info["issues"]] == [0]
+    assert db._get_pool().timeouts == [db.execution_policy.statement_timeout_ms] * 2
+
+def test_all_candidates_failing_raises(db, monkeypatch):
+    monkeypatch.setattr(db.groq_config, "generate_candidate",
+                        lambda question, temperature=None, seed=None: "SELECT missing_column FROM basket_b;")
+    with pytest.raises(Exception, match="No candidate SQL could be planned"):
+        db.execute_natural_query("How many fruits are in basket B?", speculative=3)
@@ -0,0 +1,166 @@
+import psycopg2
+import psycopg2.errors
+import pytest
+from querycraft.utils.query_cache import QueryCache
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.sql_template import parameterize, question_template, bind_question
+from fakes import Column, fake_pool
+
+class PreparingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.name = None
+        self.description = None
+        self.statusmessage = None
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql_query, params=None):
+        self.conn.executed.append(sql_query)
+        if sql_query.startswith("EXECUTE") and self.conn.fail_next is not None:
+            error, self.conn.fail_next = self.conn.fail_next, None
+            raise error
+        if sql_query.startswith("PREPARE") and "broken" in sql_query:
+            raise psycopg2.ProgrammingError("could not determine data type of parameter $1")
+        if sql_query.startswith(("EXECUTE", "SELECT")):
+            self.description = [Column("n", 23)]
+            self._rows = [(1,)]
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        self.closed = True
+
+class PreparingConnection:
+    def __init__(self):
+        self.autocommit = True
+        self.closed = False
+        self.executed = []
+        self.fail_next = None
+        self.cursor_names = []
+
+    def cursor(self, name=None):
+        self.cursor_names.append(name)
+        cursor = PreparingCursor(self)
+        cursor.name = name
+        return cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+def preparing_pool(max_prepared=2):
+    conn = PreparingConnection()
+    pool, _ = fake_pool(conn, max_prepared)
+    return pool, conn
+
+def test_literals_are_lifted_but_structural_numbers_kept():
+    template = parameterize(
+        "SELECT title, rental_rate::numeric(4,2) FROM film WHERE length > 120 "
+        "AND rating = 'PG' AND last_update > DATE '2006-01-01' GROUP BY 1, 2 ORDER BY 2 DESC LIMIT 10"
+    )
+    assert template.params == ["120", "'PG'", "10"]
+    assert template.types == ("integer", "unknown", "integer")
+    assert template.text == (
+        "SELECT title, rental_rate::numeric(4,2) FROM film WHERE length > $1 "
+        "AND rating = $2 AND last_update > DATE '2006-01-01' GROUP BY 1, 2 ORDER BY 2 DESC LIMIT $3"
+    )
+    assert parameterize("SELECT * FROM film WHERE length > 90 LIMIT 5").key == \
+        parameterize("SELECT * FROM film WHERE length > 185 LIMIT 20").key
+
+def test_statements_with_parameters_or_utility_statements_are_left_alone():
+    assert parameterize("SELECT * FROM film WHERE film_id = %s").params == []
+    assert parameterize("SET statement_timeout = 5000").params == []
+
+def test_prepared_statements_are_reused_and_evicted():
+    pool, conn = preparing_pool(max_prepared=2)
+
+    for length in (90, 120, 185):
+        assert pool.stream(f"SELECT n FROM film WHERE length > {length} LIMIT 50", prepare=True).fetchall() == [(1,)]
+    prepares = [sql for sql in conn.executed if sql.startswith("PREPARE")]
+    assert len(prepares) == 1
+    assert prepares[0].endswith("(integer, integer) AS SELECT n FROM film WHERE length > $1 LIMIT $2")
+    assert conn.executed[-1].endswith("(185, 50)")
+
+    pool.stream("SELECT n FROM film WHERE rating = 'G' LIMIT 50", prepare=True).fetchall()
+    pool.stream("SELECT n FROM film WHERE title = 'ALI' LIMIT 50", prepare=True).fetchall()
+
+    assert [sql.split()[0] for sql in conn.executed[-3:]] == ["PREPARE", "DEALLOCATE", "EXECUTE"]
+    assert pool.prepared_stats == {"prepared": 3, "reused": 2, "evicted": 1, "fallbacks": 0, "reprepared": 0}
+
+def test_unbounded_queries_stream_from_a_server_side_cursor():
+    pool, conn = preparing_pool()
+
+    pool.stream("SELECT n FROM film WHERE length > 90", prepare=True, batch_size=100).fetchall()
+    pool.stream("SELECT n FROM film WHERE length > 90 LIMIT 5000", prepare=True, batch_size=100).fetchall()
+
+    assert not any(sql.startswith("PREPARE") for sql in conn.executed)
+    assert all(name is not None and name.startswith("querycraft_") for name in conn.cursor_names)
+
+@pytest.mark.parametrize("error, deallocated", [
+    (psycopg2.errors.FeatureNotSupported("cached plan must not change result type"), True),
+    (psycopg2.errors.InvalidSqlStatementName('prepared statement "qc_1" does not exist'), False),
+])
+def test_stale_prepared_statements_are_prepared_again(error, deallocated):
+    pool, conn = preparing_pool()
+    query = "SELECT n FROM film WHERE length > 90 LIMIT 5"
+    pool.stream(query, prepare=True).fetchall()
+    conn.executed.clear()
+    conn.fail_next = error
+
+    assert pool.stream(query, prepare=True).fetchall() == [(1,)]
+
+    expected = ["EXECUTE", "DEALLOCATE", "PREPARE", "EXECUTE"] if deallocated else ["EXECUTE", "PREPARE", "EXECUTE"]
+    assert [sql.split()[0] for sql in conn.executed] == expected
+    assert pool.prepared_stats["reprepared"] == 1
+
+def test_unpreparable_templates_fall_back_to_plain_sql():
+    pool, conn = preparing_pool()
+
+    for _ in range(2):
+        pool.stream("SELECT n FROM broken WHERE x = 1 LIMIT 5", prepare=True).fetchall()
+
+    assert conn.executed.count("SELECT n FROM broken WHERE x = 1 LIMIT 5") == 2
+    assert len([sql for sql in conn.executed if sql.startswith("PREPARE")]) == 1
+    assert pool.prepared_stats["fallbacks"] == 2
+
+def test_question_bindings_need_every_question_literal():
+    text, values = question_template("Films longer than 120 minutes rated 'PG'")
+    assert text == "Films longer than {0} minutes rated {1}"
+    assert bind_question(parameterize("SELECT title FROM film WHERE length > 120 AND rating = 'PG' LIMIT 5"),
+                         values) == [0, 1, None]
+    assert bind_question(parameterize("SELECT title FROM film WHERE length > 120"), values) is None
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = QueryCache(tmp_path / "cache.sqlite3")
+    yield cache
+    cache.close()
+
+def test_template_hit_for_questions_differing_in_literals(cache, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    db = DatabaseConnector(schema_name="fruitmart", query_cache=cache, validation="off")
+    calls = []
+    monkeypatch.setattr(db.groq_config, "generate_sql",
+                        lambda q: calls.append(q) or "SELECT count(*) FROM basket_a WHERE fruit_a = 'Apple';")
+    monkeypatch.setattr(db, "execute_sql", lambda sql, row_limit=None, statement_timeout_ms=None: "1")
+
+    first = db.execute_natural_query("How many 'Apple' are in basket A?")
+    second = db.execute_natural_query("How many 'Banana' are in basket A?")
+    third = db.execute_natural_query("How many 'Banana' are in basket A?")
+
+    assert len(calls) == 1
+    assert second["cache_hit"] and second["template_hit"]
+    assert second["sql_query"] == "SELECT count(*) FROM basket_a WHERE fruit_a = 'Banana';"
+    assert third["cache_hit"] and "template_hit" not in third
+    assert "template_hit" not in first
+    assert cache.stats["hits"] == 2 and cache.stats["misses"] == 1
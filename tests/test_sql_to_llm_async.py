@@ -0,0 +1,164 @@
+import json
+import time
+import asyncio
+import threading
+import pytest
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from querycraft.config.groq_config import GroqConfig
+from querycraft.utils.llm_scheduler import RequestScheduler, TokenBucket
+from querycraft.utils import sql_to_llm
+from querycraft.utils.sql_to_llm import generate_batch, read_sql_files
+
+class MockChatCompletions(BaseHTTPRequestHandler):
+    """Answers every chat completion with the user's question as a SQL comment"""
+    delay = 0.1
+    # Set to a threading.Barrier to hold requests until that many are in flight
+    barrier = None
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.requests += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        question = body["messages"][-1]["content"].strip()
+        if cls.barrier is not None:
+            cls.barrier.wait()
+        time.sleep(cls.delay)
+        payload = json.dumps({
+            "id": "mock", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"SELECT 1; -- {question}"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }).encode()
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    for counter in ("in_flight", "max_in_flight", "requests"):
+        monkeypatch.setattr(MockChatCompletions, counter, 0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockChatCompletions)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_batch_runs_concurrently(mock_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    for i in range(8):
+        (tmp_path / f"{i:02d}.sql").write_text(f"question {i}\n")
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    config = GroqConfig(schema_name="fruitmart", base_url=mock_server, scheduler=RequestScheduler())
+    # Each request waits until four are in flight; a serial run would fail instead of being slow
+    monkeypatch.setattr(MockChatCompletions, "barrier", threading.Barrier(4, timeout=5))
+
+    stats = asyncio.run(generate_batch(config, output_dir, read_sql_files(tmp_path),
+                                       concurrency=4))
+
+    assert stats["files"] == 8 and not stats["failures"]
+    assert MockChatCompletions.max_in_flight == 4
+    for i in range(8):
+        assert (tmp_path / f"{i:02d}.sql").read_text() == f"question {i}\n"
+        content = (output_dir / f"{i:02d}.sql").read_text()
+        assert content == f"question {i}\n\n-- LLM Generated SQL\nSELECT 1; -- question {i};"
+
+def test_outputs_are_written_as_they_complete(tmp_path):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    later_written_first = []
+
+    class GatedConfig:
+        """The first question only finishes once the second one's output exists"""
+        scheduler = RequestScheduler()
+
+        async def agenerate_sql(self, question):
+            if question == "question 0":
+                for _ in range(100):
+                    if (output_dir / "01.sql").exists():
+                        break
+                    await asyncio.sleep(0.01)
+                later_written_first.append((output_dir / "01.sql").exists())
+            return f"SELECT 1; -- {question}"
+
+    stats = asyncio.run(generate_batch(GatedConfig(), output_dir, {"00.sql": "question 0", "01.sql": "question 1"},
+                                       concurrency=2))
+
+    assert later_written_first == [True] and not stats["failures"]
+    assert (output_dir / "00.sql").read_text() == "question 0\n-- LLM Generated SQL\nSELECT 1; -- question 0"
+    assert sorted(p.name for p in output_dir.iterdir()) == ["00.sql", "01.sql"]
+
+def test_rerun_only_regenerates_changed_questions(mock_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    # Suites and schemas are found relative to the working directory
+    (tmp_path / "querycraft").symlink_to(Path("querycraft").resolve())
+    monkeypatch.chdir(tmp_path)
+    sql_folder = tmp_path / "test_databases" / "fruitmart" / "sql"
+    sql_folder.mkdir(parents=True)
+    for i in range(5):
+        (sql_folder / f"{i:02d}.sql").write_text(f"question {i}\n")
+    # Left over from the old append-in-place mode
+    (sql_folder / "04.sql").write_text("question 4\n\n-- LLM Generated SQL\nSELECT 4;")
+    config = GroqConfig(schema_name="fruitmart", base_url=mock_server)
+    run = lambda **kwargs: sql_to_llm.main("fruitmart", requests_per_minute=None, groq_config=config, **kwargs)
+    output_dir = tmp_path / "test_databases" / "fruitmart" / "llm_sql"
+
+    assert run()["files"] == 5 and MockChatCompletions.requests == 5
+    assert (output_dir / "04.sql").read_text().endswith("SELECT 1; -- question 4;")
+    assert sorted(p.name for p in output_dir.iterdir()) == ["00.sql", "01.sql", "02.sql", "03.sql",
+                                                             "04.sql", "manifest.json"]
+
+    (sql_folder / "02.sql").write_text("question two\n")
+    (sql_folder / "03.sql").unlink()
+    stats = run()
+    assert (stats["files"], stats["skipped"], stats["removed"]) == (1, 3, 1)
+    assert MockChatCompletions.requests == 6
+    assert (output_dir / "02.sql").read_text().endswith("-- question two;")
+    assert not (output_dir / "03.sql").exists()
+
+    (output_dir / "00.sql").unlink()
+    config.TEMPERATURE = 0.5
+    assert run()["files"] == 4
+    assert run(force=True)["files"] == 4 and MockChatCompletions.requests == 14
+    assert run()["files"] == 0
+
+def test_batch_budget_is_the_schedulers(mock_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(MockChatCompletions, "delay", 0)
+    config = GroqConfig(schema_name="fruitmart", base_url=mock_server, scheduler=RequestScheduler())
+    # One request at a time, one every 0.1s
+    config.scheduler.requests = TokenBucket(600, capacity=1)
+
+    stats = asyncio.run(generate_batch(config, tmp_path, {f"{i}.sql": f"question {i}" for i in range(3)},
+                                       concurrency=3))
+
+    assert not stats["failures"] and MockChatCompletions.requests == 3
+    assert stats["rate_limit_wait"] == config.scheduler.snapshot()["budget_wait_seconds"] > 0.1
+
+def test_main_sets_the_scheduler_budget(tmp_path, monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    (tmp_path / "querycraft").symlink_to(Path("querycraft").resolve())
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "test_databases" / "fruitmart" / "sql").mkdir(parents=True)
+    config = GroqConfig(schema_name="fruitmart", scheduler=RequestScheduler())
+
+    sql_to_llm.main("fruitmart", requests_per_minute=120, tokens_per_minute=6000, groq_config=config)
+    assert (config.scheduler.requests.rate, config.scheduler.tokens.rate) == (2, 100)
+
+    sql_to_llm.main("fruitmart", requests_per_minute=None, groq_config=config)
+    assert config.scheduler.requests.rate == 2
@@ -0,0 +1,122 @@
+import yaml
+import pytest
+from querycraft.utils.result_set import ResultSet
+from querycraft.utils.catalog import SchemaCatalog
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.sql_validator import SqlValidator
+from fakes import ScriptedBackend
+
+PAGILA = "querycraft/schemas/pagila/pagila.sql"
+
+class CountingPool:
+    def __init__(self):
+        self.executed = []
+
+    def stream(self, sql_query, params=None, batch_size=1000, statement_timeout_ms=None, prepare=False):
+        self.executed.append(sql_query)
+        return ResultSet.from_rows(["fruit"], [("Apple",)])
+
+@pytest.fixture(scope="module")
+def validator():
+    return SqlValidator(SchemaCatalog.load(PAGILA))
+
+def test_pagila_examples_validate(validator):
+    with open("querycraft/schemas/pagila/pagila.yaml") as f:
+        examples = yaml.safe_load(f)["example_queries"]
+    for example in examples:
+        result = validator.validate(example["sql"])
+        assert result.ok, (example["sql"], result.feedback())
+
+@pytest.mark.parametrize("sql_query", [
+    "SELECT f.title, c.name FROM film f JOIN film_category fc USING (film_id) JOIN category c ON c.category_id = fc.category_id",
+    "WITH top AS (SELECT customer_id, sum(amount) total FROM payment GROUP BY customer_id) "
+    "SELECT c.email, top.total FROM top JOIN customer c USING (customer_id) ORDER BY total DESC",
+    "SELECT t.n FROM (SELECT count(*) AS n FROM rental) t",
+    "SELECT k.ord FROM unnest(ARRAY['a', 'b']) WITH ORDINALITY AS k(v, ord)",
+    "SELECT extract(year FROM rental_date)::int AS year, count(*) FROM rental GROUP BY 1",
+    "SELECT relname FROM pg_catalog.pg_class",
+    "SELECT title FROM film WHERE film_id IN (SELECT film_id FROM inventory WHERE store_id = 1)",
+    "INSERT INTO actor (first_name, last_name) VALUES ('A', 'B')",
+    "DELETE FROM payment p USING customer c WHERE p.customer_id = c.customer_id AND c.active = 0",
+    "INSERT INTO actor (actor_id, first_name) VALUES (1, 'A') "
+    "ON CONFLICT (actor_id) DO UPDATE SET first_name = EXCLUDED.first_name",
+    "SELECT json_agg(f) FROM film f",
+    "SELECT c.name, (SELECT count(*) FROM film_category fc WHERE fc.category_id = c.category_id), row_to_json(c) "
+    "FROM category c",
+])
+def test_valid_queries_have_no_issues(validator, sql_query):
+    assert validator.validate(sql_query).issues == []
+
+@pytest.mark.parametrize("sql_query, kind, name, suggestion", [
+    ("SELECT * FROM actors", "unknown_table", "actors", "actor"),
+    ("SELECT a.firstname FROM actor a", "unknown_column", "a.firstname", "first_name"),
+    ("SELECT titel FROM film", "unknown_column", "titel", "title"),
+    ("SELECT actor.first_name FROM actor a", "unknown_alias", "actor", "a"),
+    ("SELECT x.title FROM film f", "unknown_alias", "x", None),
+    ("DELETE FROM payment p USING customer c WHERE p.customer_id = c.customerid",
+     "unknown_column", "c.customerid", "customer_id"),
+    ("INSERT INTO actor (actor_id) VALUES (1) ON CONFLICT (actor_id) DO UPDATE SET first_name = excluded.firstname",
+     "unknown_column", "excluded.firstname", "first_name"),
+    ("SELECT t.total FROM (SELECT count(*) AS n FROM rental) t", "unknown_column", "t.total", None),
+    ("SELECT f.title FROM film f WHERE f.film_id IN (SELECT i.film FROM inventory i)",
+     "unknown_column", "i.film", "film_id"),
+])
+def test_invalid_references_are_reported(validator, sql_query, kind, name, suggestion):
+    issues = validator.validate(sql_query).issues
+    assert [(i.kind, i.name, i.suggestion) for i in issues] == [(kind, name, suggestion)]
+
+def test_validation_is_fast(validator):
+    result = validator.validate(
+        "SELECT c.first_name, sum(p.amount) FROM customer c JOIN payment p ON p.customer_id = c.customer_id "
+        "GROUP BY c.first_name ORDER BY 2 DESC LIMIT 5"
+    )
+    assert result.ok and result.elapsed < 0.01
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    SqlValidator.reset_stats()
+    db = DatabaseConnector(schema_name="fruitmart", use_query_cache=False, validation="reject")
+    pool = CountingPool()
+    monkeypatch.setattr(db, "_get_pool", lambda: pool)
+    return db, pool
+
+def test_invalid_sql_is_regenerated_before_execution(db):
+    db, pool = db
+    backend = db.groq_config.backend = ScriptedBackend([
+        "SELECT fruit FROM basket_a",
+        "SELECT fruit_a FROM basket_a",
+    ])
+
+    result = db.execute_natural_query("Which fruits are in basket A?")
+
+    assert pool.executed == ["SELECT fruit_a FROM basket_a;"]
+    assert result["validation"]["ok"] and result["validation"]["regenerations"] == 1
+    feedback = backend.requests[1][-1]["content"]
+    assert "column fruit does not exist (did you mean fruit_a?)" in feedback
+    assert backend.requests[1][-2] == {"role": "assistant", "content": "SELECT fruit FROM basket_a;"}
+    assert SqlValidator.stats() == {"validated": 2, "rejected": 1, "round_trips_saved": 1}
+
+def test_reject_mode_raises_without_touching_the_database(db):
+    db, pool = db
+    db.groq_config.backend = ScriptedBackend(["SELECT * FROM basket_c"] * 3)
+
+    with pytest.raises(Exception, match="relation basket_c does not exist"):
+        db.execute_natural_query("Which fruits are in basket C?")
+    assert pool.executed == []
+    assert SqlValidator.stats()["round_trips_saved"] == 3
+
+def test_warn_mode_executes_anyway(db):
+    db, pool = db
+    db.validation = "warn"
+    db.groq_config.backend = ScriptedBackend(["SELECT * FROM basket_c"])
+
+    result = db.execute_natural_query("Which fruits are in basket C?")
+
+    assert pool.executed == ["SELECT * FROM basket_c;"]
+    assert not result["validation"]["ok"]
+    assert result["validation"]["issues"][0]["kind"] == "unknown_table"
+
+def test_warn_is_the_default_mode(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    assert DatabaseConnector(schema_name="fruitmart", use_query_cache=False).validation == "warn"
@@ -0,0 +1,41 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+from benchmarks.startup import compare
+
+REPO_ROOT = Path(__file__).parent.parent
+
+PROBE = """
+import sys, json
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.config.groq_config import GroqConfig
+db = DatabaseConnector("fruitmart", use_query_cache=False)
+db.execution_policy
+config = GroqConfig(schema_name="fruitmart")
+print(json.dumps({
+    "loaded": [m for m in ("groq", "httpx", "pydantic", "numpy", "asyncio") if m in sys.modules],
+    "backend_built": config._backend is not None,
+}))
+"""
+
+def test_sql_only_startup_skips_llm_stack():
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result == {"loaded": [], "backend_built": False}
+
+def test_backend_is_built_on_first_use(monkeypatch):
+    from querycraft.config.groq_config import GroqConfig
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    config = GroqConfig(schema_name="fruitmart", backend="replay")
+    assert config._backend is None and config.cache_params()["backend"] == "replay"
+    assert config.backend is config.backend and config.backend.name == "replay"
+
+def test_startup_compare_flags_new_heavy_imports():
+    baseline = {"scenarios": {"sql_only": {"median": 0.1, "heavy_modules": []}}}
+    assert compare({"scenarios": {"sql_only": {"median": 0.11, "heavy_modules": []}}}, baseline) == []
+    assert compare({"scenarios": {"sql_only": {"median": 0.1, "heavy_modules": ["groq"]}}}, baseline) == \
+        ["sql_only now loads groq"]
@@ -0,0 +1,97 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from querycraft.backends.base import LLMBackend
+from querycraft.config.groq_config import GroqConfig
+
+class ScriptedStream(BaseHTTPRequestHandler):
+    """Streams queued responses word by word as server-sent events"""
+    responses = []
+    sent_chunks = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert body["stream"] is True
+        text = type(self).responses.pop(0)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = text.split(" ")
+        sent = 0
+        try:
+            for i, word in enumerate(words):
+                chunk = {"id": "mock", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                                      "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                sent += 1
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        type(self).sent_chunks.append(sent)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedStream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ScriptedStream.responses = []
+    yield GroqConfig(schema_name="fruitmart", stream=True, retry_delay=0,
+                     base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    server.shutdown()
+
+def test_stops_at_end_of_first_statement(config):
+    ScriptedStream.responses = ["SELECT count(*) FROM basket_b WHERE fruit_b = 'a;b'; This query counts the rows."]
+    sql, stats = config.generate_sql_stream("How many?")
+
+    assert sql == "SELECT count(*) FROM basket_b WHERE fruit_b = 'a;b';"
+    assert stats["attempts"] == 1
+    assert stats["early_stops"] == 1
+    assert stats["ttft"] is not None and stats["latency"] >= stats["ttft"]
+
+def test_retries_immediately_when_response_is_not_sql(config):
+    ScriptedStream.responses = [
+        "Here is the query you asked for: SELECT 1;",
+        "SELECT 1;",
+    ]
+    assert config.generate_sql("Give me one") == "SELECT 1;"
+
+class ChunkedBackend(LLMBackend):
+    """Streams the given chunks, recording how many were consumed"""
+    name = "chunked"
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.consumed = 0
+
+    def complete(self, messages, model, temperature, max_tokens, seed=None):
+        raise AssertionError("streaming only")
+
+    def stream(self, messages, model, temperature, max_tokens):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+
+@pytest.mark.parametrize("first_chunk", ["Sure, here's the query you asked for:", "```sql\nSELECT 1;"])
+def test_large_first_chunk_is_checked(monkeypatch, first_chunk):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    backend = ChunkedBackend([first_chunk, " more prose", " and more"])
+    config = GroqConfig(schema_name="fruitmart", stream=True, backend=backend)
+
+    text, stats = config._stream_completion([])
+
+    assert stats["stop_reason"] == "not_sql" and backend.consumed == 1
+
+def test_sql_prefix_is_only_checked_until_decided(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    backend = ChunkedBackend(["  SEL", "ECT fruit_a FROM basket_a", " WHERE 1 = 1;", " -- done"])
+    config = GroqConfig(schema_name="fruitmart", stream=True, backend=backend)
+
+    text, stats = config._stream_completion([])
+
+    assert text == "SELECT fruit_a FROM basket_a WHERE 1 = 1;" and stats["stop_reason"] == "statement_end"
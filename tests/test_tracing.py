@@ -0,0 +1,80 @@
+import json
+import threading
+import pytest
+from querycraft.utils.result_set import ResultSet
+from querycraft.utils.db_connector import DatabaseConnector
+from querycraft.utils.tracing import Tracer, MetricsRegistry, NOOP_SPAN, tracer
+from fakes import ScriptedBackend
+
+class RowsPool:
+    def stream(self, sql_query, params=None, batch_size=1000, statement_timeout_ms=None, prepare=False):
+        return ResultSet.from_rows(["fruit"], [("Apple",), ("Orange",), ("Banana",)])
+
+@pytest.fixture
+def traced(monkeypatch, tmp_path):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    trace_file = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "trace_path", str(trace_file))
+    monkeypatch.setattr(tracer, "metrics", MetricsRegistry())
+    return trace_file
+
+def test_natural_query_trace(traced, monkeypatch):
+    db = DatabaseConnector(schema_name="fruitmart", use_query_cache=False)
+    db.groq_config.retry_delay = 0
+    db.groq_config.backend = ScriptedBackend(["Here is the query", "SELECT fruit_a FROM basket_a"])
+    monkeypatch.setattr(db, "_get_pool", lambda: RowsPool())
+
+    result = db.execute_natural_query("Which fruits are in basket A?")
+
+    trace = result["trace"]
+    assert trace["name"] == "natural_query" and trace["duration"] > 0
+    generate, validate, execute = trace["children"]
+    assert generate["name"] == "generate" and generate["retries"] == 1
+    assert validate["name"] == "validate" and validate["ok"] and validate["regenerations"] == 0
+    stages = [child["name"] for child in generate["children"]]
+    assert stages == ["build_prompt", "llm_call", "llm_call", "clean_sql"]
+    assert generate["children"][1]["prompt_tokens"] == 900
+    assert execute["name"] == "execute" and execute["rows"] == 3
+
+    assert json.loads(traced.read_text())["name"] == "natural_query"
+    prometheus = tracer.metrics.to_prometheus()
+    assert 'querycraft_stage_duration_seconds_count{stage="llm_call"} 2' in prometheus
+    assert 'querycraft_stage_rows_bucket{stage="execute",le="5"} 1' in prometheus
+
+    metrics_file = traced.parent / "metrics.jsonl"
+    tracer.metrics.write_jsonl(metrics_file)
+    lines = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+    retries = [line for line in lines if line["name"] == "querycraft_stage_retries"]
+    assert retries[0]["labels"] == {"stage": "generate"} and retries[0]["sum"] == 1
+
+def test_disabled_tracer_is_noop():
+    disabled = Tracer(enabled=False)
+    with disabled.span("stage", rows=3) as span:
+        span.set(rows=4)
+        span.incr("retries")
+    assert span is NOOP_SPAN
+    assert disabled.current_span() is NOOP_SPAN
+    assert disabled.metrics.snapshot() == []
+
+def test_concurrent_prometheus_exports_do_not_collide(tmp_path):
+    registry = MetricsRegistry()
+    registry.observe("execute", 0.02)
+    path = tmp_path / "querycraft.prom"
+    errors = []
+
+    def export():
+        try:
+            for _ in range(20):
+                registry.write_prometheus(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=export) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert path.read_text() == registry.to_prometheus()
+    assert [p.name for p in tmp_path.iterdir()] == ["querycraft.prom"]